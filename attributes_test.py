@@ -0,0 +1,68 @@
+# This class is intended to test attribute-heavy documents parsed with
+# multi-valued attributes split into lists (the default) and kept as
+# strings (multi_valued_attributes=None), as test_get and test_has_attr in
+# yang_test.py do for one tag:
+# which attributes are split, and that both modes write the same markup
+# what find_all(class_=...), has_class() and select() match in each mode
+# the lists cost memory on every tag
+
+import unittest
+
+from testkit.attributes import MODES, has_class, parse
+from testkit.documents import ATTRIBUTE_CLASSES, attribute_document
+from testkit.memory import footprint
+
+DOCUMENT = attribute_document(500)
+
+
+class AttributesTest(unittest.TestCase):
+
+    def test_values(self):
+        default, none = parse(DOCUMENT, "default").a, parse(DOCUMENT, "none").a
+        self.assertEqual(default["class"], none["class"].split())
+        self.assertEqual(len(default["class"]), 8)
+        self.assertEqual(default["rel"], ["nofollow", "noopener"])
+        self.assertEqual(none["rel"], "nofollow noopener")
+        self.assertEqual(default["accesskey"], ["a", "b"])
+        self.assertEqual(none["accesskey"], "a b")
+        # data-* and other single-valued attributes are strings either way
+        for tag in (default, none):
+            self.assertEqual(tag["data-k0"], "v0-0")
+            self.assertEqual(tag["href"], "/page/0")
+        # rel is only multi-valued on some tags
+        self.assertIsInstance(parse('<p rel="a b"></p>', "default").p["rel"], str)
+
+    def test_output(self):
+        self.assertEqual(str(parse(DOCUMENT, "default")), str(parse(DOCUMENT, "none")))
+
+    def test_class_lookup(self):
+        expected = [str(tag) for tag in parse(DOCUMENT, "default").find_all(class_="c0")]
+        # all three tags of about a quarter of the 100 sections
+        self.assertAlmostEqual(len(expected) / 3.0, 100 * 8.0 / ATTRIBUTE_CLASSES, delta=2)
+        for mode in sorted(MODES):
+            with self.subTest(mode=mode):
+                soup = parse(DOCUMENT, mode)
+                self.assertEqual([str(tag) for tag in soup.find_all(class_=has_class("c0"))], expected)
+                self.assertEqual([str(tag) for tag in soup.select(".c0")], expected)
+                # the whole attribute value matches in both modes: the
+                # class lists repeat every ATTRIBUTE_CLASSES sections
+                whole = soup.div["class"]
+                whole = whole if isinstance(whole, str) else " ".join(whole)
+                self.assertEqual(len(soup.find_all("div", class_=whole)), 4)
+
+    # with strings, a single class name no longer matches a tag that has
+    # several
+    def test_class_string(self):
+        self.assertEqual(parse(DOCUMENT, "none").find_all(class_="c0"), [])
+        self.assertEqual(len(parse('<p class="c0"></p><p class="c0 c1"></p>', "none").find_all(class_="c0")), 1)
+
+    def test_memory(self):
+        default = footprint(parse(DOCUMENT, "default"))
+        none = footprint(parse(DOCUMENT, "none"))
+        self.assertEqual(default["Tag"][0], none["Tag"][0])
+        self.assertGreater(default["Tag"][1], none["Tag"][1] * 1.2)
+        self.assertEqual(default["NavigableString"], none["NavigableString"])
+
+
+if __name__ == '__main__':
+    unittest.main()
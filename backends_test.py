@@ -0,0 +1,50 @@
+# This class is intended to test the tree builder matrix:
+# html.parser is always available
+# the installed backends build the same tree as html.parser for the fixture
+# documents, apart from whitespace and the differences listed below
+# trees are rendered one node per line for the structural diff
+
+import unittest
+
+from bs4 import BeautifulSoup
+
+from testkit.backends import REFERENCE_BACKEND, installed_backends, tree_diff, tree_lines
+from testkit.documents import FIXTURE_DOCUMENTS
+
+# Lines a backend is known to add to or remove from the html.parser tree
+# once whitespace-only strings are ignored.
+KNOWN_DIFFERENCES = {
+    "lxml": set(),
+    "html5lib": {"+  <head>"},
+}
+
+
+class BackendsTest(unittest.TestCase):
+
+    def test_reference_installed(self):
+        self.assertIn(REFERENCE_BACKEND, installed_backends())
+
+    def test_reference_has_no_diff(self):
+        for name, markup in FIXTURE_DOCUMENTS.items():
+            self.assertEqual(tree_diff(markup, REFERENCE_BACKEND), [])
+
+    def test_equivalent_trees(self):
+        for backend in installed_backends():
+            for name, markup in FIXTURE_DOCUMENTS.items():
+                with self.subTest(backend=backend, document=name):
+                    diff = tree_diff(markup, backend, strip_whitespace=True)
+                    changes = set(line for line in diff[2:] if line[:1] in "+-")
+                    self.assertLessEqual(changes, KNOWN_DIFFERENCES.get(backend, set()))
+
+    # one line per node, indented by depth
+    def test_tree_lines(self):
+        self.assertEqual(tree_lines(BeautifulSoup("<p>a<b c='d'>b</b></p>", REFERENCE_BACKEND)), [
+            "<p>",
+            "  NavigableString 'a'",
+            "  <b c='d'>",
+            "    NavigableString 'b'",
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
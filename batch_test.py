@@ -0,0 +1,70 @@
+# This class is intended to test parsing and querying many documents at
+# once with testkit.batch:
+# the thread and process pools give exactly the serial results
+# scaling rows report docs/sec, speedup and efficiency
+# soups mutated concurrently in threads, switching as often as possible,
+# end up identical to soups mutated one after another
+
+import re
+import unittest
+
+from bs4 import BeautifulSoup
+
+from testkit.batch import MODES, QUERIES, corpus, digest, mutate, process, run_batch, scaling, stress
+from testkit.documents import FIXTURE_DOCUMENTS, MINA_DOCUMENT
+
+DOCUMENTS = 24
+SEEDS = list(range(48))
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_corpus(self):
+        documents = corpus(DOCUMENTS)
+        self.assertEqual(len(documents), DOCUMENTS)
+        self.assertEqual(documents, corpus(DOCUMENTS))
+        # every third document is generated with its own seed, and those
+        # all differ; the fixtures and the entity document repeat
+        generated = documents[2::3]
+        self.assertEqual(len(set(generated)), len(generated))
+        self.assertEqual(len(set(documents)), len(FIXTURE_DOCUMENTS) + 1 + len(generated))
+
+    # test_find_all in mina_test.py
+    def test_process(self):
+        summary = dict((name, (count, result)) for name, count, result in process(MINA_DOCUMENT))
+        self.assertEqual(sorted(summary), sorted(QUERIES))
+        soup = BeautifulSoup(MINA_DOCUMENT, "html.parser")
+        self.assertEqual(summary["find_all_b"], (1, digest(soup.find_all("b"))))
+        self.assertEqual(summary["find_all_regex"][0], len(soup.find_all(re.compile("^p"))))
+        self.assertEqual(summary["get_text"], (len(soup.get_text()), digest(soup.get_text())))
+
+    def test_modes(self):
+        documents = corpus(DOCUMENTS)
+        expected, _ = run_batch(documents)
+        self.assertEqual(len(expected), DOCUMENTS)
+        for mode in MODES:
+            with self.subTest(mode=mode):
+                results, seconds = run_batch(documents, mode, 2)
+                self.assertEqual(results, expected)
+                self.assertGreater(seconds, 0)
+
+    def test_scaling(self):
+        rows = scaling(corpus(6), ("serial", "thread"), (1, 2))
+        self.assertEqual([(r["mode"], r["workers"]) for r in rows],
+                         [("serial", 1), ("thread", 1), ("thread", 2)])
+        self.assertEqual(rows[0]["speedup"], 1.0)
+        for row in rows:
+            self.assertTrue(row["identical"])
+            self.assertAlmostEqual(row["docs_per_sec"], 6 / row["seconds"])
+            self.assertAlmostEqual(row["efficiency"], row["speedup"] / row["workers"])
+
+    def test_stress(self):
+        expected = [mutate(seed) for seed in SEEDS]
+        self.assertEqual([failure for failure, _, _ in expected], [None] * len(SEEDS))
+        # the sequences do differ, so equal results are not a coincidence
+        self.assertGreater(len(set(tree for _, _, tree in expected)), len(SEEDS) // 2)
+        self.assertEqual(stress(SEEDS, workers=8), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,5 @@
+# Benchmark suite mirroring the unit tests at production document sizes.
+#
+# Run with `make bench` or `python -m bench --help`. Each benchmark module
+# registers its benchmarks with bench.harness on import; bench.suites
+# imports them all.
@@ -0,0 +1,74 @@
+# Command line entry point: python -m bench
+
+import argparse
+import os
+import sys
+
+from bench import harness
+import bench.suites  # noqa: F401 (registers benchmarks)
+
+DEFAULT_SIZES = "1000,10000,100000"
+
+
+def parse_sizes(value):
+    return [int(s) for s in value.split(",") if s.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench")
+    parser.add_argument("--sizes", type=parse_sizes,
+                        default=parse_sizes(os.environ.get("BENCH_SIZES", DEFAULT_SIZES)),
+                        help="comma separated document sizes in nodes (default %s)" % DEFAULT_SIZES)
+    parser.add_argument("--group", action="append",
+                        help="only run benchmarks in this group (repeatable)")
+    parser.add_argument("--filter", action="append",
+                        help="only run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="seconds of timed work per benchmark and size")
+    parser.add_argument("--output", default="bench_output.txt")
+    parser.add_argument("--json", default="bench_output.json")
+    parser.add_argument("--baseline", default="bench_baseline.json",
+                        help="results to compare against, skipped if missing")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="fail when a median is this much slower than the baseline")
+    parser.add_argument("--memory-threshold", type=float, default=0.25,
+                        help="fail when peak or retained memory grows this much over the baseline")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to --baseline instead of comparing")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    benchmarks = harness.select(args.group, args.filter)
+    reports = harness.select_reports(args.group) if not args.filter else []
+    if args.list:
+        for b in benchmarks:
+            print("%-10s %s" % (b.group, b.name))
+        for name, _ in reports:
+            print("%-10s %s (report)" % ("", name))
+        return 0
+
+    results = harness.run_all(benchmarks, args.sizes, log=print, min_time=args.min_time)
+    report_lines = harness.run_reports(reports, results)
+    for name in sorted(report_lines):
+        print(harness.format_report(name, report_lines[name]))
+    harness.write_results(results, args.output, args.json, report_lines)
+
+    if args.save_baseline:
+        harness.write_results(results, os.devnull, args.baseline)
+        print("baseline written to %s" % args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print("no baseline at %s, skipping comparison" % args.baseline)
+        return 0
+
+    regressions = harness.find_regressions(results, harness.load_results(args.baseline),
+                                           args.threshold, args.memory_threshold)
+    for result, old, metric, ratio in regressions:
+        print("REGRESSION %s size=%d: %s %s -> %s (x%.2f)" % (
+            result["name"], result["size"], metric, old[metric], result[metric],
+            ratio))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+# One benchmark per API covered by mina_test.py, ziyuan_test.py and
+# yang_test.py, applied across a generated document so the cost grows with
+# its size.
+
+import re
+
+from bench.harness import benchmark
+from testkit.documents import generate_document
+from testkit.fixtures import snapshot
+
+
+def parsed(size):
+    return snapshot(generate_document(size))
+
+
+def with_tags(name):
+    def setup(size):
+        soup = parsed(size)
+        return soup, soup.find_all(name)
+    return setup
+
+
+# mina_test.py
+
+@benchmark("find_all_string", "api", setup=parsed)
+def bench_find_all_string(soup):
+    soup.find_all("b")
+
+
+@benchmark("find_all_regex", "api", setup=parsed)
+def bench_find_all_regex(soup):
+    soup.find_all(re.compile("^p"))
+
+
+@benchmark("find_all_list", "api", setup=parsed)
+def bench_find_all_list(soup):
+    soup.find_all(["b", "p"])
+
+
+@benchmark("find_all_true", "api", setup=parsed)
+def bench_find_all_true(soup):
+    soup.find_all(True)
+
+
+def smooth_setup(size):
+    soup = parsed(size)
+    for b in soup.find_all("b"):
+        b.append(", an added part")
+    return soup
+
+
+@benchmark("smooth", "api", setup=smooth_setup, mutates=True)
+def bench_smooth(soup):
+    soup.smooth()
+
+
+@benchmark("wrap", "api", setup=with_tags("p"), mutates=True)
+def bench_wrap(state):
+    soup, tags = state
+    for p in tags:
+        p.wrap(soup.new_tag("div"))
+
+
+@benchmark("unwrap", "api", setup=with_tags("b"), mutates=True)
+def bench_unwrap(state):
+    for b in state[1]:
+        b.unwrap()
+
+
+@benchmark("extract", "api", setup=with_tags("b"), mutates=True)
+def bench_extract(state):
+    for b in state[1]:
+        b.extract()
+
+
+def replace_with_setup(size):
+    soup, tags = with_tags("b")(size)
+    pairs = []
+    for b in tags:
+        new_tag = soup.new_tag("i")
+        new_tag.string = "No longer bold"
+        pairs.append((b, new_tag))
+    return pairs
+
+
+@benchmark("replace_with", "api", setup=replace_with_setup, mutates=True)
+def bench_replace_with(pairs):
+    for old, new in pairs:
+        old.replace_with(new)
+
+
+# yang_test.py
+
+@benchmark("parents", "api", setup=with_tags("b"))
+def bench_parents(state):
+    for b in state[1]:
+        list(b.parents)
+
+
+def index_setup(size):
+    soup = parsed(size)
+    children = soup.body.contents
+    step = max(1, len(children) // 100)
+    return soup.body, children[::step]
+
+
+@benchmark("index", "api", setup=index_setup)
+def bench_index(state):
+    body, children = state
+    for child in children:
+        body.index(child)
+
+
+@benchmark("descendants", "api", setup=parsed)
+def bench_descendants(soup):
+    list(soup.descendants)
+
+
+@benchmark("has_attr", "api", setup=with_tags("a"))
+def bench_has_attr(state):
+    for a in state[1]:
+        a.has_attr("class")
+        a.has_attr("no-attr")
+
+
+@benchmark("get", "api", setup=with_tags("a"))
+def bench_get(state):
+    for a in state[1]:
+        a.get("no-attr", None)
+        a.get("href")
+        a.get("rel")
+        a.get("class")
+
+
+@benchmark("clear_decompose", "api", setup=with_tags("div"), mutates=True)
+def bench_clear_decompose(state):
+    for div in state[1]:
+        div.clear(True)
+
+
+@benchmark("clear_extract", "api", setup=with_tags("div"), mutates=True)
+def bench_clear_extract(state):
+    for div in state[1]:
+        div.clear(False)
+
+
+# ziyuan_test.py
+
+@benchmark("append", "api", setup=with_tags("p"), mutates=True)
+def bench_append(state):
+    for p in state[1]:
+        p.append(" test_append_1")
+        p.append(" test_append_2")
+        p.append("<p>")
+
+
+@benchmark("insert", "api", setup=with_tags("div"), mutates=True)
+def bench_insert(state):
+    for div in state[1]:
+        div.insert(0, "test_insert_0 ")
+        div.insert(2, "test_insert_2 ")
+        div.insert(10, ' <p> test_insert_10  & "&" </p> &lt;p&gt;')
+
+
+@benchmark("extend", "api", setup=with_tags("p"), mutates=True)
+def bench_extend(state):
+    for p in state[1]:
+        p.extend([" ", "test_expend_1", "?"])
+
+
+@benchmark("insert_before", "api", setup=with_tags("p"), mutates=True)
+def bench_insert_before(state):
+    for p in state[1]:
+        p.insert_before("test_insert_before_1 ")
+        p.insert_before("< >")
+
+
+@benchmark("insert_after", "api", setup=with_tags("p"), mutates=True)
+def bench_insert_after(state):
+    for p in state[1]:
+        p.insert_after(" test_insert_after_1")
+        p.insert_after("< >")
@@ -0,0 +1,76 @@
+# Attribute-heavy documents parsed with multi-valued attributes split into
+# lists (the default) and kept as strings (multi_valued_attributes=None):
+# parse time, class lookups with find_all(class_=...), has_class() and
+# select(), and reading every class attribute. The "multi-valued
+# attributes" report sets the two modes side by side, with the memory
+# their tags take.
+
+from bench.harness import benchmark, report
+from testkit.attributes import MODES, has_class, parse
+from testkit.documents import attribute_document
+from testkit.fixtures import parsed
+from testkit.memory import footprint
+
+CLASS = "c0"
+
+
+def markup(size):
+    return attribute_document(size)
+
+
+def soup(mode):
+    def setup(size):
+        return parsed(attribute_document(size), "html.parser", **MODES[mode])
+    return setup
+
+
+def parse_mode(mode):
+    def run(text):
+        parse(text, mode)
+    return run
+
+
+# find_all(class_="c0") matches less with strings; see testkit.attributes
+def find_all_class(tree):
+    return {"matches": len(tree.find_all(class_=CLASS))}
+
+
+def find_all_has_class(tree):
+    return {"matches": len(tree.find_all(class_=has_class(CLASS)))}
+
+
+def select_class(tree):
+    return {"matches": len(tree.select("." + CLASS))}
+
+
+def read_classes(tree):
+    for tag in tree.find_all(True):
+        tag.get("class")
+
+
+for _mode in sorted(MODES):
+    benchmark("parse[%s]" % _mode, "attributes", setup=markup)(parse_mode(_mode))
+    benchmark("find_all_class[%s]" % _mode, "attributes", setup=soup(_mode))(find_all_class)
+    benchmark("find_all_has_class[%s]" % _mode, "attributes", setup=soup(_mode))(find_all_has_class)
+    benchmark("select_class[%s]" % _mode, "attributes", setup=soup(_mode))(select_class)
+    benchmark("read_classes[%s]" % _mode, "attributes", setup=soup(_mode))(read_classes)
+
+
+@report("multi-valued attributes", "attributes")
+def report_modes(results):
+    by_key = dict(((r["name"], r["size"]), r) for r in results)
+    sizes = sorted(set(r["size"] for r in results if r["name"].startswith("parse[")))
+    yield "%-20s %9s  %14s  %14s  %7s" % ("benchmark", "size", "default", "none", "ratio")
+    for size in sizes:
+        tags = dict((mode, footprint(soup(mode)(size))["Tag"][1]) for mode in MODES)
+        yield "%-20s %9d  %10.1f KiB  %10.1f KiB  %6.2fx" % (
+            "tag memory", size, tags["default"] / 1024.0, tags["none"] / 1024.0,
+            float(tags["default"]) / max(1, tags["none"]))
+        for name in ("parse", "find_all_class", "find_all_has_class", "select_class", "read_classes"):
+            default = by_key.get(("%s[default]" % name, size))
+            none = by_key.get(("%s[none]" % name, size))
+            if default is None or none is None:
+                continue
+            yield "%-20s %9d  %11.3f ms  %11.3f ms  %6.2fx" % (
+                name, size, default["p50_ms"], none["p50_ms"],
+                default["p50_ms"] / none["p50_ms"] if none["p50_ms"] else 0.0)
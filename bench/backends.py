@@ -0,0 +1,43 @@
+# Parse throughput for every installed tree builder, and a report of where
+# each builder's tree differs from html.parser's for the fixture documents.
+
+from bs4 import BeautifulSoup
+
+from bench.harness import benchmark, report
+from testkit.backends import HTML_BACKENDS, REFERENCE_BACKEND, installed_backends, tree_diff
+from testkit.documents import FIXTURE_DOCUMENTS, generate_document
+
+
+def markup(size):
+    return generate_document(size)
+
+
+def parse_benchmark(backend):
+    def parse(text):
+        BeautifulSoup(text, backend)
+        # One document per op, so ops/sec is docs/sec.
+        return {"bytes": len(text.encode("utf-8"))}
+    return parse
+
+
+for _backend in installed_backends():
+    benchmark("parse[%s]" % _backend, "backends", setup=markup)(parse_benchmark(_backend))
+
+
+@report("backend tree diff", "backends")
+def report_tree_diff(results):
+    # The documents used by test_find_all (mina), test_descendants (yang)
+    # and test_insert (ziyuan).
+    for backend in HTML_BACKENDS:
+        if backend == REFERENCE_BACKEND:
+            continue
+        if backend not in installed_backends():
+            yield "%s: not installed, skipped" % backend
+            continue
+        for name in sorted(FIXTURE_DOCUMENTS):
+            diff = tree_diff(FIXTURE_DOCUMENTS[name], backend)
+            yield "%s on %s document: %s" % (
+                backend, name, "identical" if not diff else "%d differing lines" % (
+                    sum(1 for line in diff[2:] if line[:1] in "+-")))
+            for line in diff:
+                yield "    " + line
@@ -0,0 +1,44 @@
+# Batch parsing of a corpus of documents totalling about `size` nodes:
+# the serial loop against a thread pool and a process pool with one worker
+# per CPU. The "batch scaling" report gives docs/sec and the scaling
+# efficiency of each pool. `python -m testkit.batch` runs the same
+# comparison at several worker counts.
+
+import os
+
+from bench.harness import benchmark, report
+from testkit.batch import DOCUMENT_NODES, EXECUTORS, corpus, run_batch
+
+WORKERS = os.cpu_count() or 1
+
+
+def documents(size):
+    return corpus(max(1, size // DOCUMENT_NODES))
+
+
+def batch(mode, workers):
+    def run(docs):
+        run_batch(docs, mode, workers)
+        return {"documents": len(docs), "workers": workers}
+    return run
+
+
+benchmark("batch_serial", "batch", setup=documents)(batch("serial", 1))
+for _mode in sorted(EXECUTORS):
+    benchmark("batch_%s" % _mode, "batch", setup=documents)(batch(_mode, WORKERS))
+
+
+@report("batch scaling", "batch")
+def report_scaling(results):
+    serial = dict((r["size"], r["p50_ms"]) for r in results if r["name"] == "batch_serial")
+    yield "%-20s %9s  %7s  %10s  %8s  %10s" % ("benchmark", "size", "workers", "docs/sec", "speedup",
+                                               "efficiency")
+    for result in sorted(results, key=lambda r: (r["name"], r["size"])):
+        if result["group"] != "batch" or not result["p50_ms"]:
+            continue
+        docs = result["extra"].get("documents", 0)
+        workers = result["extra"].get("workers", 1)
+        speedup = serial.get(result["size"], 0.0) / result["p50_ms"]
+        yield "%-20s %9d  %7d  %10.1f  %7.2fx  %9.0f%%" % (
+            result["name"], result["size"], workers, docs * 1000.0 / result["p50_ms"], speedup,
+            100 * speedup / workers)
@@ -0,0 +1,80 @@
+# Bulk edits of a tag with n children: extend() from a list, a generator
+# and another tag, clear() with and without decompose, and n calls of
+# insert(0, ...), against the helpers in testkit.bulk. The "per-element
+# cost" report flags edits whose cost per child grows with the width.
+
+from bench.harness import benchmark, report
+from testkit import bulk
+from testkit.traversal import wide_tree
+
+# An edit is flagged when its cost per child at the largest size of the
+# run is this many times its cost at the smallest.
+GROWS = 2.0
+
+
+# An empty <section> next to a wide <div>, and n new tags to put in it.
+def target(size):
+    soup, _ = wide_tree(size)
+    section = soup.new_tag("section")
+    soup.body.append(section)
+    return soup, section, [soup.new_tag("i") for _ in range(size)]
+
+
+def wide(size):
+    soup, _ = wide_tree(size)
+    return soup.div
+
+
+def extend_list(state):
+    state[1].extend(state[2])
+
+
+def extend_generator(state):
+    state[1].extend(node for node in state[2])
+
+
+def extend_tag(state):
+    state[1].extend(state[0].div)
+
+
+def insert_start(state):
+    section = state[1]
+    for node in state[2]:
+        section.insert(0, node)
+
+
+def bulk_extend_tag(state):
+    bulk.extend(state[1], state[0].div)
+
+
+def bulk_insert_start(state):
+    bulk.insert_all(state[1], 0, reversed(state[2]))
+
+
+EDITS = {
+    "extend_list": (target, extend_list),
+    "extend_generator": (target, extend_generator),
+    "extend_tag": (target, extend_tag),
+    "clear": (wide, lambda div: div.clear()),
+    "clear_decompose": (wide, lambda div: div.clear(decompose=True)),
+    "insert_start": (target, insert_start),
+    "bulk_extend_tag": (target, bulk_extend_tag),
+    "bulk_clear": (wide, bulk.clear),
+    "bulk_clear_decompose": (wide, lambda div: bulk.clear(div, decompose=True)),
+    "bulk_insert_start": (target, bulk_insert_start),
+}
+
+for _name, (_setup, _run) in sorted(EDITS.items()):
+    benchmark(_name, "bulk", setup=_setup, mutates=True)(_run)
+
+
+@report("per-element cost", "bulk")
+def report_per_element(results):
+    yield "%-22s %9s  %12s" % ("edit", "size", "ns / child")
+    for name in sorted(EDITS):
+        runs = sorted((r["size"], r["p50_ms"] * 1e6 / r["size"]) for r in results if r["name"] == name)
+        for size, cost in runs:
+            yield "%-22s %9d  %12.1f" % (name, size, cost)
+        if len(runs) > 1 and runs[-1][1] > GROWS * runs[0][1]:
+            yield "%-22s %9s  grows %.1fx from n=%d to n=%d" % (
+                name, "", runs[-1][1] / runs[0][1], runs[0][0], runs[-1][0])
@@ -0,0 +1,71 @@
+# Parsing generated documents given as bytes in UTF-8, UTF-16, Latin-1 and
+# Shift-JIS, with and without a BOM and a <meta charset>, against parsing
+# the same document as a str; and encoding detection alone (UnicodeDammit,
+# as BeautifulSoup runs it) with no hint, from_encoding and
+# exclude_encodings. The "encoding detection" report gives the share of a
+# bytes parse spent detecting and decoding, and what was detected.
+
+from bs4 import BeautifulSoup
+
+from bench.harness import benchmark, report
+from testkit.charsets import HINTS, case_name, cases, detect, localize, replacement_quiet, to_bytes
+from testkit.documents import generate_document
+
+
+def markup(encoding, meta):
+    def setup(size):
+        return localize(generate_document(size), encoding, meta)
+    return setup
+
+
+def data(encoding, bom, meta):
+    def setup(size):
+        return to_bytes(markup(encoding, meta)(size), encoding, bom)
+    return setup
+
+
+def parse(document):
+    with replacement_quiet():
+        soup = BeautifulSoup(document, "html.parser")
+    return {"encoding": soup.original_encoding or "str"}
+
+
+def detection(hint, encoding):
+    def run(document):
+        with replacement_quiet():
+            dammit = detect(document, hint, encoding)
+        return {"encoding": dammit.original_encoding}
+    return run
+
+
+for _encoding, _bom, _meta in cases():
+    _case = case_name(_encoding, _bom, _meta)
+    if not _bom:
+        benchmark("parse_str[%s]" % _case, "charsets", setup=markup(_encoding, _meta))(parse)
+    benchmark("parse_bytes[%s]" % _case, "charsets", setup=data(_encoding, _bom, _meta))(parse)
+    for _hint in HINTS:
+        benchmark("detect[%s][%s]" % (_case, _hint), "charsets",
+                  setup=data(_encoding, _bom, _meta))(detection(_hint, _encoding))
+
+
+@report("encoding detection", "charsets")
+def report_detection(results):
+    by_key = dict(((r["name"], r["size"]), r) for r in results)
+    sizes = sorted(set(r["size"] for r in results if r["name"].startswith("parse_bytes[")))
+    yield "%-20s %-18s %9s  %11s  %11s  %11s  %6s  %s" % (
+        "case", "hint", "size", "str ms", "bytes ms", "detect ms", "share", "detected")
+    for encoding, bom, meta in cases():
+        case = case_name(encoding, bom, meta)
+        for size in sizes:
+            parsed = by_key.get(("parse_bytes[%s]" % case, size))
+            if parsed is None:
+                continue
+            text = by_key.get(("parse_str[%s]" % case_name(encoding, False, meta), size))
+            for hint in HINTS:
+                detected = by_key.get(("detect[%s][%s]" % (case, hint), size))
+                if detected is None:
+                    continue
+                yield "%-20s %-18s %9d  %11.3f  %11.3f  %11.3f  %5.1f%%  %s" % (
+                    case, hint, size, text["p50_ms"] if text else 0.0, parsed["p50_ms"], detected["p50_ms"],
+                    100.0 * detected["p50_ms"] / parsed["p50_ms"] if parsed["p50_ms"] else 0.0,
+                    detected["extra"].get("encoding"))
@@ -0,0 +1,53 @@
+# Cost of getting a fresh, mutable tree for a test: parsing the document
+# again against the snapshot strategies testkit.fixtures could use.
+
+import copy
+import pickle
+
+from bs4 import BeautifulSoup
+
+from bench.harness import benchmark
+from testkit.documents import generate_document
+from testkit.fixtures import clone_tree, parsed
+
+
+def markup(size):
+    return generate_document(size)
+
+
+def cached(size):
+    return parsed(generate_document(size))
+
+
+# deepcopy and pickle recurse along the element links, so large trees
+# raise RecursionError; report that instead of a timing. Otherwise the
+# result is whatever `func` returns.
+def recursion_limited(func):
+    def run(soup):
+        try:
+            return func(soup)
+        except RecursionError:
+            return {"error": "RecursionError"}
+    return run
+
+
+@benchmark("snapshot_parse", "fixtures", setup=markup)
+def bench_parse(text):
+    BeautifulSoup(text, "html.parser")
+
+
+@benchmark("snapshot_clone", "fixtures", setup=cached)
+def bench_clone(soup):
+    clone_tree(soup)
+
+
+@benchmark("snapshot_deepcopy", "fixtures", setup=cached)
+@recursion_limited
+def bench_deepcopy(soup):
+    copy.deepcopy(soup)
+
+
+@benchmark("snapshot_pickle", "fixtures", setup=cached)
+@recursion_limited
+def bench_pickle(soup):
+    pickle.loads(pickle.dumps(soup))
@@ -0,0 +1,31 @@
+# Throughput of the tree invariant checker, which runs after every fuzzed
+# operation, and of the mutation fuzzer itself.
+
+import time
+
+from bench.harness import benchmark
+from testkit.documents import generate_document
+from testkit.fixtures import snapshot
+from testkit.fuzz import DEFAULT_STEPS, fuzz
+from testkit.invariants import violations
+
+# Sequences per fuzz run; the run does not depend on the benchmark size.
+SEQUENCES = 10
+
+
+def parsed(size):
+    return snapshot(generate_document(size))
+
+
+@benchmark("violations", "fuzz", setup=parsed)
+def bench_violations(soup):
+    violations(soup)
+
+
+@benchmark("fuzz_sequences", "fuzz", sizes=[SEQUENCES * DEFAULT_STEPS])
+def bench_fuzz(operations):
+    start = time.perf_counter()
+    result = fuzz(seed=0, count=SEQUENCES)
+    elapsed = time.perf_counter() - start
+    return {"operations": result["operations"], "execs_per_sec": result["operations"] / elapsed,
+            "failures": len(result["failures"])}
@@ -0,0 +1,204 @@
+# Timing, memory measurement, reporting and baseline comparison for the
+# benchmark suite.
+
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+
+BENCHMARKS = []
+REPORTS = []
+
+
+class Benchmark(object):
+
+    def __init__(self, name, group, func, setup=None, mutates=False, sizes=None):
+        self.name = name
+        self.group = group
+        self.func = func
+        self.setup = setup
+        # A benchmark that mutates its state gets a fresh setup() for every
+        # repeat; otherwise one setup() is shared by all repeats.
+        self.mutates = mutates
+        # Sizes this benchmark is restricted to, or None for the run's sizes.
+        self.sizes = sizes
+
+    def prepare(self, size):
+        if self.setup is None:
+            return size
+        return self.setup(size)
+
+
+# Register `func(state)` as a benchmark. `setup(size)` builds the state and
+# is never timed.
+def benchmark(name, group, setup=None, mutates=False, sizes=None):
+    def register(func):
+        BENCHMARKS.append(Benchmark(name, group, func, setup, mutates, sizes))
+        return func
+    return register
+
+
+# Register `func(results)` as a report: untimed output (a list of lines),
+# possibly derived from the benchmark results of the run, that is written
+# after them.
+def report(name, group):
+    def register(func):
+        REPORTS.append((name, group, func))
+        return func
+    return register
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Run one benchmark at one size. It repeats until `min_time` seconds of
+# timed work or `max_repeats` runs, whichever comes first, with at least
+# `min_repeats` runs. Memory comes from one extra run under tracemalloc so
+# the tracing overhead does not skew the timings: the peak while the
+# benchmark runs, and what is still allocated after it returns and a full
+# collection (memory the operation left in its state, or leaked).
+def run_benchmark(bench, size, min_time=0.5, min_repeats=3, max_repeats=50):
+    samples = []
+    extra = {}
+    state = None if bench.mutates else bench.prepare(size)
+    total = 0.0
+    while len(samples) < max_repeats and (len(samples) < min_repeats or total < min_time):
+        if bench.mutates:
+            state = bench.prepare(size)
+        gc.collect()
+        start = time.perf_counter()
+        result = bench.func(state)
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        total += elapsed
+        if isinstance(result, dict):
+            extra = result
+
+    if bench.mutates:
+        state = bench.prepare(size)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        bench.func(state)
+        _, peak = tracemalloc.get_traced_memory()
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mean = statistics.mean(samples)
+    if "bytes" in extra:
+        # A benchmark that reports the bytes it processed per op also
+        # gets a throughput figure.
+        extra = dict(extra, mb_per_sec=extra["bytes"] / 1e6 / mean)
+    return {
+        "name": bench.name,
+        "group": bench.group,
+        "size": size,
+        "repeats": len(samples),
+        "ops_per_sec": 1.0 / mean if mean else float("inf"),
+        "p50_ms": percentile(samples, 0.50) * 1000.0,
+        "p99_ms": percentile(samples, 0.99) * 1000.0,
+        "peak_bytes": peak,
+        "retained_bytes": retained,
+        "extra": extra,
+    }
+
+
+def select(groups=None, names=None):
+    selected = []
+    for bench in BENCHMARKS:
+        if groups and bench.group not in groups:
+            continue
+        if names and not any(n in bench.name for n in names):
+            continue
+        selected.append(bench)
+    return selected
+
+
+def select_reports(groups=None):
+    return [(name, func) for name, group, func in REPORTS if not groups or group in groups]
+
+
+def run_reports(reports, results):
+    return dict((name, list(func(results))) for name, func in reports)
+
+
+def run_all(benchmarks, sizes, log=None, **kwargs):
+    results = []
+    for bench in benchmarks:
+        for size in (bench.sizes or sizes):
+            result = run_benchmark(bench, size, **kwargs)
+            results.append(result)
+            if log is not None:
+                log(format_result(result))
+    return results
+
+
+def format_result(result):
+    line = ("%-32s %-10s %9d  %12.2f ops/s  p50 %10.3f ms  p99 %10.3f ms"
+            "  peak %10.1f KiB  retained %10.1f KiB") % (
+        result["name"], result["group"], result["size"], result["ops_per_sec"],
+        result["p50_ms"], result["p99_ms"], result["peak_bytes"] / 1024.0,
+        result.get("retained_bytes", 0) / 1024.0)
+    if result["extra"]:
+        line += "  " + " ".join("%s=%s" % (k, _format_value(v))
+                                for k, v in sorted(result["extra"].items()))
+    return line
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return "%.3f" % value
+    return str(value)
+
+
+def format_report(name, lines):
+    return "\n".join(["== %s" % name] + lines)
+
+
+def write_results(results, text_path, json_path, reports=None):
+    reports = reports or {}
+    with open(text_path, "w") as f:
+        for result in results:
+            f.write(format_result(result) + "\n")
+        for name in sorted(reports):
+            f.write("\n" + format_report(name, reports[name]) + "\n")
+    with open(json_path, "w") as f:
+        json.dump({"results": results, "reports": reports}, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+# Compare results against a baseline. Returns (result, baseline_result,
+# metric, ratio) for every benchmark whose median latency got worse than
+# the baseline by more than `threshold` (0.25 means 25% slower), or whose
+# peak or retained memory grew by more than `memory_threshold`. Memory
+# figures under `memory_floor` bytes are too noisy to compare.
+def find_regressions(results, baseline, threshold, memory_threshold=None, memory_floor=64 * 1024):
+    checks = [("p50_ms", threshold, 0)]
+    if memory_threshold is not None:
+        checks += [("peak_bytes", memory_threshold, memory_floor),
+                   ("retained_bytes", memory_threshold, memory_floor)]
+    previous = dict(((r["name"], r["size"]), r) for r in baseline)
+    regressions = []
+    for result in results:
+        old = previous.get((result["name"], result["size"]))
+        if old is None:
+            continue
+        for metric, limit, floor in checks:
+            before, after = old.get(metric), result.get(metric)
+            if before is None or after is None or max(before, after) < floor:
+                continue
+            # Memory that grows from nothing is always a regression.
+            ratio = float(after) / before if before else float("inf")
+            if ratio > 1.0 + limit:
+                regressions.append((result, old, metric, ratio))
+    return regressions
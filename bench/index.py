@@ -0,0 +1,56 @@
+# Repeated find_all queries by tag name, class and id: plain find_all
+# against a SoupIndex, and what building the index costs.
+
+from bench.harness import benchmark, report
+from testkit.documents import generate_document
+from testkit.fixtures import snapshot
+from testkit.index import SoupIndex
+
+QUERIES = [(("b",), {}), (("a",), {}), ((), {"class_": "boldest"}),
+           ((), {"class_": "news"}), ((), {"id": "s7"}), (("div",), {"class_": "hit"}),
+           ((["b", "span"],), {})] * 10
+
+
+def parsed(size):
+    return snapshot(generate_document(size, marked=0.1))
+
+
+def indexed(size):
+    return SoupIndex(parsed(size))
+
+
+@benchmark("index_build", "index", setup=parsed)
+def bench_build(soup):
+    SoupIndex(soup)
+
+
+@benchmark("queries_find_all", "index", setup=parsed)
+def bench_find_all(soup):
+    for args, kwargs in QUERIES:
+        soup.find_all(*args, **kwargs)
+    return {"queries": len(QUERIES)}
+
+
+@benchmark("queries_index", "index", setup=indexed)
+def bench_index(index):
+    for args, kwargs in QUERIES:
+        index.find_all(*args, **kwargs)
+    return {"queries": len(QUERIES)}
+
+
+@report("index speedup", "index")
+def report_speedup(results):
+    by_key = dict(((r["name"], r["size"]), r) for r in results)
+    yield "%9s  %14s  %14s  %8s  %12s  %s" % (
+        "size", "find_all/query", "index/query", "speedup", "build", "break-even queries")
+    for (name, size), plain in sorted(by_key.items()):
+        indexed_result = by_key.get(("queries_index", size))
+        build = by_key.get(("index_build", size))
+        if name != "queries_find_all" or indexed_result is None or build is None:
+            continue
+        per_plain = plain["p50_ms"] / len(QUERIES)
+        per_index = indexed_result["p50_ms"] / len(QUERIES)
+        saved = per_plain - per_index
+        yield "%9d  %11.3f ms  %11.3f ms  %7.1fx  %9.3f ms  %s" % (
+            size, per_plain, per_index, per_plain / per_index if per_index else float("inf"),
+            build["p50_ms"], "%.1f" % (build["p50_ms"] / saved) if saved > 0 else "never")
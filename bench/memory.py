@@ -0,0 +1,56 @@
+# Node footprint of parsed documents, and the memory the removal APIs
+# leave behind. Peak and retained memory of every benchmark is compared
+# against the baseline by `make bench`.
+
+import gc
+
+from bs4 import BeautifulSoup
+
+from bench.harness import benchmark
+from testkit.documents import generate_document
+from testkit.fixtures import snapshot
+from testkit.memory import Tracker, bytes_per_node, subtree
+
+
+def markup(size):
+    return generate_document(size)
+
+
+@benchmark("footprint", "memory", setup=markup)
+def bench_footprint(text):
+    soup = BeautifulSoup(text, "html.parser")
+    per_node = bytes_per_node(soup)
+    return {"bytes_per_tag": per_node["Tag"], "bytes_per_string": per_node["NavigableString"]}
+
+
+# The benchmarks below remove nodes and drop every reference to them, with
+# the cyclic garbage collector paused. `alive_without_gc` counts removed
+# nodes that reference counting alone did not free: they sit in reference
+# cycles until the next collection. Retained memory is measured after a
+# full collection, so it shows anything the tree itself still holds on to.
+
+def removal(name, remove, select=lambda soup: soup.find_all("div"), removed=subtree):
+    def setup(size):
+        soup = snapshot(generate_document(size))
+        targets = select(soup)
+        tracker = Tracker([n for t in targets for n in removed(t)])
+        return soup, targets, tracker
+
+    def run(state):
+        soup, targets, tracker = state
+        gc.disable()
+        try:
+            while targets:
+                remove(soup, targets.pop())
+        finally:
+            gc.enable()
+        return {"nodes": len(tracker.refs), "alive_without_gc": tracker.alive()}
+
+    benchmark(name, "memory", setup=setup, mutates=True)(run)
+
+
+removal("decompose_dropped", lambda soup, tag: tag.decompose())
+removal("clear_decompose_dropped", lambda soup, tag: tag.clear(True),
+        select=lambda soup: [soup.body], removed=lambda tag: list(tag.descendants))
+removal("extract_dropped", lambda soup, tag: tag.extract())
+removal("replace_with_dropped", lambda soup, tag: tag.replace_with(soup.new_tag("i")))
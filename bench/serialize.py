@@ -0,0 +1,92 @@
+# Serialization of an entity-heavy document: str(), and decode(),
+# encode() and prettify() with each formatter, against streaming the same
+# output in chunks with testkit.serialize to a sink that drops it and to a
+# temporary file. Every benchmark reports the size of its output, so it
+# also gets a throughput; the "serialize" report sets that beside the peak
+# memory of each way of writing the document.
+
+import tempfile
+
+from bench.harness import benchmark, report
+from testkit.documents import entity_document
+from testkit.fixtures import parsed
+from testkit.serialize import FORMATTERS, write
+
+
+def document(size):
+    return parsed(entity_document(size))
+
+
+# Counts what is written to it and keeps none of it.
+class Sink(object):
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, chunk):
+        self.size += len(chunk)
+
+
+def label(formatter):
+    return formatter or "none"
+
+
+# The UTF-8 size of str output, so every row's MB/s is in the same bytes
+# as encode() and stream() report.
+def utf8_size(text):
+    return len(text.encode("utf-8"))
+
+
+def decode(formatter):
+    def run(soup):
+        return {"bytes": utf8_size(soup.decode(formatter=formatter))}
+    return run
+
+
+def encode(formatter):
+    def run(soup):
+        return {"bytes": len(soup.encode("utf-8", formatter=formatter))}
+    return run
+
+
+def prettify(formatter):
+    def run(soup):
+        return {"bytes": utf8_size(soup.prettify(formatter=formatter))}
+    return run
+
+
+def stream(formatter, pretty_print=False):
+    def run(soup):
+        return {"bytes": write(soup, Sink(), "utf-8", pretty_print, formatter)}
+    return run
+
+
+@benchmark("str", "serialize", setup=document)
+def bench_str(soup):
+    return {"bytes": utf8_size(str(soup))}
+
+
+for _formatter in FORMATTERS:
+    _label = label(_formatter)
+    benchmark("decode[%s]" % _label, "serialize", setup=document)(decode(_formatter))
+    benchmark("encode[%s]" % _label, "serialize", setup=document)(encode(_formatter))
+    benchmark("prettify[%s]" % _label, "serialize", setup=document)(prettify(_formatter))
+    benchmark("stream[%s]" % _label, "serialize", setup=document)(stream(_formatter))
+    benchmark("stream_pretty[%s]" % _label, "serialize", setup=document)(stream(_formatter, True))
+
+
+@benchmark("stream_file", "serialize", setup=document)
+def bench_stream_file(soup):
+    with tempfile.TemporaryFile() as out:
+        return {"bytes": write(soup, out, "utf-8")}
+
+
+@report("serialize", "serialize")
+def report_serialize(results):
+    yield "%-24s %9s  %9s  %12s" % ("benchmark", "size", "MB/s", "peak KiB")
+    for result in sorted(results, key=lambda r: (r["name"], r["size"])):
+        if result["group"] != "serialize":
+            continue
+        yield "%-24s %9d  %9.1f  %12.1f" % (result["name"], result["size"],
+                                            result["extra"].get("mb_per_sec", 0.0),
+                                            result["peak_bytes"] / 1024.0)
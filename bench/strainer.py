@@ -0,0 +1,53 @@
+# find_all on a full parse against a parse_only (SoupStrainer) parse of the
+# same document, at different match selectivities: the generated documents
+# mark a given fraction of their sections with class "hit", and the query
+# is find_all("div", class_="hit").
+
+from bs4 import BeautifulSoup
+
+from bench.harness import benchmark, report
+from testkit.documents import generate_document
+from testkit.strainer import strainer_for
+
+SELECTIVITIES = (0.01, 0.1, 0.5, 1.0)
+QUERY = (("div",), {"class_": "hit"})
+
+
+def marked(fraction):
+    def setup(size):
+        return generate_document(size, marked=fraction)
+    return setup
+
+
+def full(text):
+    args, kwargs = QUERY
+    return {"matches": len(BeautifulSoup(text, "html.parser").find_all(*args, **kwargs))}
+
+
+def strained(text):
+    args, kwargs = QUERY
+    soup = BeautifulSoup(text, "html.parser", parse_only=strainer_for(*args, **kwargs))
+    return {"matches": len(soup.find_all(*args, **kwargs))}
+
+
+for _fraction in SELECTIVITIES:
+    benchmark("find_all_full[%g]" % _fraction, "strainer", setup=marked(_fraction))(full)
+    benchmark("find_all_strained[%g]" % _fraction, "strainer", setup=marked(_fraction))(strained)
+
+
+@report("strainer savings", "strainer")
+def report_savings(results):
+    by_key = dict(((r["name"], r["size"]), r) for r in results)
+    yield "%-11s %9s  %12s  %12s  %s" % ("selectivity", "size", "time saved", "peak saved", "matches")
+    for fraction in SELECTIVITIES:
+        for (name, size), result in sorted(by_key.items()):
+            if name != "find_all_strained[%g]" % fraction:
+                continue
+            baseline = by_key.get(("find_all_full[%g]" % fraction, size))
+            if baseline is None:
+                continue
+            yield "%-11g %9d  %11.1f%%  %11.1f%%  %s" % (
+                fraction, size,
+                100.0 * (1 - result["p50_ms"] / baseline["p50_ms"]),
+                100.0 * (1 - float(result["peak_bytes"]) / max(1, baseline["peak_bytes"])),
+                result["extra"].get("matches"))
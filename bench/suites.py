@@ -0,0 +1,17 @@
+# Importing this module registers every benchmark and report.
+
+import bench.api  # noqa: F401
+import bench.attributes  # noqa: F401
+import bench.backends  # noqa: F401
+import bench.batch  # noqa: F401
+import bench.bulk  # noqa: F401
+import bench.charsets  # noqa: F401
+import bench.fixtures  # noqa: F401
+import bench.fuzz  # noqa: F401
+import bench.index  # noqa: F401
+import bench.memory  # noqa: F401
+import bench.serialize  # noqa: F401
+import bench.strainer  # noqa: F401
+import bench.text  # noqa: F401
+import bench.transfer  # noqa: F401
+import bench.traversal  # noqa: F401
@@ -0,0 +1,79 @@
+# smooth() and text extraction on a <div> of n adjacent string fragments,
+# flat or spread over nested tags: Tag.smooth() against the linear-time
+# testkit.text.smooth(), get_text() and .string before and after smoothing,
+# and the memory smoothing saves.
+
+from bench.harness import benchmark, report
+from testkit.complexity import fit_exponent
+from testkit.memory import footprint
+from testkit.text import fragmented, smooth
+
+# Tag.smooth() is quadratic; past a few thousand fragments one run takes
+# minutes, so it only runs at these sizes.
+QUADRATIC_SIZES = [10, 100, 1000, 2000]
+
+SHAPES = {"flat": False, "nested": True}
+
+
+def tree(nested, smoothed=False):
+    def setup(size):
+        soup = fragmented(size, nested)
+        if smoothed:
+            smooth(soup)
+        return soup
+    return setup
+
+
+def tags(nested, smoothed=False):
+    def setup(size):
+        return tree(nested, smoothed)(size).find_all(True)
+    return setup
+
+
+def bs4_smooth(soup):
+    soup.smooth()
+
+
+def get_text(soup):
+    soup.get_text()
+
+
+# .string of every tag, as code that walks a page for its text does
+def strings(tags):
+    return {"strings": sum(1 for tag in tags if tag.string is not None)}
+
+
+for _shape, _nested in sorted(SHAPES.items()):
+    benchmark("smooth[%s]" % _shape, "text", setup=tree(_nested), mutates=True)(smooth)
+    benchmark("tag_smooth[%s]" % _shape, "text", setup=tree(_nested), mutates=True,
+              sizes=QUADRATIC_SIZES)(bs4_smooth)
+    benchmark("get_text_fragmented[%s]" % _shape, "text", setup=tree(_nested))(get_text)
+    benchmark("get_text_smoothed[%s]" % _shape, "text", setup=tree(_nested, True))(get_text)
+    benchmark("string_fragmented[%s]" % _shape, "text", setup=tags(_nested))(strings)
+    benchmark("string_smoothed[%s]" % _shape, "text", setup=tags(_nested, True))(strings)
+
+
+@report("smooth scaling", "text")
+def report_scaling(results):
+    yield "%-20s %9s  %14s" % ("benchmark", "size", "ns / fragment")
+    for name in sorted(set(r["name"] for r in results if "smooth[" in r["name"])):
+        runs = sorted((r["size"], r["p50_ms"]) for r in results if r["name"] == name)
+        for size, ms in runs:
+            yield "%-20s %9d  %14.1f" % (name, size, ms * 1e6 / size)
+        if len(runs) > 1:
+            yield "%-20s %9s  time ~ n**%.2f" % (name, "", fit_exponent(*zip(*runs)))
+
+
+@report("smooth memory", "text")
+def report_memory(results):
+    sizes = sorted(set(r["size"] for r in results if r["name"].startswith("smooth[")))
+    yield "%-7s %9s  %16s  %16s  %7s" % ("shape", "size", "strings before", "strings after", "saved")
+    for shape, nested in sorted(SHAPES.items()):
+        for size in sizes:
+            soup = fragmented(size, nested)
+            before = footprint(soup)["NavigableString"]
+            smooth(soup)
+            after = footprint(soup)["NavigableString"]
+            yield "%-7s %9d  %7d %6.1f KiB  %7d %6.1f KiB  %6.1f%%" % (
+                shape, size, before[0], before[1] / 1024.0, after[0], after[1] / 1024.0,
+                100.0 * (1 - float(after[1]) / max(1, before[1])))
@@ -0,0 +1,109 @@
+# Sending a parsed tree to another process: a generated document, a deep
+# and a wide tree, moved by re-parsing the markup, by pickle, by the flat
+# format of testkit.transfer, and copied with copy.deepcopy, copy.copy and
+# clone_tree. Every benchmark reports the size of the source HTML, so it
+# gets a throughput in the source, and what it would put on the wire; the
+# "transfer" report sets the wire size and the cost per MB of source
+# beside re-parsing.
+
+import copy
+import pickle
+
+from bs4 import BeautifulSoup
+
+from bench.fixtures import recursion_limited
+from bench.harness import benchmark, report
+from testkit.documents import deep_document, generate_document, wide_document
+from testkit.fixtures import clone_tree, parsed
+from testkit.transfer import dumps, loads
+
+SHAPES = {"generated": generate_document, "deep": deep_document, "wide": wide_document}
+
+
+def markup(shape):
+    def setup(size):
+        return SHAPES[shape](size)
+    return setup
+
+
+def tree(shape):
+    def setup(size):
+        text = SHAPES[shape](size)
+        return parsed(text), len(text.encode("utf-8"))
+    return setup
+
+
+# Run `func` on the tree and report the size of its source HTML with
+# what `func` returns.
+def with_source(func):
+    def run(state):
+        soup, source = state
+        return dict(func(soup), bytes=source)
+    return run
+
+
+def reparse(text):
+    data = text.encode("utf-8")
+    BeautifulSoup(data.decode("utf-8"), "html.parser")
+    return {"bytes": len(data), "wire": len(data)}
+
+
+def pickled(soup):
+    data = pickle.dumps(soup, pickle.HIGHEST_PROTOCOL)
+    pickle.loads(data)
+    return {"wire": len(data)}
+
+
+def flat(soup):
+    data = dumps(soup)
+    loads(data)
+    return {"wire": len(data)}
+
+
+def deepcopied(soup):
+    copy.deepcopy(soup)
+    return {}
+
+
+def copied(soup):
+    copy.copy(soup)
+    return {}
+
+
+def cloned(soup):
+    clone_tree(soup)
+    return {}
+
+
+METHODS = {"pickle": pickled, "flat": flat, "deepcopy": deepcopied, "copy": copied, "clone": cloned}
+
+for _shape in sorted(SHAPES):
+    benchmark("reparse[%s]" % _shape, "transfer", setup=markup(_shape))(reparse)
+    for _method, _func in sorted(METHODS.items()):
+        benchmark("%s[%s]" % (_method, _shape), "transfer",
+                  setup=tree(_shape))(recursion_limited(with_source(_func)))
+
+
+@report("transfer", "transfer")
+def report_transfer(results):
+    by_key = dict(((r["name"], r["size"]), r) for r in results)
+    yield "%-18s %9s  %12s  %7s  %11s  %8s" % ("benchmark", "size", "wire bytes", "ratio", "ms/MB src", "reparse")
+    for shape in sorted(SHAPES):
+        for size in sorted(set(r["size"] for r in results if r["name"] == "reparse[%s]" % shape)):
+            base = by_key[("reparse[%s]" % shape, size)]
+            base_ms = base["p50_ms"] / (base["extra"]["bytes"] / 1e6)
+            for method in ["reparse"] + sorted(METHODS):
+                result = by_key.get(("%s[%s]" % (method, shape), size))
+                if result is None:
+                    continue
+                extra = result["extra"]
+                name = "%s[%s]" % (method, shape)
+                if "error" in extra:
+                    yield "%-18s %9d  %s" % (name, size, extra["error"])
+                    continue
+                ms = result["p50_ms"] / (extra["bytes"] / 1e6)
+                if "wire" in extra:
+                    yield "%-18s %9d  %12d  %6.2fx  %11.1f  %7.2fx" % (
+                        name, size, extra["wire"], float(extra["wire"]) / extra["bytes"], ms, ms / base_ms)
+                else:
+                    yield "%-18s %9d  %12s  %7s  %11.1f  %7.2fx" % (name, size, "-", "-", ms, ms / base_ms)
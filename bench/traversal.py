@@ -0,0 +1,72 @@
+# Traversal APIs on deep (n nested <div>s) and wide (n children) trees:
+# time to the first item of the parents and descendants generators against
+# exhausting them, and index, decode and decompose. The "traversal" report
+# flags APIs that recurse once per level on the Python stack or do work
+# proportional to the tree before their first item.
+
+from bench.fixtures import recursion_limited
+from bench.harness import benchmark, report
+from testkit.traversal import APIS, GENERATORS, TREES, frames_per_level, run_api
+
+# A generator is flagged when its first item got this many times slower
+# between the smallest and the largest size of the run.
+EAGER = 3.0
+
+
+def first(name):
+    def run(tree):
+        next(iter(APIS[name](*tree)), None)
+    return run
+
+
+def full(name):
+    def run(tree):
+        return {"items": sum(1 for _ in APIS[name](*tree))}
+    return run
+
+
+def call(name):
+    def run(tree):
+        run_api(name, *tree)
+    return run
+
+
+for _shape, _make in sorted(TREES.items()):
+    for _name in GENERATORS:
+        benchmark("%s_first[%s]" % (_name, _shape), "traversal", setup=_make)(first(_name))
+        benchmark("%s_all[%s]" % (_name, _shape), "traversal", setup=_make)(full(_name))
+    benchmark("index[%s]" % _shape, "traversal", setup=_make)(call("index"))
+    # str() of a deep tree hits the recursion limit at a few hundred levels
+    benchmark("decode[%s]" % _shape, "traversal", setup=_make)(recursion_limited(call("decode")))
+    benchmark("decompose[%s]" % _shape, "traversal", setup=_make, mutates=True)(call("decompose"))
+
+
+@report("traversal", "traversal")
+def report_traversal(results):
+    by_key = dict(((r["name"], r["size"]), r) for r in results)
+    yield "%-12s %-5s %9s  %12s  %12s  %7s" % ("generator", "tree", "size", "first item", "all items",
+                                               "share")
+    flagged = set()
+    for shape in sorted(TREES):
+        for name in GENERATORS:
+            firsts = []
+            for (key, size), result in sorted(by_key.items()):
+                if key != "%s_all[%s]" % (name, shape):
+                    continue
+                head = by_key.get(("%s_first[%s]" % (name, shape), size))
+                if head is None:
+                    continue
+                firsts.append(head["p50_ms"])
+                share = head["p50_ms"] / result["p50_ms"] if result["p50_ms"] else 0.0
+                yield "%-12s %-5s %9d  %9.4f ms  %9.4f ms  %6.1f%%" % (
+                    name, shape, size, head["p50_ms"], result["p50_ms"], 100.0 * share)
+            if len(firsts) > 1 and firsts[-1] > EAGER * firsts[0]:
+                flagged.add((name, "first item grows with %s trees" % shape))
+    yield ""
+    yield "%-12s %16s  %s" % ("api", "frames per level", "flags")
+    for name in sorted(APIS):
+        frames = frames_per_level(name)
+        flags = sorted(f for n, f in flagged if n == name)
+        if frames >= 0.5:
+            flags.insert(0, "recursive")
+        yield "%-12s %16.2f  %s" % (name, frames, ", ".join(flags))
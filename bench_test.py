@@ -0,0 +1,60 @@
+# This class is intended to test the benchmark suite itself:
+# every registered benchmark runs on a small document
+# results are reported with the expected fields
+# regressions against a baseline are detected
+
+import unittest
+
+from bench import harness
+import bench.suites  # noqa: F401 (registers benchmarks)
+
+
+class BenchTest(unittest.TestCase):
+
+    # every benchmark should run on a small generated document, and every
+    # report on the results
+    def test_benchmarks_run(self):
+        results = []
+        for b in harness.BENCHMARKS:
+            with self.subTest(benchmark=b.name):
+                result = harness.run_benchmark(b, 50, min_time=0, min_repeats=1, max_repeats=1)
+                results.append(result)
+                self.assertEqual(result["repeats"], 1)
+                self.assertGreater(result["ops_per_sec"], 0)
+                self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+                self.assertGreaterEqual(result["peak_bytes"], 0)
+                self.assertGreaterEqual(result["retained_bytes"], 0)
+        for name, lines in harness.run_reports(harness.select_reports(), results).items():
+            with self.subTest(report=name):
+                self.assertTrue(lines)
+
+    def test_percentile(self):
+        samples = [5, 1, 4, 2, 3]
+        self.assertEqual(harness.percentile(samples, 0.0), 1)
+        self.assertEqual(harness.percentile(samples, 0.5), 3)
+        self.assertEqual(harness.percentile(samples, 0.99), 5)
+
+    # only medians slower than the threshold count as regressions
+    def test_find_regressions(self):
+        baseline = [{"name": "a", "size": 10, "p50_ms": 1.0},
+                    {"name": "b", "size": 10, "p50_ms": 1.0}]
+        results = [{"name": "a", "size": 10, "p50_ms": 1.2},
+                   {"name": "b", "size": 10, "p50_ms": 1.5},
+                   {"name": "c", "size": 10, "p50_ms": 9.0}]
+        regressions = harness.find_regressions(results, baseline, 0.25)
+        self.assertEqual([(r[0]["name"], r[2]) for r in regressions], [("b", "p50_ms")])
+        self.assertAlmostEqual(regressions[0][3], 1.5)
+
+    # memory is compared when a memory threshold is given, above a floor
+    def test_find_memory_regressions(self):
+        baseline = [{"name": "a", "size": 10, "p50_ms": 1.0, "peak_bytes": 100000, "retained_bytes": 10},
+                    {"name": "b", "size": 10, "p50_ms": 1.0, "peak_bytes": 100000, "retained_bytes": 0}]
+        results = [{"name": "a", "size": 10, "p50_ms": 1.0, "peak_bytes": 200000, "retained_bytes": 50},
+                   {"name": "b", "size": 10, "p50_ms": 1.0, "peak_bytes": 110000, "retained_bytes": 500000}]
+        self.assertEqual(harness.find_regressions(results, baseline, 0.25), [])
+        regressions = harness.find_regressions(results, baseline, 0.25, memory_threshold=0.25)
+        self.assertEqual([(r[0]["name"], r[2]) for r in regressions], [("a", "peak_bytes"), ("b", "retained_bytes")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+# This class is intended to test bulk edits of wide tags: the helpers in
+# testkit.bulk against the one-child-at-a-time bs4 calls they replace
+# clear() and clear(decompose=True) of a tag, and of a wide tag
+# extend() with a list, a generator, another tag and its contents list
+# insert_all() at the start, in the middle and past the end
+# the helpers take time linear in the number of children
+
+import unittest
+
+from bs4 import Tag
+
+from testkit import bulk
+from testkit.backends import tree_lines
+from testkit.complexity import ScalingAssertions, doubling_sizes
+from testkit.documents import YANG_DOCUMENT, ZIYUAN_DOCUMENT
+from testkit.fixtures import snapshot
+from testkit.invariants import violations
+from testkit.traversal import wide_tree
+
+# Timings include the C memmove that makes bs4's one-child-at-a-time
+# versions slow on wide tags; the helpers move the children list once.
+SIZES = doubling_sizes(512, 8192)
+
+
+class BulkTest(ScalingAssertions, unittest.TestCase):
+
+    SIZES = SIZES
+
+    # run the bs4 edit on one copy and the bulk edit on another; both trees
+    # and every node the edit detached must be consistent and alike
+    def assertEditsLikeBs4(self, make, expected_edit, actual_edit):
+        expected, actual = make(), make()
+        expected_detached = expected_edit(expected) or []
+        actual_detached = actual_edit(actual) or []
+        self.assertEqual(str(actual), str(expected))
+        self.assertEqual(tree_lines(actual), tree_lines(expected))
+        self.assertEqual(violations(actual), [])
+        self.assertEqual(len(actual_detached), len(expected_detached))
+        for node, expected_node in zip(actual_detached, expected_detached):
+            self.assertEqual(node.__dict__ == {}, expected_node.__dict__ == {})
+            if node.__dict__:
+                self.assertIsNone(node.parent)
+                self.assertEqual(str(node), str(expected_node))
+                self.assertEqual(violations(node), [])
+        return actual
+
+    def test_clear(self):
+        for decompose in (False, True):
+            with self.subTest(decompose=decompose):
+                def edit(clear):
+                    def run(soup):
+                        children = list(soup.body.contents)
+                        clear(soup.body, decompose)
+                        return children
+                    return run
+                soup = self.assertEditsLikeBs4(lambda: snapshot(YANG_DOCUMENT),
+                                               edit(Tag.clear), edit(bulk.clear))
+                self.assertEqual(soup.body.contents, [])
+
+    def test_clear_wide(self):
+        for decompose in (False, True):
+            with self.subTest(decompose=decompose):
+                def edit(clear):
+                    def run(soup):
+                        children = list(soup.div.contents)
+                        clear(soup.div, decompose)
+                        return children
+                    return run
+                self.assertEditsLikeBs4(lambda: wide_tree(1000)[0], edit(Tag.clear), edit(bulk.clear))
+
+    # clear() empties the list callers already hold, as bs4 does
+    def test_clear_same_list(self):
+        soup = snapshot(YANG_DOCUMENT)
+        contents = soup.body.contents
+        bulk.clear(soup.body)
+        self.assertIs(soup.body.contents, contents)
+        self.assertEqual(contents, [])
+        bulk.clear(soup.body)
+
+    def test_extend(self):
+        sources = {
+            "list": lambda soup: [soup.new_tag("i"), "text", soup.new_tag("b")],
+            "generator": lambda soup: (soup.new_tag("i") for _ in range(3)),
+            "tag": lambda soup: soup.twochildren,
+        }
+        for name, source in sorted(sources.items()):
+            with self.subTest(source=name):
+                self.assertEditsLikeBs4(
+                    lambda: snapshot(YANG_DOCUMENT),
+                    lambda soup: soup.nochild.extend(source(soup)),
+                    lambda soup: bulk.extend(soup.nochild, source(soup)))
+
+    def test_extend_wide(self):
+        def make():
+            soup, _ = wide_tree(1000)
+            soup.body.append(soup.new_tag("section"))
+            return soup
+        soup = self.assertEditsLikeBs4(make, lambda soup: soup.section.extend(soup.div),
+                                       lambda soup: bulk.extend(soup.section, soup.div))
+        self.assertEqual(len(soup.section.contents), 1000)
+        self.assertEqual(soup.div.contents, [])
+
+    # moving another tag's children by passing its contents list moves all
+    # of them
+    def test_extend_contents(self):
+        soup = snapshot(YANG_DOCUMENT)
+        children = list(soup.grandchildren.contents)
+        bulk.extend(soup.nochild, soup.grandchildren.contents)
+        self.assertEqual(soup.grandchildren.contents, [])
+        self.assertEqual(soup.nochild.contents, children)
+        self.assertEqual(violations(soup), [])
+
+    # Tag.extend() appends from the list while append() removes from it,
+    # so it skips every other child in bs4 4.10
+    @unittest.expectedFailure
+    def test_bs4_extend_contents(self):
+        soup, _ = wide_tree(10)
+        soup.body.append(soup.new_tag("section"))
+        soup.section.extend(soup.div.contents)
+        self.assertEqual(len(soup.section.contents), 10)
+
+    def test_insert_all(self):
+        for position in (0, 1, 3, 99):
+            with self.subTest(position=position):
+                def expected(soup):
+                    for i, node in enumerate(["x", soup.new_tag("i"), "y"]):
+                        soup.body.insert(position + i, node)
+
+                self.assertEditsLikeBs4(
+                    lambda: snapshot(ZIYUAN_DOCUMENT), expected,
+                    lambda soup: bulk.insert_all(soup.body, position, ["x", soup.new_tag("i"), "y"]))
+
+    # one splice at 0 gives what a loop of insert(0, ...) gives backwards
+    def test_insert_all_start(self):
+        def expected(soup):
+            for node in reversed(soup.find_all("p")):
+                soup.div.insert(0, node.extract())
+
+        def actual(soup):
+            nodes = soup.find_all("p")
+            bulk.insert_all(soup.div, 0, nodes)
+
+        def make():
+            soup, _ = wide_tree(100)
+            soup.div.append(soup.new_tag("span"))
+            return soup
+        soup = self.assertEditsLikeBs4(make, expected, actual)
+        self.assertEqual(soup.div.contents[-1].name, "span")
+
+    def test_insert_all_itself(self):
+        soup = snapshot(ZIYUAN_DOCUMENT)
+        self.assertRaises(ValueError, bulk.insert_all, soup.body, 0, [soup.body])
+
+    # clear(decompose=True) walks the same list; bench/bulk.py times both
+    def test_clear_linear(self):
+        self.assertScales(lambda n: wide_tree(n)[0], lambda soup, n: bulk.clear(soup.div), 1)
+
+    def test_extend_linear(self):
+        def setup(n):
+            soup, _ = wide_tree(n)
+            soup.body.append(soup.new_tag("section"))
+            return soup
+        self.assertScales(setup, lambda soup, n: bulk.extend(soup.section, soup.div), 1)
+
+    def test_insert_all_linear(self):
+        def setup(n):
+            soup, _ = wide_tree(n)
+            return soup, [soup.new_tag("i") for _ in range(n)]
+        self.assertScales(setup, lambda state, n: bulk.insert_all(state[0].div, 0, state[1]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# This class is intended to test parsing documents given as bytes, the way
+# they come off the wire, against the str the fixtures pass:
+# UTF-8, UTF-16, Latin-1 and Shift-JIS, with and without a BOM and a
+# <meta charset>, with no hint, from_encoding and exclude_encodings
+# the tree is identical to the one parsed from the str
+# which encoding was detected, and that testkit.charsets.detect() decodes
+# as BeautifulSoup does
+# undeclared Shift-JIS, which needs a charset detector
+
+import unittest
+
+from bs4 import BeautifulSoup
+
+from testkit.backends import tree_lines
+from testkit.charsets import (HINTS, case_name, cases, detect, has_detector, hint_arguments, localize,
+                              replacement_quiet, to_bytes)
+from testkit.documents import FIXTURE_DOCUMENTS, generate_document
+
+DOCUMENTS = dict(FIXTURE_DOCUMENTS, generated=generate_document(1000))
+
+# Without a detector, bs4 only tries UTF-8 and Windows-1252 on undeclared
+# bytes; Shift-JIS is neither, so it ends up as UTF-8 with replacement
+# characters.
+needs_detector = (lambda test: test) if has_detector() else unittest.expectedFailure
+
+
+class CharsetsTest(unittest.TestCase):
+
+    def assertParsesLikeStr(self, markup, encoding, bom, hint):
+        data = to_bytes(markup, encoding, bom)
+        soup = BeautifulSoup(data, "html.parser", **hint_arguments(hint, encoding))
+        self.assertEqual(tree_lines(soup), tree_lines(BeautifulSoup(markup, "html.parser")))
+        self.assertEqual(soup.original_encoding, detect(data, hint, encoding).original_encoding)
+        return soup
+
+    # every case bs4 can decode without a detector
+    def test_bytes(self):
+        for encoding, bom, meta in cases():
+            for hint in HINTS:
+                if encoding == "shift_jis" and not meta and hint != "from_encoding":
+                    continue
+                for name, document in sorted(DOCUMENTS.items()):
+                    with self.subTest(case=case_name(encoding, bom, meta), hint=hint, document=name):
+                        self.assertParsesLikeStr(localize(document, encoding, meta), encoding, bom, hint)
+
+    def test_original_encoding(self):
+        markup = localize(DOCUMENTS["generated"], "latin-1")
+        self.assertEqual(self.assertParsesLikeStr(markup, "latin-1", False, "detect").original_encoding,
+                         "windows-1252")
+        self.assertEqual(self.assertParsesLikeStr(markup, "latin-1", False, "from_encoding").original_encoding,
+                         "latin-1")
+        markup = localize(DOCUMENTS["generated"], "shift_jis", meta=True)
+        self.assertEqual(self.assertParsesLikeStr(markup, "shift_jis", False, "detect").original_encoding,
+                         "shift_jis")
+        markup = localize(DOCUMENTS["generated"], "utf-16")
+        self.assertEqual(self.assertParsesLikeStr(markup, "utf-16", True, "detect").original_encoding,
+                         "utf-16le")
+        markup = localize(DOCUMENTS["generated"], "utf-8")
+        soup = self.assertParsesLikeStr(markup, "utf-8", True, "detect")
+        self.assertEqual(soup.original_encoding, "utf-8")
+        self.assertFalse(str(soup).startswith("﻿"))
+
+    # ASCII-only text decodes the same whatever bs4 guesses
+    def test_shift_jis_ascii(self):
+        markup = localize(FIXTURE_DOCUMENTS["mina"], "shift_jis")
+        self.assertNotIn("日本語", markup)
+        self.assertParsesLikeStr(markup, "shift_jis", False, "detect")
+
+    @needs_detector
+    def test_shift_jis_undeclared(self):
+        with replacement_quiet():
+            self.assertParsesLikeStr(localize(DOCUMENTS["generated"], "shift_jis"), "shift_jis", False, "detect")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# This class is intended to test how the following functionalities scale
+# with the number of children of a tag:
+# insert() (start, middle, out-of-range and negative positions)
+# append()
+# extend()
+# insert_before()
+# insert_after()
+#
+# Each test times n calls for growing n (1k to 16k by default; set
+# COMPLEXITY_MAX_N=262144 for a longer run), fits the exponent k in
+# time ~ n**k and fails if k goes above the bound declared for the API on
+# every one of a few attempts.
+
+import unittest
+
+from bs4 import BeautifulSoup
+
+from testkit.complexity import ScalingAssertions, doubling_sizes
+
+LINEAR_SIZES = doubling_sizes(1024, 16384)
+# Inserting before the last child shifts the children list after it. The
+# shift is a C memmove, small next to the Python work of each insert up to
+# these sizes, so Tag.insert() itself must stay linear here; far beyond them
+# the memmove takes over.
+SHIFT_SIZES = doubling_sizes(1024, 16384, env="COMPLEXITY_MAX_N_SHIFT")
+# Known-quadratic APIs run on smaller inputs to keep the suite fast; they
+# still catch anything worse than quadratic.
+QUADRATIC_SIZES = doubling_sizes(512, 4096, env="COMPLEXITY_MAX_N_QUADRATIC")
+
+
+def empty_div(n):
+    return BeautifulSoup("<div></div>", "html.parser").div
+
+
+def wide_div(n):
+    tag = empty_div(n)
+    tag.extend(["x"] * n)
+    return tag
+
+
+# the <p> from TestCase.soup in ziyuan_test.py, which the insert_before and
+# insert_after tests insert around
+def anchor_p(n):
+    return BeautifulSoup("<html><body><div><p>Hello World</p></div></body></html>", "html.parser").p
+
+
+class ComplexityTest(ScalingAssertions, unittest.TestCase):
+
+    SIZES = LINEAR_SIZES
+
+    # n appends: each one links the new string after the last child
+    def test_append(self):
+        def run(tag, n):
+            for _ in range(n):
+                tag.append(" test_append")
+        self.assertScales(empty_div, run, 1)
+
+    def test_extend(self):
+        def run(tag, n):
+            tag.extend([" test_expend"] * n)
+        self.assertScales(empty_div, run, 1)
+
+    # position 0 and the middle shift the children list on every call
+    def test_insert_start(self):
+        def run(tag, n):
+            for _ in range(n):
+                tag.insert(0, "test_insert_0 ")
+        self.assertScales(empty_div, run, 1, SHIFT_SIZES)
+
+    def test_insert_middle(self):
+        def run(tag, n):
+            for _ in range(n):
+                tag.insert(len(tag.contents) // 2, "test_insert_2 ")
+        self.assertScales(empty_div, run, 1, SHIFT_SIZES)
+
+    # a position past the end is clamped to an append
+    def test_insert_out_of_range(self):
+        def run(tag, n):
+            for _ in range(n):
+                tag.insert(len(tag.contents) + 10, "test_insert_10 ")
+        self.assertScales(empty_div, run, 1)
+
+    # on a tag with enough children a negative position counts from the
+    # end like list.insert (on a short tag it raises, see ziyuan_test.py)
+    def test_insert_negative(self):
+        def run(tag, n):
+            for _ in range(n):
+                tag.insert(-1, " test_insert_-1 ")
+        self.assertScales(wide_div, run, 1)
+
+    # insert_before looks its anchor up with index(), a linear scan, and the
+    # anchor moves right with every insertion
+    def test_insert_before(self):
+        def run(tag, n):
+            for _ in range(n):
+                tag.insert_before("test_insert_before ")
+        self.assertScales(anchor_p, run, 2, QUADRATIC_SIZES)
+
+    # the anchor stays first, so index() is cheap but the children list
+    # still shifts after it
+    def test_insert_after(self):
+        def run(tag, n):
+            for _ in range(n):
+                tag.insert_after(" test_insert_after")
+        self.assertScales(anchor_p, run, 1, SHIFT_SIZES)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+# This class is intended to test the generated documents:
+# generate_document() parses to the number of nodes it was asked for, in
+# whole sections, with every installed tree builder
+
+import unittest
+
+from testkit.backends import installed_backends
+from testkit.documents import SECTION_NODES, count_nodes, generate_document
+from testkit.fixtures import parsed
+
+
+class DocumentsTest(unittest.TestCase):
+
+    # the sections are the body; the builders differ in the tags around it
+    def test_generate_document_nodes(self):
+        for backend in installed_backends():
+            for nodes in (SECTION_NODES, 100, 1000):
+                with self.subTest(backend=backend, nodes=nodes):
+                    soup = parsed(generate_document(nodes), backend)
+                    self.assertEqual(count_nodes(soup.body), nodes // SECTION_NODES * SECTION_NODES)
+
+    def test_at_least_one_section(self):
+        self.assertEqual(count_nodes(parsed(generate_document(1)).body), SECTION_NODES)
+
+
+if __name__ == '__main__':
+    unittest.main()
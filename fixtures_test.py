@@ -0,0 +1,108 @@
+# This class is intended to test the parse-once fixture cache:
+# a snapshot is the same tree as a fresh parse
+# a snapshot shares no nodes with the cached tree
+# mutating a snapshot never changes the cached tree or later snapshots
+# the unit tests leave every cached document untouched
+# clearing the cache drops the parsed trees and the next use parses again
+
+import unittest
+
+from bs4 import BeautifulSoup
+
+import mina_test
+import yang_test
+import ziyuan_test
+from testkit.backends import tree_lines
+from testkit.documents import FIXTURE_DOCUMENTS, generate_document
+from testkit.fixtures import cached_documents, clear_cache, clone_tree, parsed, snapshot
+
+
+class FixturesTest(unittest.TestCase):
+
+    def test_snapshot_equal(self):
+        for name, markup in list(FIXTURE_DOCUMENTS.items()) + [("generated", generate_document(500))]:
+            with self.subTest(document=name):
+                fresh = BeautifulSoup(markup, "html.parser")
+                copy = snapshot(markup)
+                self.assertEqual(str(copy), str(fresh))
+                self.assertEqual(tree_lines(copy), tree_lines(fresh))
+
+    def test_snapshot_shares_nothing(self):
+        markup = FIXTURE_DOCUMENTS["yang"]
+        cached = set(map(id, parsed(markup).descendants))
+        copy = snapshot(markup)
+        self.assertFalse(cached & set(map(id, copy.descendants)))
+        self.assertIsNot(copy.a.attrs, parsed(markup).a.attrs)
+        self.assertIsNot(copy.a["class"], parsed(markup).a["class"])
+
+    # next_element, previous_element and the sibling links match the tree
+    def test_snapshot_links(self):
+        copy = snapshot(generate_document(500))
+        elements = list(copy.descendants)
+        for previous, node in zip(elements, elements[1:]):
+            self.assertIs(previous.next_element, node)
+            self.assertIs(node.previous_element, previous)
+        for tag in copy.find_all(True):
+            for previous, node in zip(tag.contents, tag.contents[1:]):
+                self.assertIs(previous.next_sibling, node)
+                self.assertIs(node.previous_sibling, previous)
+                self.assertIs(node.parent, tag)
+        self.assertIs(copy.html.parent, copy)
+
+    def test_snapshot_isolated(self):
+        markup = FIXTURE_DOCUMENTS["mina"]
+        before = str(parsed(markup))
+        copy = snapshot(markup)
+        copy.p.wrap(copy.new_tag("div"))
+        copy.b.extract()
+        copy.body.clear(True)
+        self.assertEqual(str(parsed(markup)), before)
+        self.assertEqual(str(snapshot(markup)), before)
+
+    # arguments are part of the cache key
+    def test_arguments_cached_separately(self):
+        markup = FIXTURE_DOCUMENTS["yang"]
+        self.assertEqual(snapshot(markup).a.get("rel"), ["nofollow"])
+        self.assertEqual(snapshot(markup, multi_valued_attributes=None).a.get("rel"), "nofollow")
+
+    def test_clear_cache(self):
+        markup = FIXTURE_DOCUMENTS["mina"]
+        before = parsed(markup)
+        self.assertIs(parsed(markup), before)
+        clear_cache()
+        self.assertEqual(cached_documents(), [])
+        after = parsed(markup)
+        self.assertIsNot(after, before)
+        self.assertIs(parsed(markup), after)
+        self.assertEqual(tree_lines(after), tree_lines(before))
+        self.assertEqual(len(cached_documents()), 1)
+
+    def test_clone_tag(self):
+        soup = snapshot(FIXTURE_DOCUMENTS["ziyuan"])
+        tag = clone_tree(soup.div)
+        self.assertIsNone(tag.parent)
+        self.assertEqual(str(tag), "<div><p>Hello World</p></div>")
+
+    # white box testing
+    # run the mutating unit tests twice; both runs pass and every cached
+    # tree still matches a fresh parse of its document
+    def test_no_leaks(self):
+        self.assertTrue(run_unit_tests().wasSuccessful())
+        self.assertTrue(run_unit_tests().wasSuccessful())
+        self.assertTrue(cached_documents())
+        for soup, (markup, parser, args, kwargs) in cached_documents():
+            fresh = BeautifulSoup(markup, parser, *args, **kwargs)
+            self.assertEqual(tree_lines(soup), tree_lines(fresh))
+
+
+def run_unit_tests():
+    suite = unittest.TestSuite()
+    for case in (mina_test.MyTestCase, yang_test.BS4Test, ziyuan_test.TestCase):
+        suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(case))
+    result = unittest.TestResult()
+    suite.run(result)
+    return result
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# This class is intended to test the find_all index:
+# the filters from test_find_all (string, regular expression, list, True)
+# class and id lookups
+# the mutations from mina_test.py (wrap, unwrap, extract, replace_with, smooth)
+# keep it in step with find_all, checked after random mutation sequences
+
+import random
+import re
+import unittest
+
+from testkit.documents import MINA_DOCUMENT, generate_document
+from testkit.fixtures import snapshot
+from testkit.index import SoupIndex
+
+QUERIES = [
+    (("b",), {}),
+    ((re.compile("^p"),), {}),
+    ((["b", "p"],), {}),
+    ((True,), {}),
+    (("div",), {"class_": "hit"}),
+    ((), {"class_": "boldest"}),
+    ((), {"class_": "class-a class-b"}),
+    ((), {"class_": re.compile("^sec")}),
+    ((), {"id": "s3"}),
+    (("a",), {"rel": "nofollow"}),
+    (("i",), {}),
+    ((True,), {"limit": 3}),
+]
+
+
+class IndexTest(unittest.TestCase):
+
+    def assertSameAsFindAll(self, index, soup, message=None):
+        for args, kwargs in QUERIES:
+            expected = soup.find_all(*args, **kwargs)
+            actual = index.find_all(*args, **kwargs)
+            self.assertEqual([id(t) for t in actual], [id(t) for t in expected],
+                             "%s %s %s" % (args, kwargs, message or ""))
+
+    def test_find_all(self):
+        soup = snapshot(MINA_DOCUMENT)
+        index = SoupIndex(soup)
+        self.assertEqual(str(index.find_all('b')), '[<b class="boldest">Extremely bold</b>]')
+        self.assertEqual(len(index), 4)
+        self.assertSameAsFindAll(index, soup)
+        soup = snapshot(generate_document(500, marked=0.3))
+        self.assertSameAsFindAll(SoupIndex(soup), soup)
+
+    # test_wrap, test_unwrap, test_extract and test_replace_with from mina_test.py
+    def test_mina_mutations(self):
+        soup = snapshot(MINA_DOCUMENT)
+        index = SoupIndex(soup)
+        index.wrap(soup.p, soup.new_tag("div"))
+        self.assertEqual(len(index.find_all("div")), 1)
+        index.unwrap(soup.b)
+        self.assertEqual(index.find_all("b"), [])
+        soup = snapshot(MINA_DOCUMENT)
+        index = SoupIndex(soup)
+        tag_b = index.extract(soup.b)
+        self.assertEqual(index.find_all("b"), [])
+        self.assertEqual(tag_b.string, "Extremely bold")
+        new_tag = soup.new_tag("i")
+        new_tag.string = "No longer bold"
+        index.replace_with(soup.p, new_tag, soup.new_tag("u"))
+        self.assertSameAsFindAll(index, soup)
+        self.assertEqual(len(index.find_all(["i", "u"])), 2)
+
+    # strings are not indexed, so these go to find_all
+    def test_string_queries(self):
+        soup = snapshot(MINA_DOCUMENT)
+        index = SoupIndex(soup)
+        self.assertEqual(index.find_all(string="Extremely bold"), ["Extremely bold"])
+        self.assertEqual(index.find_all(text=re.compile("bold")), ["Extremely bold"])
+        self.assertEqual(index.find_all("p", recursive=False), [])
+
+    # changes made around the index need invalidate()
+    def test_invalidate(self):
+        soup = snapshot(MINA_DOCUMENT)
+        index = SoupIndex(soup)
+        soup.p.append(soup.new_tag("i"))
+        index.invalidate()
+        self.assertEqual(len(index.find_all("i")), 1)
+        self.assertSameAsFindAll(index, soup)
+
+    # differential testing against find_all after every step of seeded
+    # random mutation sequences
+    def test_random_mutations(self):
+        for seed in range(5):
+            rng = random.Random(seed)
+            soup = snapshot(generate_document(300, marked=0.3))
+            index = SoupIndex(soup)
+            for step in range(60):
+                description = mutate(rng, soup, index)
+                self.assertSameAsFindAll(index, soup, "seed %d step %d: %s" % (seed, step, description))
+
+
+def new_tag(rng, soup):
+    name = rng.choice(["div", "i", "b", "section"])
+    tag = soup.new_tag(name, attrs={"class": rng.choice(["hit", "boldest", "hit news"])})
+    if rng.random() < 0.5:
+        tag.string = "new %s" % name
+    return tag
+
+
+def mutate(rng, soup, index):
+    tags = [t for t in soup.find_all(True) if t.parent is not None]
+    nodes = list(soup.body.descendants) if soup.body else tags
+    if not tags or not nodes:
+        return "nothing left"
+    action = rng.choice(["wrap", "unwrap", "extract", "replace_with", "move", "smooth"])
+    if action == "wrap":
+        index.wrap(rng.choice(nodes), new_tag(rng, soup))
+    elif action == "unwrap":
+        index.unwrap(rng.choice(tags))
+    elif action == "extract":
+        index.extract(rng.choice(nodes))
+    elif action == "replace_with":
+        index.replace_with(rng.choice(nodes), new_tag(rng, soup), "a", "b", new_tag(rng, soup))
+    elif action == "move":
+        # replace an element with a tag from elsewhere in the tree
+        target = rng.choice(nodes)
+        ancestors = set(map(id, target.parents))
+        movable = [t for t in tags if id(t) not in ancestors and t is not target]
+        if movable:
+            index.replace_with(target, rng.choice(movable))
+    else:
+        index.smooth()
+    return action
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# This class is intended to test the tree invariant checker:
+# parsed documents, from every installed tree builder, are consistent
+# each broken parent, sibling and element link is reported
+# nodes reachable twice (cycles, a node in two places) are reported
+# the check takes time linear in the size of the tree
+
+import unittest
+
+from bs4 import BeautifulSoup
+
+from testkit.backends import installed_backends
+from testkit.complexity import ScalingAssertions, doubling_sizes
+from testkit.documents import FIXTURE_DOCUMENTS, MINA_DOCUMENT, generate_document
+from testkit.fixtures import snapshot
+from testkit.invariants import violations
+
+
+class InvariantsTest(ScalingAssertions, unittest.TestCase):
+
+    SIZES = doubling_sizes(2048, 16384)
+
+    def assertBroken(self, soup, *fragments):
+        problems = violations(soup)
+        for fragment in fragments:
+            self.assertTrue(any(fragment in p for p in problems), "%r not in %s" % (fragment, problems))
+
+    def test_parsed_documents(self):
+        documents = dict(FIXTURE_DOCUMENTS, generated=generate_document(1000))
+        for name, markup in sorted(documents.items()):
+            for parser in installed_backends():
+                with self.subTest(document=name, parser=parser):
+                    self.assertEqual(violations(BeautifulSoup(markup, parser)), [])
+
+    # a detached subtree is a tree of its own, with nothing before or after it
+    def test_extracted_subtree(self):
+        soup = snapshot(MINA_DOCUMENT)
+        p = soup.p.extract()
+        self.assertEqual(violations(soup), [])
+        self.assertEqual(violations(p), [])
+        b = soup.new_tag("b")
+        b.append("detached")
+        self.assertEqual(violations(b), [])
+
+    def test_parent(self):
+        soup = snapshot(MINA_DOCUMENT)
+        soup.b.parent = soup.body
+        self.assertBroken(soup, "<b> under <p> has the wrong parent")
+
+    def test_siblings(self):
+        soup = snapshot(MINA_DOCUMENT)
+        soup.b.previous_sibling = None
+        self.assertBroken(soup, "<b> under <p> has the wrong previous_sibling")
+        soup = snapshot(MINA_DOCUMENT)
+        soup.p.contents[0].next_sibling = None
+        self.assertBroken(soup, "has the wrong next_sibling")
+        soup = snapshot(MINA_DOCUMENT)
+        soup.b.next_sibling = soup.p
+        self.assertBroken(soup, "<b> is the last child of <p> but has a next_sibling")
+
+    def test_elements(self):
+        soup = snapshot(MINA_DOCUMENT)
+        soup.b.next_element = None
+        self.assertBroken(soup, "<b> has the wrong next_element")
+        soup = snapshot(MINA_DOCUMENT)
+        soup.b.previous_element = soup.body
+        self.assertBroken(soup, "<b> has the wrong previous_element")
+        soup = snapshot(MINA_DOCUMENT)
+        list(soup.descendants)[-1].next_element = soup.p
+        self.assertBroken(soup, "ends the tree but has a next_element")
+
+    def test_reachable_twice(self):
+        soup = snapshot(MINA_DOCUMENT)
+        soup.body.contents.append(soup.b)
+        self.assertBroken(soup, "<b> is reachable twice")
+        # a cycle: the check must stop rather than loop forever
+        soup = snapshot(MINA_DOCUMENT)
+        soup.b.contents.append(soup.body)
+        self.assertBroken(soup, "<body> is reachable twice (under <b>)")
+
+    def test_linear(self):
+        self.assertScales(lambda n: BeautifulSoup(generate_document(n), "html.parser"),
+                          lambda soup, n: violations(soup), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
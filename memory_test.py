@@ -0,0 +1,98 @@
+# This class is intended to test memory use of the parse tree:
+# footprint of Tag and NavigableString nodes
+# decompose() and clear(True) free what they remove without the garbage collector
+# clear(False), extract() and replace_with() leave nothing reachable from the tree,
+# and what they remove is freed once the caller drops it
+
+import unittest
+
+from bs4 import BeautifulSoup
+
+from testkit.documents import MINA_DOCUMENT, generate_document
+from testkit.fixtures import snapshot
+from testkit.memory import bytes_per_node, footprint, reachable_ids, reclaimed, subtree
+
+
+def mina(select):
+    def make():
+        soup = snapshot(MINA_DOCUMENT)
+        return soup, select(soup)
+    return make
+
+
+# the five-children document from test_clear in yang_test.py; <e> is the
+# last node the parser created, which the soup keeps alive (see
+# test_extract_last_parsed_node), so it is not tracked
+def five_children():
+    soup = BeautifulSoup("<div><a></a><b></b>c<e></e></div>", "html.parser")
+    soup.div.insert(3, "d")
+    return soup, [n for n in soup.div.descendants if n is not soup.e]
+
+
+class MemoryTest(unittest.TestCase):
+
+    # Remove nodes from two copies of a document: check nothing in the first
+    # copy still links to them, then return how many of them stay alive in
+    # the second copy, with reference counting alone and after a collection.
+    def removal(self, make, remove):
+        soup, nodes = make()
+        remove(soup)
+        reachable = reachable_ids(soup)
+        self.assertEqual([n for n in nodes if id(n) in reachable], [])
+        soup, nodes = make()
+        return reclaimed(nodes, lambda: remove(soup))
+
+    def test_footprint(self):
+        soup = BeautifulSoup(generate_document(1000), "html.parser")
+        counts = footprint(soup)
+        self.assertEqual(counts["Tag"][0] + counts["NavigableString"][0], len(list(soup.descendants)))
+        per_node = bytes_per_node(soup)
+        # a typical generated page; a jump here means every node got bigger
+        self.assertGreater(per_node["Tag"], 0)
+        self.assertLess(per_node["Tag"], 2048)
+        self.assertGreater(per_node["NavigableString"], 0)
+        self.assertLess(per_node["NavigableString"], 1024)
+
+    # decompose() wipes every node, which breaks the parent/child cycles
+    def test_decompose(self):
+        without_gc, after_gc = self.removal(mina(lambda soup: subtree(soup.b)),
+                                            lambda soup: soup.b.decompose())
+        self.assertEqual(without_gc, 0)
+        self.assertEqual(after_gc, 0)
+
+    def test_clear_decompose(self):
+        without_gc, after_gc = self.removal(five_children, lambda soup: soup.div.clear(True))
+        self.assertEqual(without_gc, 0)
+        self.assertEqual(after_gc, 0)
+
+    def test_clear_extract(self):
+        _, after_gc = self.removal(five_children, lambda soup: soup.div.clear(False))
+        self.assertEqual(after_gc, 0)
+
+    # an extracted tag keeps its children, so the subtree is a reference
+    # cycle until the garbage collector runs
+    def test_extract(self):
+        _, after_gc = self.removal(mina(lambda soup: subtree(soup.b)),
+                                   lambda soup: soup.b.extract())
+        self.assertEqual(after_gc, 0)
+
+    def test_replace_with(self):
+        def replace(soup):
+            new_tag = soup.new_tag("i")
+            new_tag.string = "No longer bold"
+            soup.b.replace_with(new_tag)
+        _, after_gc = self.removal(mina(lambda soup: subtree(soup.b)), replace)
+        self.assertEqual(after_gc, 0)
+
+    # white box testing
+    # BeautifulSoup._most_recent_element still points at the last node the
+    # parser created, so removing that node does not free it
+    @unittest.expectedFailure
+    def test_extract_last_parsed_node(self):
+        _, after_gc = self.removal(mina(lambda soup: [soup.contents[-1]]),
+                                   lambda soup: soup.contents[-1].extract())
+        self.assertEqual(after_gc, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
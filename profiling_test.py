@@ -0,0 +1,172 @@
+# This class is intended to test per-test profiling:
+# which bs4 functions start parsing and which start tree operations
+# a function's time follows the entry point it was called from
+# the report and the comparison are deterministic and name functions by
+# stable paths
+# the runner writes one profile per test and the aggregate report
+# a test's profile includes the class fixtures set up before it
+
+import cProfile
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+import bs4
+from bs4 import BeautifulSoup
+
+from testkit import profiling, runner
+from testkit.documents import generate_document
+
+BS4 = os.path.dirname(bs4.__file__)
+
+
+def profile(func, *args):
+    profiler = cProfile.Profile()
+    profiler.runcall(func, *args)
+    return pstats.Stats(profiler)
+
+
+def shares_of(stats, name, module="bs4/element.py"):
+    return [share for func, share in profiling.contexts(stats).items()
+            if func[2] == name and profiling.label(func).startswith(module)]
+
+
+class ProfilingTest(unittest.TestCase):
+
+    def test_category(self):
+        def func(path, name):
+            return (os.path.join(BS4, *path.split("/")), 1, name)
+        self.assertEqual(profiling.category(func("__init__.py", "__init__")), "parsing")
+        self.assertEqual(profiling.category(func("__init__.py", "handle_starttag")), "parsing")
+        self.assertEqual(profiling.category(func("__init__.py", "decode")), "tree operations")
+        self.assertEqual(profiling.category(func("__init__.py", "__copy__")), None)
+        self.assertEqual(profiling.category(func("builder/_htmlparser.py", "feed")), "parsing")
+        self.assertEqual(profiling.category(func("element.py", "_find_all")), "tree operations")
+        self.assertEqual(profiling.category(func("formatter.py", "substitute")), "tree operations")
+        self.assertEqual(profiling.category((__file__, 1, "test_category")), None)
+        self.assertEqual(profiling.category(("~", 0, "<built-in method builtins.len>")), None)
+
+    # bs4 is found where it was imported from, not by a directory name
+    def test_dist_packages(self):
+        root = "/usr/lib/python3/dist-packages"
+        self.addCleanup(setattr, profiling, "_LIBRARY_ROOTS", profiling._LIBRARY_ROOTS)
+        profiling._LIBRARY_ROOTS = [root + "/"]
+        func = (root + "/bs4/element.py", 12, "_find_all")
+        self.assertEqual(profiling.category(func), "tree operations")
+        self.assertEqual(profiling.label(func), "bs4/element.py:12(_find_all)")
+        self.assertEqual(profiling._library_roots()[0], os.path.dirname(BS4).replace(os.sep, "/") + "/")
+
+    def test_label(self):
+        self.assertEqual(profiling.label((os.path.join(BS4, "element.py"), 12, "find_all")),
+                         "bs4/element.py:12(find_all)")
+        self.assertEqual(profiling.label((os.path.abspath("profiling_test.py"), 3, "f")),
+                         "profiling_test.py:3(f)")
+        self.assertEqual(profiling.label(("~", 0, "<built-in method builtins.len>")),
+                         "<built-in method builtins.len>")
+
+    # Tag.__init__ is parsing when the parser creates tags and a tree
+    # operation when new_tag does
+    def test_outermost_entry_point(self):
+        markup = generate_document(200)
+        stats = profile(BeautifulSoup, markup, "html.parser")
+        for share in shares_of(stats, "__init__"):
+            self.assertEqual(set(share), {"parsing"})
+        soup = BeautifulSoup(markup, "html.parser")
+        stats = profile(lambda: [soup.new_tag("b") for _ in range(10)] and soup.find_all("a"))
+        for share in shares_of(stats, "__init__") + shares_of(stats, "_find_all"):
+            self.assertEqual(set(share), {"tree operations"})
+
+    # a function called from both sides is split by the time spent under each
+    def test_mixed(self):
+        def both(markup):
+            soup = BeautifulSoup(markup, "html.parser")
+            for _ in range(200):
+                soup.new_tag("b")
+        stats = profile(both, generate_document(200))
+        shares = shares_of(stats, "__init__")
+        self.assertTrue(any(0 < s.get("parsing", 0) < 1 for s in shares))
+        for share in shares:
+            self.assertAlmostEqual(sum(share.values()), 1.0)
+        times = profiling.split(stats)
+        self.assertGreater(sum(t for t, _ in times["parsing"].values()), 0)
+        self.assertGreater(sum(t for t, _ in times["tree operations"].values()), 0)
+        # the calls follow the callers: new_tag made 200 of Tag.__init__'s
+        tag_init = [f for f, entry in stats.stats.items()
+                    if f[2] == "__init__" and any(caller[2] == "new_tag" for caller in entry[4])]
+        self.assertEqual(len(tag_init), 1)
+        function = profiling.label(tag_init[0])
+        self.assertAlmostEqual(times["tree operations"][function][1], 200)
+        self.assertAlmostEqual(times["parsing"][function][1], stats.stats[tag_init[0]][1] - 200)
+
+    def test_report_deterministic(self):
+        stats = profile(lambda: BeautifulSoup(generate_document(100), "html.parser").find_all("p"))
+        lines = profiling.report(stats, top=5)
+        self.assertEqual(lines, profiling.report(stats, top=5))
+        self.assertEqual([line.split()[0] for line in lines[1:4]], ["parsing", "tree", "other"])
+        self.assertIn("== parsing, top 5", lines)
+        self.assertIn("== tree operations, top 5", lines)
+        self.assertEqual(len(lines), 4 + 2 * 8)
+
+    # the function that got slower comes first
+    def test_compare(self):
+        markup = generate_document(100)
+        soup = BeautifulSoup(markup, "html.parser")
+        old = profile(lambda: soup.find_all("p"))
+        new = profile(lambda: [soup.find_all("p") for _ in range(20)])
+        lines = profiling.compare(old, new, top=3)
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith("tree operations"))
+        self.assertTrue(lines[1].split()[4].startswith("+"))
+        for line in profiling.compare(old, old, top=3)[1:]:
+            self.assertIn(" +0.000 ", line)
+
+    def test_runner(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        records = runner.run_tests(["mina_test"], 2, profile_dir=directory)
+        self.assertTrue(runner.was_successful(records))
+        for record in records:
+            self.assertEqual(record["profile"], os.path.join(directory, record["id"] + ".prof"))
+            self.assertTrue(os.path.exists(record["profile"]))
+        path = profiling.write_report(directory, [r["profile"] for r in records], top=10)
+        with open(path) as f:
+            report = f.read()
+        self.assertIn("bs4/element.py", report)
+        self.assertIn("(_find_all)", report)
+        self.assertTrue(os.path.exists(os.path.join(directory, profiling.AGGREGATE)))
+        self.assertEqual(profiling.report(profiling.load(directory), top=10), report.splitlines())
+        self.assertNotIn("profile", runner.run_tests(["mina_test"], 1)[0])
+
+    def test_class_fixtures(self):
+        def class_fixture():
+            return BeautifulSoup(generate_document(50), "html.parser")
+
+        class FixtureCase(unittest.TestCase):
+
+            @classmethod
+            def setUpClass(cls):
+                cls.soup = class_fixture()
+
+            def test_first(self):
+                self.soup.find_all("p")
+
+            def test_second(self):
+                self.soup.find_all("p")
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        result = runner.RecordingResult(directory)
+        result.startTestRun()
+        try:
+            unittest.TestSuite([FixtureCase("test_first"), FixtureCase("test_second")]).run(result)
+        finally:
+            result.stopTestRun()
+        first, second = [pstats.Stats(r["profile"]).stats for r in result.records]
+        self.assertIn("class_fixture", [f[2] for f in first])
+        self.assertNotIn("class_fixture", [f[2] for f in second])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# This class is intended to test the sharded test runner:
+# shards are balanced by the previous run's durations
+# a sharded run gives the same results as unittest
+# the summary and JUnit XML count every outcome
+# peak RSS is measured per test, not for the whole worker
+
+import os
+import unittest
+from xml.etree import ElementTree
+
+import mina_test
+from testkit import runner
+
+
+class RunnerTest(unittest.TestCase):
+
+    def test_module_names(self):
+        self.assertEqual(runner.module_names(["mina_test.py", "yang_test", "testkit/runner.py"]),
+                         ["mina_test", "yang_test", "testkit.runner"])
+
+    # every test lands in exactly one shard, in load order
+    def test_shard_covers_all(self):
+        ids = ["t%d" % i for i in range(10)]
+        shards = runner.shard(ids, 3)
+        self.assertEqual(len(shards), 3)
+        self.assertEqual(sorted(t for s in shards for t in s), sorted(ids))
+        for s in shards:
+            self.assertEqual(s, sorted(s, key=ids.index))
+
+    # one slow test gets a shard to itself
+    def test_shard_balanced_by_durations(self):
+        durations = {"slow": 3.0, "a": 1.0, "b": 1.0, "c": 1.0}
+        shards = runner.shard(["a", "b", "slow", "c"], 2, durations)
+        self.assertIn(["slow"], shards)
+        self.assertIn(["a", "b", "c"], shards)
+
+    def test_shard_more_jobs_than_tests(self):
+        self.assertEqual(runner.shard(["a", "b"], 8), [["a"], ["b"]])
+        self.assertEqual(runner.shard([], 4), [])
+
+    # the same outcomes as unittest itself
+    def test_matches_unittest(self):
+        expected = unittest.TestResult()
+        unittest.defaultTestLoader.loadTestsFromModule(mina_test).run(expected)
+        records = runner.run_tests(["mina_test"], 2)
+        self.assertEqual(len(records), expected.testsRun)
+        self.assertEqual(runner.was_successful(records), expected.wasSuccessful())
+        self.assertEqual(runner.count(records, "expected_failure"), len(expected.expectedFailures))
+        self.assertEqual(runner.count(records, "skipped"), len(expected.skipped))
+        for record in records:
+            self.assertGreaterEqual(record["time"], 0)
+            self.assertGreater(record["peak_rss_kib"], 0)
+
+    # the small test after the large one reports its own, lower peak
+    @unittest.skipUnless(os.path.exists(runner.PROC_CLEAR_REFS), "no per-test RSS on this platform")
+    def test_peak_rss_per_test(self):
+        # one test that touches 64 MiB, then one that does not
+        class MemoryCase(unittest.TestCase):
+
+            def test_large(self):
+                self.assertEqual(len(b"x" * (64 * 1024 * 1024)), 64 * 1024 * 1024)
+
+            def test_small(self):
+                pass
+
+        result = runner.RecordingResult()
+        unittest.TestSuite([MemoryCase("test_large"), MemoryCase("test_small")]).run(result)
+        large, small = [r["peak_rss_kib"] for r in result.records]
+        self.assertGreater(large - small, 32 * 1024)
+
+    def test_summary_and_junit(self):
+        records = [
+            {"id": "m.C.test_a", "outcome": "passed", "problems": [], "time": 0.5, "peak_rss_kib": 1},
+            {"id": "m.C.test_b", "outcome": "failure", "time": 0.1, "peak_rss_kib": 1,
+             "problems": [("failure", "test_b", "trace 1"), ("failure", "test_b (i=1)", "trace 2")]},
+            {"id": "m.D.test_c", "outcome": "skipped", "problems": [], "time": 0.0,
+             "peak_rss_kib": 1, "reason": "not installed"},
+        ]
+        self.assertFalse(runner.was_successful(records))
+        self.assertEqual(runner.summary(records, 1.0),
+                         ["Ran 3 tests in 1.000s", "", "FAILED (failures=2, skipped=1)"])
+        root = ElementTree.fromstring(runner.junit_xml(records, 1.0))
+        self.assertEqual(root.get("tests"), "3")
+        self.assertEqual(root.get("failures"), "2")
+        self.assertEqual(len(root.findall("testsuite/testcase")), 3)
+        self.assertEqual(len(root.findall("testsuite/testcase/failure")), 2)
+        self.assertEqual(len(root.findall("testsuite/testcase/skipped")), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+# This class is intended to test serializing a tree in chunks with
+# testkit.serialize, as the str(tag) assertions in yang_test.py and
+# mina_test.py serialize it whole:
+# the chunks join to exactly decode(), encode() and prettify() with every
+# formatter, on the fixtures, entity-heavy text and every installed parser
+# chunks keep to the requested size
+# output can be written to a file or a socket
+# peak memory does not grow with the document, and trees too deep for
+# decode() can still be written
+
+import io
+import socket
+import tempfile
+import threading
+import unittest
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from testkit.backends import installed_backends
+from testkit.documents import FIXTURE_DOCUMENTS, entity_document
+from testkit.fixtures import parsed
+from testkit.memory import peak_bytes
+from testkit.serialize import CHUNK_SIZE, FORMATTERS, chunks, fragments, write
+from testkit.traversal import deep_tree
+
+# <pre> and <textarea> keep their whitespace when prettified, and void
+# elements have no closing tag.
+WHITESPACE_DOCUMENT = ("<html><body><pre>\n  a <b> x </b>\n</pre><textarea> t </textarea>"
+                       "<p></p><p>x<br>y</p><img src='a&b'></body></html>")
+
+DOCUMENTS = dict(FIXTURE_DOCUMENTS, entity=entity_document(200), whitespace=WHITESPACE_DOCUMENT)
+
+
+class SerializeTest(unittest.TestCase):
+
+    # `soup` and up to `tags` of its tags, serialized in pieces, against bs4
+    def assertSerializesLikeBs4(self, soup, tags=10):
+        for tag in [soup] + soup.find_all(True)[:tags]:
+            for formatter in FORMATTERS:
+                with self.subTest(tag=tag.name, formatter=formatter):
+                    self.assertEqual("".join(fragments(tag, formatter=formatter)),
+                                     tag.decode(formatter=formatter))
+                    self.assertEqual("".join(fragments(tag, True, formatter)),
+                                     tag.prettify(formatter=formatter))
+                    for encoding in ("utf-8", "latin-1", "ascii"):
+                        self.assertEqual(b"".join(chunks(tag, encoding, formatter=formatter, chunk_size=64)),
+                                         tag.encode(encoding, formatter=formatter))
+                        self.assertEqual(b"".join(chunks(tag, encoding, True, formatter, chunk_size=64)),
+                                         tag.prettify(encoding, formatter))
+
+    def test_documents(self):
+        for name, document in sorted(DOCUMENTS.items()):
+            with self.subTest(document=name):
+                self.assertSerializesLikeBs4(parsed(document))
+
+    def test_backends(self):
+        for backend in installed_backends():
+            with self.subTest(backend=backend):
+                self.assertSerializesLikeBs4(parsed(entity_document(100), backend))
+
+    # the XML declaration names the encoding, as BeautifulSoup.decode()
+    # writes it
+    def test_xml(self):
+        try:
+            soup = BeautifulSoup("<root><a x='1 &amp; 2'>café</a><empty/></root>", "xml")
+        except FeatureNotFound:
+            self.skipTest("no XML parser installed")
+        self.assertEqual("".join(fragments(soup)), soup.decode())
+        self.assertEqual("".join(fragments(soup, True)), soup.prettify())
+        self.assertEqual(b"".join(chunks(soup, "latin-1")), soup.encode("latin-1"))
+
+    # test_insert in ziyuan_test.py
+    def test_ziyuan(self):
+        soup = parsed(FIXTURE_DOCUMENTS["ziyuan"])
+        p = BeautifulSoup(str(soup.p), "html.parser").p
+        p.insert(0, "test_insert_1 test_insert_2 ")
+        p.append("<p>")
+        self.assertEqual("".join(fragments(p)), "<p>test_insert_1 test_insert_2 Hello World&lt;p&gt;</p>")
+
+    def test_chunk_size(self):
+        soup = parsed(entity_document(2000))
+        text = str(soup)
+        parts = list(chunks(soup, chunk_size=1000))
+        self.assertEqual("".join(parts), text)
+        self.assertGreater(len(parts), len(text) // 2000)
+        longest_piece = max(len(piece) for piece in fragments(soup))
+        for part in parts[:-1]:
+            self.assertGreaterEqual(len(part), 1000)
+            self.assertLess(len(part), 1000 + longest_piece)
+        self.assertEqual(list(chunks(BeautifulSoup("", "html.parser"))), [])
+
+    def test_write_file(self):
+        soup = parsed(entity_document(500))
+        text = io.StringIO()
+        self.assertEqual(write(soup, text, chunk_size=100), len(str(soup)))
+        self.assertEqual(text.getvalue(), str(soup))
+        with tempfile.TemporaryFile() as out:
+            self.assertEqual(write(soup, out, "utf-8", pretty_print=True, formatter="html"),
+                             len(soup.prettify("utf-8", "html")))
+            out.seek(0)
+            self.assertEqual(out.read(), soup.prettify("utf-8", "html"))
+
+    def test_write_socket(self):
+        soup = parsed(entity_document(2000))
+        received = []
+        sender, receiver = socket.socketpair()
+
+        def read():
+            while True:
+                data = receiver.recv(CHUNK_SIZE)
+                if not data:
+                    break
+                received.append(data)
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            written = write(soup, sender, "utf-8", chunk_size=4096)
+        finally:
+            sender.close()
+            reader.join()
+            receiver.close()
+        self.assertEqual(b"".join(received), soup.encode("utf-8"))
+        self.assertEqual(written, len(soup.encode("utf-8")))
+
+    # what streaming holds at once is a chunk and the path to the current
+    # node, while str() builds the whole document
+    def test_peak_memory(self):
+        peaks = []
+        for size in (2000, 8000):
+            soup = parsed(entity_document(size))
+            with tempfile.TemporaryFile() as out:
+                written, peak = peak_bytes(write, soup, out, "utf-8", False, "minimal", 256)
+            peaks.append(peak)
+            self.assertLess(peak, written / 4)
+        self.assertLess(peaks[1], peaks[0] * 2)
+        self.assertGreater(peak_bytes(str, soup)[1], written)
+
+    # decode() recurses for every level; streaming has no such limit
+    def test_deep(self):
+        soup, _ = deep_tree(5000)
+        self.assertRaises(RecursionError, str, soup)
+        text = "".join(fragments(soup))
+        self.assertEqual(text.count("<div>"), 5000)
+        self.assertTrue(text.endswith("leaf" + "</div>" * 5000 + "</body></html>"))
+        self.assertEqual("".join(fragments(deep_tree(100)[0], True)), deep_tree(100)[0].prettify())
+
+
+if __name__ == '__main__':
+    unittest.main()
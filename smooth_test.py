@@ -0,0 +1,114 @@
+# This class is intended to test smooth() and text extraction on tags with
+# many adjacent string fragments, as loops of append() leave them:
+# merging runs of fragments in the tag and in nested tags, never across a
+# tag or into a comment
+# testkit.text.smooth() gives the same tree as Tag.smooth()
+# .string and get_text() before and after smoothing
+# smoothing frees the fragments and shrinks the tree
+# testkit.text.smooth() and get_text() take time linear in the fragments
+
+import unittest
+
+from bs4 import Comment
+
+from testkit.backends import tree_lines
+from testkit.complexity import ScalingAssertions, doubling_sizes
+from testkit.documents import MINA_DOCUMENT
+from testkit.fixtures import snapshot
+from testkit.invariants import violations
+from testkit.memory import Tracker, footprint
+from testkit.text import FRAGMENT, fragmented, smooth
+
+SIZES = doubling_sizes(512, 8192)
+QUADRATIC_SIZES = doubling_sizes(256, 2048)
+
+
+class SmoothTest(ScalingAssertions, unittest.TestCase):
+
+    SIZES = SIZES
+
+    # both smooth() implementations on copies of the same tree
+    def assertSmoothsLikeBs4(self, make):
+        expected, actual = make(), make()
+        expected.smooth()
+        smooth(actual)
+        self.assertEqual(tree_lines(actual), tree_lines(expected))
+        self.assertEqual(str(actual), str(expected))
+        self.assertEqual(violations(expected), [])
+        self.assertEqual(violations(actual), [])
+        return actual
+
+    # test_smooth in mina_test.py
+    def test_mina(self):
+        def make():
+            soup = snapshot(MINA_DOCUMENT)
+            soup.b.append(", an added part")
+            return soup
+        soup = self.assertSmoothsLikeBs4(make)
+        self.assertEqual(soup.b.string, "Extremely bold, an added part")
+
+    def test_fragments(self):
+        soup = self.assertSmoothsLikeBs4(lambda: fragmented(1000))
+        self.assertEqual(len(soup.div.contents), 1)
+        self.assertEqual(soup.div.string, FRAGMENT * 1000)
+
+    # runs are merged inside every tag, but a tag or a comment ends a run
+    def test_nested(self):
+        soup = self.assertSmoothsLikeBs4(lambda: fragmented(32, nested=True))
+        self.assertEqual([type(c).__name__ for c in soup.div.contents[:5]],
+                         ["NavigableString", "Tag", "NavigableString", "Comment", "NavigableString"])
+        self.assertEqual(soup.div.contents[0], FRAGMENT * 3)
+        self.assertEqual(soup.b.contents[0], FRAGMENT * 2)
+        self.assertEqual(soup.i.string, FRAGMENT * 3)
+        self.assertEqual(soup.b.contents[-1], FRAGMENT)
+        # the last run of one block runs into the first run of the next
+        self.assertEqual(soup.div.contents[4], FRAGMENT * 7)
+        self.assertEqual(len(soup.find_all(string=lambda s: isinstance(s, Comment))), 2)
+
+    def test_no_fragments(self):
+        self.assertSmoothsLikeBs4(lambda: snapshot(MINA_DOCUMENT))
+        soup = fragmented(1)
+        smooth(soup)
+        self.assertEqual(soup.div.contents, [FRAGMENT])
+
+    # .string only sees a single child; get_text() does not change
+    def test_text(self):
+        soup = fragmented(1000, nested=True)
+        text = soup.get_text()
+        self.assertIsNone(soup.div.string)
+        self.assertIsNone(soup.i.string)
+        smooth(soup)
+        self.assertEqual(soup.get_text(), text)
+        self.assertEqual(soup.i.string, FRAGMENT * 3)
+
+    def test_memory(self):
+        for name, run in (("Tag.smooth", lambda soup: soup.smooth()), ("smooth", smooth)):
+            with self.subTest(smooth=name):
+                soup = fragmented(1000)
+                count, before = footprint(soup)["NavigableString"]
+                self.assertEqual(count, 1000)
+                tracker = Tracker(soup.div.contents)
+                run(soup)
+                count, after = footprint(soup)["NavigableString"]
+                self.assertEqual(count, 1)
+                self.assertLess(after, before / 2)
+                # nothing links to the fragments any more, so reference
+                # counting alone frees them
+                self.assertEqual(tracker.alive(), 0)
+
+    def test_smooth_linear(self):
+        self.assertScales(fragmented, lambda soup, n: smooth(soup), 1)
+        self.assertScales(lambda n: fragmented(n, nested=True), lambda soup, n: smooth(soup), 1)
+
+    def test_get_text_linear(self):
+        self.assertScales(fragmented, lambda soup, n: soup.get_text(), 1)
+
+    # Tag.smooth() merges one pair at a time, with an index() lookup and a
+    # copy of the text so far for each, so it is quadratic in bs4 4.10
+    @unittest.expectedFailure
+    def test_bs4_smooth_linear(self):
+        self.assertScales(fragmented, lambda soup, n: soup.smooth(), 1, QUADRATIC_SIZES)
+
+
+if __name__ == '__main__':
+    unittest.main()
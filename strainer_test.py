@@ -0,0 +1,77 @@
+# This class is intended to test partial parsing with SoupStrainer:
+# the filters from test_find_all (string, regular expression, list, True)
+# attribute filters, including multi-valued attributes like class
+# string filters
+# each one must give the same result as find_all on a full parse
+
+import re
+import unittest
+
+from bs4 import BeautifulSoup
+
+from testkit.backends import installed_backends
+from testkit.documents import FIXTURE_DOCUMENTS, generate_document
+from testkit.strainer import STRAINING_BACKENDS, strained_find_all, strainer_for
+
+FILTERS = [
+    # test_find_all in mina_test.py
+    (("b",), {}),
+    ((re.compile("^p"),), {}),
+    ((["b", "p"],), {}),
+    ((True,), {}),
+    # attributes, from test_get in yang_test.py
+    (("a",), {"id": "34df9e"}),
+    ((), {"class_": "class-b"}),
+    ((), {"class_": "class-a class-b"}),
+    (("a",), {"rel": "nofollow"}),
+    ((), {"class_": re.compile("^bold")}),
+    (("div",), {"class_": "news"}),
+    # strings
+    ((), {"string": "Extremely bold"}),
+    ((), {"string": re.compile("Hello")}),
+]
+
+
+class StrainerTest(unittest.TestCase):
+
+    def test_same_as_full_parse(self):
+        documents = dict(FIXTURE_DOCUMENTS, generated=generate_document(500))
+        backends = [b for b in installed_backends() if b in STRAINING_BACKENDS]
+        for backend in backends:
+            for name, markup in documents.items():
+                full = BeautifulSoup(markup, backend)
+                for args, kwargs in FILTERS:
+                    with self.subTest(backend=backend, document=name, args=args, kwargs=kwargs):
+                        expected = [str(x) for x in full.find_all(*args, **kwargs)]
+                        actual = [str(x) for x in strained_find_all(markup, *args, parser=backend, **kwargs)]
+                        self.assertEqual(actual, expected)
+
+    # the strained tree only holds the matching tags
+    def test_strained_tree_is_smaller(self):
+        markup = generate_document(900, marked=0.1)
+        full = BeautifulSoup(markup, "html.parser")
+        strained = BeautifulSoup(markup, "html.parser", parse_only=strainer_for("div", class_="hit"))
+        self.assertLess(len(list(strained.descendants)), len(list(full.descendants)) / 2)
+        self.assertEqual(len(strained.find_all("div")), len(full.find_all("div", class_="hit")))
+
+    # plain SoupStrainer sees class="section news" unsplit while parsing
+    def test_multi_valued_attribute(self):
+        markup = '<div class="section news">x</div><div class="sport">y</div>'
+        self.assertEqual(str(BeautifulSoup(markup, "html.parser", parse_only=strainer_for(class_="news"))),
+                         '<div class="section news">x</div>')
+
+    # text= is the older spelling of string=, limit does not affect which tags match
+    def test_find_all_arguments(self):
+        markup = FIXTURE_DOCUMENTS["mina"]
+        self.assertEqual(strained_find_all(markup, text="Extremely bold"), ["Extremely bold"])
+        self.assertEqual(len(strained_find_all(markup, True, limit=1)), 1)
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            strainer_for("b", recursive=False)
+        with self.assertRaises(ValueError):
+            strained_find_all(FIXTURE_DOCUMENTS["mina"], "b", parser="html5lib")
+
+
+if __name__ == '__main__':
+    unittest.main()
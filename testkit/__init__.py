@@ -0,0 +1,2 @@
+# Shared helpers for the test and benchmark suites: generated documents and
+# other utilities that are not tests themselves.
@@ -0,0 +1,28 @@
+# The two ways bs4 can parse multi-valued attributes (class, rel,
+# accesskey, ...): split into lists of tokens, the default, or kept as the
+# strings in the markup with multi_valued_attributes=None.
+#
+# The choice changes lookups as well as cost. With strings,
+# find_all(class_="c3") only matches tags whose whole class attribute is
+# "c3", where the default matches every tag that has c3 among its
+# classes. has_class() matches a class token the same way in both modes,
+# as CSS selectors (select(".c3")) do.
+
+from bs4 import BeautifulSoup
+
+MODES = {
+    "default": {},
+    "none": {"multi_valued_attributes": None},
+}
+
+
+def parse(markup, mode, parser="html.parser"):
+    return BeautifulSoup(markup, parser, **MODES[mode])
+
+
+# A class_ filter for tags with the class `token`, whether the attribute
+# was split into tokens or kept as one string.
+def has_class(token):
+    def match(value):
+        return value is not None and token in value.split()
+    return match
@@ -0,0 +1,81 @@
+# Tree builder matrix: which HTML parsers are installed, per-backend copies
+# of the unit test cases, and a structural diff between the trees two
+# backends build from the same document.
+
+import difflib
+import functools
+import unittest
+
+from bs4 import BeautifulSoup, NavigableString
+from bs4.builder import builder_registry
+
+# The HTML tree builders bs4 knows about. The reference backend is the one
+# the fixtures have always used.
+HTML_BACKENDS = ("html.parser", "lxml", "html5lib")
+REFERENCE_BACKEND = "html.parser"
+
+
+def is_installed(backend):
+    return builder_registry.lookup(backend) is not None
+
+
+def installed_backends():
+    return [b for b in HTML_BACKENDS if is_installed(b)]
+
+
+# Render a tree as one line per node, indented by depth, in document order.
+# Strings are shown with repr() so whitespace differences are visible, unless
+# `strip_whitespace` drops whitespace-only strings altogether.
+def tree_lines(soup, strip_whitespace=False):
+    depths = {id(soup): -1}
+    lines = []
+    for node in soup.descendants:
+        depth = depths[id(node.parent)] + 1
+        if isinstance(node, NavigableString):
+            if strip_whitespace and not node.strip():
+                continue
+            lines.append("  " * depth + "%s %r" % (type(node).__name__, str(node)))
+        else:
+            depths[id(node)] = depth
+            attrs = "".join(' %s=%r' % (k, node.attrs[k]) for k in sorted(node.attrs))
+            lines.append("  " * depth + "<%s%s>" % (node.name, attrs))
+    return lines
+
+
+# A unified diff of the trees `backend` and `reference` build from `markup`,
+# or an empty list when they are identical.
+def tree_diff(markup, backend, reference=REFERENCE_BACKEND, strip_whitespace=False):
+    expected = tree_lines(BeautifulSoup(markup, reference), strip_whitespace)
+    actual = tree_lines(BeautifulSoup(markup, backend), strip_whitespace)
+    return list(difflib.unified_diff(expected, actual, reference, backend, lineterm=""))
+
+
+# Add a copy of the test case `case` to `namespace` for every backend other
+# than the one it already uses. The copies are named `<case>_<backend>`,
+# with non-word characters replaced, and set the `parser` class attribute
+# the fixture factories read. Copies for backends that are not installed
+# are skipped. `expected_failures` maps a backend to the test methods whose
+# assertions depend on html.parser's tree.
+def add_backend_cases(namespace, case, expected_failures=None):
+    expected_failures = expected_failures or {}
+    for backend in HTML_BACKENDS:
+        if backend == case.parser:
+            continue
+        attrs = {"parser": backend}
+        for name in expected_failures.get(backend, ()):
+            attrs[name] = unittest.expectedFailure(_copy_test(getattr(case, name)))
+        name = "%s_%s" % (case.__name__, "".join(c if c.isalnum() else "_" for c in backend))
+        copy = type(name, (case,), attrs)
+        copy.__module__ = namespace["__name__"]
+        if not is_installed(backend):
+            copy = unittest.skip("%s is not installed" % backend)(copy)
+        namespace[name] = copy
+
+
+# expectedFailure marks the function it is given, so wrap the inherited
+# test first to keep the original case unmarked.
+def _copy_test(test):
+    @functools.wraps(test)
+    def copy(self):
+        return test(self)
+    return copy
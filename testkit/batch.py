@@ -0,0 +1,184 @@
+# Batch parsing: a corpus of documents parsed and queried serially, in a
+# thread pool and in a process pool, as an ingest service would.
+#
+#     python -m testkit.batch --documents 500 --workers 1,2,4,8
+#
+# Every document is parsed and then queried with the find_all() and
+# get_text() calls the unit tests make. Each mode reports documents per
+# second and its scaling efficiency: the speedup over the serial loop
+# divided by the number of workers. Threads share the GIL, so parsing,
+# which is pure Python for html.parser, is not expected to scale with
+# them. Sub-interpreters are used too on Pythons that have
+# concurrent.futures.InterpreterPoolExecutor.
+#
+# stress() checks the other side of running in threads: soups mutated
+# concurrently, with the interpreter switching threads as often as it
+# can, must end up exactly as they do when mutated one after another.
+
+import argparse
+import concurrent.futures
+import hashlib
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from testkit.documents import FIXTURE_DOCUMENTS, entity_document, generate_document
+from testkit.fuzz import Sequence
+
+# Nodes in each generated document of the corpus.
+DOCUMENT_NODES = 300
+
+# The queries of mina_test.py and yang_test.py, as name -> function of a
+# soup.
+QUERIES = {
+    "find_all_b": lambda soup: soup.find_all("b"),
+    "find_all_regex": lambda soup: soup.find_all(re.compile("^p")),
+    "find_all_list": lambda soup: soup.find_all(["b", "p"]),
+    "find_all_true": lambda soup: soup.find_all(True),
+    "find_all_class": lambda soup: soup.find_all(class_="class-a"),
+    "find_all_id": lambda soup: soup.find_all(id="34df9e"),
+    "get_text": lambda soup: soup.get_text(),
+}
+
+_InterpreterPoolExecutor = getattr(concurrent.futures, "InterpreterPoolExecutor", None)
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+if _InterpreterPoolExecutor is not None:
+    EXECUTORS["interpreter"] = _InterpreterPoolExecutor
+
+MODES = ("serial",) + tuple(sorted(EXECUTORS))
+
+# How often threads are switched during stress(), in seconds; the default
+# is 0.005.
+STRESS_SWITCH_INTERVAL = 1e-6
+
+
+# `count` documents: the fixtures, entity-heavy documents and generated
+# documents with different seeds, in turn.
+def corpus(count, nodes=DOCUMENT_NODES):
+    fixtures = sorted(FIXTURE_DOCUMENTS.values())
+    documents = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            documents.append(fixtures[(i // 3) % len(fixtures)])
+        elif kind == 1:
+            documents.append(entity_document(nodes))
+        else:
+            documents.append(generate_document(nodes, seed=i))
+    return documents
+
+
+# A digest of a query result that compares equal across processes (unlike
+# hash() of a str).
+def digest(result):
+    text = result if isinstance(result, str) else "\n".join(str(r) for r in result)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# Parse one document and run every query on it. Returns plain data
+# (name, result count, digest), so results from any mode can be compared.
+def process(markup, parser="html.parser"):
+    soup = BeautifulSoup(markup, parser)
+    summary = []
+    for name in sorted(QUERIES):
+        result = QUERIES[name](soup)
+        summary.append((name, len(result), digest(result)))
+    return tuple(summary)
+
+
+# Process `documents` in `mode` with `workers` workers. Returns the
+# results, in document order, and the seconds taken, including starting
+# and stopping the pool.
+def run_batch(documents, mode="serial", workers=1, parser="html.parser"):
+    start = time.perf_counter()
+    if mode == "serial":
+        results = [process(markup, parser) for markup in documents]
+    else:
+        # Processes and interpreters get the documents in batches, so a
+        # round trip is not paid per document.
+        chunksize = 1 if mode == "thread" else max(1, len(documents) // (workers * 4))
+        with EXECUTORS[mode](max_workers=workers) as pool:
+            results = list(pool.map(process, documents, [parser] * len(documents), chunksize=chunksize))
+    return results, time.perf_counter() - start
+
+
+# Run the serial loop once and every other mode at every worker count, and
+# return one row per run with docs/sec, speedup over serial and scaling
+# efficiency. `identical` is False if a mode's results differ from the
+# serial ones.
+def scaling(documents, modes=MODES, worker_counts=(1, 2, 4), parser="html.parser"):
+    expected, serial_seconds = run_batch(documents, "serial", 1, parser)
+    rows = [{"mode": "serial", "workers": 1, "seconds": serial_seconds, "identical": True}]
+    for mode in modes:
+        if mode == "serial":
+            continue
+        for workers in worker_counts:
+            results, seconds = run_batch(documents, mode, workers, parser)
+            rows.append({"mode": mode, "workers": workers, "seconds": seconds,
+                         "identical": results == expected})
+    for row in rows:
+        row["docs_per_sec"] = len(documents) / row["seconds"] if row["seconds"] else 0.0
+        row["speedup"] = serial_seconds / row["seconds"] if row["seconds"] else 0.0
+        row["efficiency"] = row["speedup"] / row["workers"]
+    return rows
+
+
+# Apply the fuzzer's mutation sequence for `seed` to its own soup and
+# return what it left: the failure record (None if every step kept the
+# tree intact), the operations applied and a digest of the final tree.
+def mutate(seed, steps=50):
+    sequence = Sequence(seed, steps)
+    failure = sequence.run()
+    return failure, tuple(sequence.log), digest(str(sequence.soup))
+
+
+# Mutate one soup per seed in `workers` threads, switching threads every
+# `switch_interval` seconds, and return the results in seed order. They
+# must equal [mutate(seed) for seed in seeds].
+def stress(seeds, workers=8, steps=50, switch_interval=STRESS_SWITCH_INTERVAL):
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(switch_interval)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(mutate, seeds, [steps] * len(seeds)))
+    finally:
+        sys.setswitchinterval(old)
+
+
+def format_rows(rows):
+    lines = ["%-12s %7s  %9s  %10s  %8s  %10s" % ("mode", "workers", "seconds", "docs/sec", "speedup",
+                                                  "efficiency")]
+    for row in rows:
+        lines.append("%-12s %7d  %9.2f  %10.1f  %7.2fx  %9.0f%%%s" % (
+            row["mode"], row["workers"], row["seconds"], row["docs_per_sec"], row["speedup"],
+            100 * row["efficiency"], "" if row["identical"] else "  RESULTS DIFFER"))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m testkit.batch")
+    parser.add_argument("--documents", type=int, default=300, help="documents in the corpus")
+    parser.add_argument("--nodes", type=int, default=DOCUMENT_NODES, help="nodes per generated document")
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, os.cpu_count() or 1)),
+                        help="comma separated worker counts")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma separated, from %s" % ", ".join(MODES))
+    parser.add_argument("--parser", default="html.parser")
+    args = parser.parse_args(argv)
+
+    worker_counts = sorted(set(int(n) for n in args.workers.split(",")))
+    modes = [m for m in args.modes.split(",") if m]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error("unknown mode(s): %s" % ", ".join(unknown))
+    rows = scaling(corpus(args.documents, args.nodes), modes, worker_counts, args.parser)
+    print("\n".join(format_rows(rows)))
+    return 0 if all(row["identical"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# Bulk edits of very wide tags, in time linear in the number of children
+# they touch.
+#
+# bs4 4.10 edits one child at a time, and each edit shifts the children
+# list: clear() and extend(other_tag) delete the source's first child over
+# and over, and insert(0, ...) moves every existing child right. Each of
+# those is a C-level memmove, cheap on a small tag, but on a tag with 100k
+# children the cost per child grows with the width. These helpers unlink or
+# splice a whole run of children at once and leave the tree exactly as the
+# one-at-a-time calls would (see bulk_test.py).
+
+from bs4 import NavigableString, Tag
+
+
+# The last node of `node`'s subtree in document order.
+def _last_descendant(node):
+    while isinstance(node, Tag) and node.contents:
+        node = node.contents[-1]
+    return node
+
+
+# Detach every child of `tag` in one pass, like tag.clear(). With
+# `decompose`, child tags are then decomposed, as tag.clear(True) does.
+def clear(tag, decompose=False):
+    children = list(tag.contents)
+    if not children:
+        return
+    last = _last_descendant(children[-1])
+    after = last.next_element
+    tag.next_element = after
+    if after is not None:
+        after.previous_element = tag
+    for i, child in enumerate(children):
+        # The node before the next sibling in document order is the last
+        # node of this child's subtree.
+        end = children[i + 1].previous_element if i + 1 < len(children) else last
+        end.next_element = None
+        child.previous_element = None
+        child.parent = child.previous_sibling = child.next_sibling = None
+    del tag.contents[:]
+    if decompose:
+        for child in children:
+            if isinstance(child, Tag):
+                child.decompose()
+
+
+# Append `nodes` to `tag`, like tag.extend(nodes). Moving the children of
+# another tag (passed as the tag or as its contents list) detaches them
+# all at once first.
+def extend(tag, nodes):
+    if isinstance(nodes, list) and nodes and isinstance(nodes[0], (Tag, NavigableString)):
+        source = nodes[0].parent
+        if source is not None and nodes is source.contents:
+            nodes = source
+    if isinstance(nodes, Tag):
+        moved = list(nodes.contents)
+        clear(nodes)
+        nodes = moved
+    tag.extend(nodes)
+
+
+# Insert `nodes` so that they start at `position` in tag.contents, in
+# order, with one splice of the children list. Equivalent to calling
+# tag.insert(position + i, node) for each of them, or to inserting them at
+# position 0 one by one in reverse order. Nodes already in a tree are
+# extracted first; `position` counts the children left after that.
+def insert_all(tag, position, nodes):
+    new = []
+    for node in nodes:
+        if node is tag:
+            raise ValueError("Cannot insert a tag into itself.")
+        if isinstance(node, str) and not isinstance(node, NavigableString):
+            node = NavigableString(node)
+        if node.parent is not None:
+            node.extract()
+        new.append(node)
+    if not new:
+        return
+    contents = tag.contents
+    position = max(0, min(position, len(contents)))
+    before_sibling = contents[position - 1] if position > 0 else None
+    after_sibling = contents[position] if position < len(contents) else None
+    before = _last_descendant(before_sibling) if before_sibling is not None else tag
+    after = before.next_element
+
+    previous_sibling, previous_end = before_sibling, before
+    for node in new:
+        node.parent = tag
+        node.previous_sibling = previous_sibling
+        if previous_sibling is not None:
+            previous_sibling.next_sibling = node
+        node.previous_element = previous_end
+        previous_end.next_element = node
+        previous_sibling, previous_end = node, _last_descendant(node)
+    previous_sibling.next_sibling = after_sibling
+    if after_sibling is not None:
+        after_sibling.previous_sibling = previous_sibling
+    previous_end.next_element = after
+    if after is not None:
+        after.previous_element = previous_end
+    contents[position:position] = new
@@ -0,0 +1,113 @@
+# Documents as raw bytes, the way they come off the wire: in UTF-8,
+# UTF-16, Latin-1 and Shift-JIS, with and without a byte order mark and a
+# <meta charset>, and the hints BeautifulSoup takes for decoding them.
+#
+# Given bytes, bs4 hands them to UnicodeDammit, which tries the encodings
+# it was told (from_encoding), one named by a BOM or a <meta> declaration,
+# whatever an installed detector (cchardet, chardet or charset_normalizer)
+# guesses, then UTF-8 and finally Windows-1252, skipping any in
+# exclude_encodings. Without a detector, undeclared Shift-JIS fails both
+# and is decoded as UTF-8 with replacement characters.
+
+import codecs
+import contextlib
+import logging
+
+from bs4.dammit import UnicodeDammit
+
+ENCODINGS = ("utf-8", "utf-16", "latin-1", "shift_jis")
+
+# Byte order marks; UTF-16 is only used with one.
+BOMS = {"utf-8": codecs.BOM_UTF8, "utf-16": codecs.BOM_UTF16_LE}
+BOM_CODECS = {"utf-8": "utf-8", "utf-16": "utf-16-le"}
+
+# Text every encoding can represent, with characters outside ASCII. It
+# replaces "Hello World", which is in the fixtures and in every section of
+# a generated document.
+SAMPLE_TEXT = {
+    "utf-8": "Hello Wörld – 日本語 café",
+    "utf-16": "Hello Wörld – 日本語 café",
+    "latin-1": "Hello Wörld © café ½",
+    "shift_jis": "こんにちは世界 日本語",
+}
+
+HINTS = ("detect", "from_encoding", "exclude_encodings")
+
+
+# Whether a charset detector is installed for UnicodeDammit to consult.
+def has_detector():
+    for module in ("cchardet", "chardet", "charset_normalizer"):
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            pass
+    return False
+
+
+# Every (encoding, bom, meta) combination.
+def cases():
+    combinations = []
+    for encoding in ENCODINGS:
+        for bom in ((False, True) if encoding in BOMS else (False,)):
+            if encoding == "utf-16" and not bom:
+                continue
+            for meta in (False, True):
+                combinations.append((encoding, bom, meta))
+    return combinations
+
+
+def case_name(encoding, bom, meta):
+    return encoding + ("+bom" if bom else "") + ("+meta" if meta else "")
+
+
+# `markup` with SAMPLE_TEXT for `encoding` and, with `meta`, a <meta
+# charset> declaring it. This is the str both paths parse.
+def localize(markup, encoding, meta=False):
+    markup = markup.replace("Hello World", SAMPLE_TEXT[encoding])
+    if meta:
+        tag = '<meta charset="%s"/>' % encoding
+        if "<head>" in markup:
+            markup = markup.replace("<head>", "<head>" + tag, 1)
+        elif "<html>" in markup:
+            markup = markup.replace("<html>", "<html><head>" + tag + "</head>", 1)
+        else:
+            markup = tag + markup
+    return markup
+
+
+def to_bytes(markup, encoding, bom=False):
+    if bom:
+        return BOMS[encoding] + markup.encode(BOM_CODECS[encoding])
+    return markup.encode(encoding)
+
+
+# The keyword arguments BeautifulSoup (and UnicodeDammit) take for a hint:
+# none, the right encoding, or ruling out the encoding bs4 would otherwise
+# try first and get wrong or fail with.
+def hint_arguments(hint, encoding):
+    if hint == "from_encoding":
+        return {"from_encoding": encoding}
+    if hint == "exclude_encodings":
+        return {"exclude_encodings": ["windows-1252"] if encoding.startswith("utf") else ["utf-8"]}
+    return {}
+
+
+# Decode `data` as BeautifulSoup would; returns the UnicodeDammit.
+def detect(data, hint="detect", encoding=None):
+    arguments = hint_arguments(hint, encoding)
+    override = [arguments["from_encoding"]] if "from_encoding" in arguments else []
+    return UnicodeDammit(data, override, is_html=True, exclude_encodings=arguments.get("exclude_encodings"))
+
+
+# Silence UnicodeDammit's warning that it fell back to replacement
+# characters, which undeclared Shift-JIS logs on every parse.
+@contextlib.contextmanager
+def replacement_quiet():
+    logger = logging.getLogger("bs4.dammit")
+    level = logger.level
+    logger.setLevel(logging.ERROR)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
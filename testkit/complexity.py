@@ -0,0 +1,87 @@
+# Empirical complexity: time an operation over growing input sizes and fit
+# the exponent k in time ~ n**k.
+
+import gc
+import math
+import os
+import time
+
+
+# Sizes from `start` doubling up to `stop` (inclusive), where `stop` can be
+# raised with an environment variable for a slower, more precise run.
+def doubling_sizes(start, stop, env="COMPLEXITY_MAX_N"):
+    stop = int(os.environ.get(env, stop))
+    sizes = []
+    n = start
+    while n <= stop:
+        sizes.append(n)
+        n *= 2
+    return sizes
+
+
+# Best-of-`repeats` time of `run(state, n)`, with `setup(n)` building the
+# state outside the timed region and the garbage collector paused.
+def measure(setup, run, n, repeats=3):
+    best = None
+    for _ in range(repeats):
+        state = setup(n)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(state, n)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+# Least squares slope of log(time) against log(n).
+def fit_exponent(sizes, times):
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in times]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    num = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    den = sum((x - mean_x) ** 2 for x in xs)
+    return num / den
+
+
+def scaling(setup, run, sizes, repeats=3):
+    times = [measure(setup, run, n, repeats) for n in sizes]
+    return fit_exponent(sizes, times), times
+
+
+# Like scaling(), but a fit above `limit` is measured again, up to
+# `attempts` times, and the lowest exponent is returned with its times.
+# Load on the machine slows single sizes down and throws a fit off; work
+# that really grows faster than the limit comes out above it every time.
+def bounded_scaling(setup, run, sizes, limit, attempts=3, repeats=3):
+    best = None
+    for _ in range(attempts):
+        exponent, times = scaling(setup, run, sizes, repeats)
+        if best is None or exponent < best[0]:
+            best = exponent, times
+        if exponent <= limit:
+            break
+    return best
+
+
+# Timing noise on small inputs makes the fitted exponent wobble, so a
+# scaling test only fails when it exceeds its bound by more than this.
+TOLERANCE = 0.35
+
+
+# For unittest.TestCase classes: assertScales() fails when the time of
+# `run` grows faster than n**bound over `sizes` on every attempt of
+# bounded_scaling(); `sizes` defaults to the class's SIZES.
+class ScalingAssertions(object):
+
+    SIZES = doubling_sizes(1024, 16384)
+
+    def assertScales(self, setup, run, bound, sizes=None):
+        sizes = self.SIZES if sizes is None else sizes
+        exponent, times = bounded_scaling(setup, run, sizes, bound + TOLERANCE)
+        self.assertLessEqual(exponent, bound + TOLERANCE, "time ~ n**%.2f, expected at most n**%d (%s)" % (
+            exponent, bound, ", ".join("n=%d: %.4fs" % nt for nt in zip(sizes, times))))
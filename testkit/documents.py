@@ -0,0 +1,141 @@
+# Documents used by the benchmark and scaling suites.
+#
+# The small fixture documents are the exact strings used by the unit tests,
+# so a benchmark can mirror its test. The generators build larger documents
+# with the same shape (sections with paragraphs, bold text, links with
+# multi-valued attributes and entities) at a requested node count.
+
+import random
+
+# MyTestCase.MockSoup in mina_test.py
+MINA_DOCUMENT = """
+                <html><body><p>This paragraph has a section which is<b class="boldest">Extremely bold</b></p></body></html>
+            """
+
+# BS4Test.soup1 in yang_test.py
+YANG_DOCUMENT = """
+            <html>
+              <body>
+                <nochild></nochild>
+                <onechild><child></child></onechild>
+                <twochildren><child1></child1><child2></child2></twochildren>
+                <grandchildren><withchild><g1></g1><g2></g2></withchild><withchild2><g3></g3><g4></g4></withchild2></grandchildren>
+                <a id="34df9e" class="class-a class-b" rel="nofollow"></a>
+              </body>
+            </html>
+        """
+
+# TestCase.soup in ziyuan_test.py
+ZIYUAN_DOCUMENT = """
+                <html>
+                    <body>
+                        <div><p>Hello World</p></div>
+                        <div class="test_insert"><p> Hello World </p> Hello World </div>
+                    </body>
+                </html>
+            """
+
+FIXTURE_DOCUMENTS = {
+    "mina": MINA_DOCUMENT,
+    "ziyuan": ZIYUAN_DOCUMENT,
+    "yang": YANG_DOCUMENT,
+}
+
+# One generated section. Every section holds SECTION_NODES nodes (tags and
+# strings) when parsed, which is how generate_document hits a node count.
+SECTION = (
+    '<div class="section {kind}" id="s{i}">'
+    '<p>Paragraph {i} has a section which is<b class="boldest">Extremely bold</b></p>'
+    '<a class="class-a class-b" rel="nofollow" href="/page/{i}">link {i} &amp; more</a>'
+    '<span>Hello World &lt;p&gt;</span>'
+    '</div>'
+)
+SECTION_NODES = 9
+SECTION_KINDS = ("news", "sport", "blog", "shop")
+
+
+# Build a document of roughly `nodes` parsed nodes (tags plus strings). A
+# `marked` fraction of the sections, chosen at random, also get the class
+# "hit", for queries with a known selectivity.
+def generate_document(nodes, seed=0, marked=0.0):
+    rng = random.Random(seed)
+    sections = max(1, nodes // SECTION_NODES)
+    parts = ["<html><body>"]
+    for i in range(sections):
+        kind = rng.choice(SECTION_KINDS)
+        if marked and rng.random() < marked:
+            kind += " hit"
+        parts.append(SECTION.format(i=i, kind=kind))
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+# One section of an entity-heavy document: escaped markup and ampersands
+# as in the ziyuan_test.py strings, characters the "html" formatter turns
+# into named entities, quotes in attribute values, a void element and a
+# <pre> whose whitespace is kept when prettified.
+ENTITY_SECTION = (
+    '<div class="entities" title="&quot;quoted&quot; &amp; &lt;b&gt;" id="e{i}">'
+    '<p>Hello World &lt;p&gt; test_insert_{i} &amp; more &amp;amp; &lt;/p&gt;</p>'
+    '<p>caf\u00e9 \u00a9 2021 \u2014 \u00bd &lt; \u00be &gt; \u00ab\u00a0\u00bb \u65e5\u672c</p>'
+    '<br/>'
+    '<pre>  &lt;code&gt; a &amp;&amp; b  </pre>'
+    '</div>'
+)
+ENTITY_SECTION_NODES = 8
+
+
+# Build an entity-heavy document of roughly `nodes` parsed nodes, to
+# stress the formatters that escape text and attribute values.
+def entity_document(nodes):
+    sections = max(1, nodes // ENTITY_SECTION_NODES)
+    parts = ["<html><head><meta charset=\"utf-8\"/></head><body>"]
+    parts.extend(ENTITY_SECTION.format(i=i) for i in range(sections))
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+# One section of an attribute-heavy document: every tag has several
+# classes and data-* attributes, and the link a multi-valued rel and
+# accesskey as well. {classes} and {data} are filled in per section.
+ATTRIBUTE_SECTION = (
+    '<div class="{classes}" id="a{i}" {data}>'
+    '<a class="{classes}" rel="nofollow noopener" accesskey="a b" href="/page/{i}" {data}>link {i}</a>'
+    '<span class="{classes}" {data}>text</span>'
+    '</div>'
+)
+ATTRIBUTE_SECTION_NODES = 5
+
+# Class names are drawn from c0 ... c31, so with `classes` of them per
+# section each name is on classes / ATTRIBUTE_CLASSES of the sections.
+ATTRIBUTE_CLASSES = 32
+
+
+# Build an attribute-heavy document of roughly `nodes` parsed nodes, with
+# `classes` class names and `data` data-* attributes on every tag.
+def attribute_document(nodes, classes=8, data=8):
+    sections = max(1, nodes // ATTRIBUTE_SECTION_NODES)
+    parts = ["<html><body>"]
+    for i in range(sections):
+        names = " ".join("c%d" % ((i + j * 5) % ATTRIBUTE_CLASSES) for j in range(classes))
+        attrs = " ".join('data-k%d="v%d-%d"' % (j, i, j) for j in range(data))
+        parts.append(ATTRIBUTE_SECTION.format(i=i, classes=names, data=attrs))
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+# Build a document whose body holds `depth` nested <div> tags.
+def deep_document(depth, leaf="leaf"):
+    return "<html><body>" + "<div>" * depth + leaf + "</div>" * depth + "</body></html>"
+
+
+# Build a document whose body holds one <div> with `width` <p> children.
+def wide_document(width):
+    children = "".join("<p>item %d</p>" % i for i in range(width))
+    return "<html><body><div>" + children + "</div></body></html>"
+
+
+# Count the nodes below (and excluding) a soup, the unit generate_document
+# is sized in.
+def count_nodes(soup):
+    return sum(1 for _ in soup.descendants)
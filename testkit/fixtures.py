@@ -0,0 +1,84 @@
+# Parse-once fixture cache.
+#
+# Every fixture document is parsed once per process. Tests get a snapshot:
+# an isolated, mutable clone of the cached tree, so nothing a test does can
+# leak into the next one. clone_tree copies the tree node by node without
+# recursion, which benchmarks faster than re-parsing, copy.deepcopy or a
+# pickle round-trip (see `python -m bench --group fixtures`), and unlike
+# those two it does not hit the recursion limit on large documents.
+
+from bs4 import BeautifulSoup, NavigableString
+
+_cache = {}
+
+
+# The cached tree for a document. Never mutate it; use snapshot().
+def parsed(markup, parser="html.parser", *args, **kwargs):
+    key = (markup, parser, repr(args), repr(sorted(kwargs.items())))
+    entry = _cache.get(key)
+    if entry is None:
+        entry = _cache[key] = (BeautifulSoup(markup, parser, *args, **kwargs),
+                               (markup, parser, args, kwargs))
+    return entry[0]
+
+
+# An isolated copy of the cached tree for a document, taking the same
+# arguments as BeautifulSoup.
+def snapshot(markup, parser="html.parser", *args, **kwargs):
+    return clone_tree(parsed(markup, parser, *args, **kwargs))
+
+
+def clear_cache():
+    _cache.clear()
+
+
+# (soup, (markup, parser, args, kwargs)) for every cached document.
+def cached_documents():
+    return list(_cache.values())
+
+
+def _clone_node(node):
+    if isinstance(node, NavigableString):
+        clone = str.__new__(type(node), node)
+        clone.__dict__.update(node.__dict__)
+    else:
+        clone = object.__new__(type(node))
+        clone.__dict__.update(node.__dict__)
+        clone.contents = []
+        clone.attrs = dict((k, type(v)(v) if isinstance(v, list) else v)
+                           for k, v in node.attrs.items())
+    clone.parent = clone.next_element = clone.previous_element = None
+    clone.next_sibling = clone.previous_sibling = None
+    return clone
+
+
+# Copy a tree (a BeautifulSoup object or a Tag) in document order. Every
+# link to a node that comes earlier in the document (parent, previous
+# element, previous sibling) already has a clone to point at, and the
+# matching forward link is set from the later node's side.
+def clone_tree(root):
+    clones = {id(root): _clone_node(root)}
+    for node in root.descendants:
+        clone = clones[id(node)] = _clone_node(node)
+        parent = clones[id(node.parent)]
+        parent.contents.append(clone)
+        clone.parent = parent
+        previous = node.previous_element
+        if previous is not None and id(previous) in clones:
+            clone.previous_element = clones[id(previous)]
+            if previous.next_element is node:
+                clone.previous_element.next_element = clone
+        previous = node.previous_sibling
+        if previous is not None:
+            clone.previous_sibling = clones[id(previous)]
+            clone.previous_sibling.next_sibling = clone
+    copy = clones[id(root)]
+    if isinstance(root, BeautifulSoup):
+        # Parser state that points into the tree, such as the tag stack.
+        for key, value in root.__dict__.items():
+            if isinstance(value, list) and key != "contents":
+                setattr(copy, key, [clones.get(id(v), v) for v in value])
+            elif id(value) in clones and key not in ("parent", "next_element", "previous_element"):
+                setattr(copy, key, clones[id(value)])
+        copy.open_tag_counter = root.open_tag_counter.copy()
+    return copy
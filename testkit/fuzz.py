@@ -0,0 +1,297 @@
+# Seeded mutation fuzzer for the tree-editing APIs.
+#
+#     python -m testkit.fuzz --seconds 60 --jobs 8
+#     python -m testkit.fuzz --replay 1234
+#
+# Each sequence parses a small document, applies `steps` random mutations
+# (insert, insert_before, insert_after, extend, wrap, unwrap, extract,
+# replace_with, clear) and checks testkit.invariants.violations() on the
+# tree after every one. A sequence is fully determined by its seed, so a
+# failure is reproduced with --replay SEED. Worker processes take seeds
+# in turn until the time or sequence budget runs out; the summary reports
+# checked operations per second.
+
+import argparse
+import os
+import random
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import NavigableString, Tag
+
+from testkit.documents import FIXTURE_DOCUMENTS, generate_document
+from testkit.fixtures import snapshot
+from testkit.invariants import describe, violations
+
+OPERATIONS = ("insert", "insert_before", "insert_after", "extend", "wrap",
+              "unwrap", "extract", "replace_with", "clear")
+
+NAMES = ("a", "b", "i", "p", "div", "span")
+
+DEFAULT_STEPS = 100
+
+# Sequences start from one of these. Generated documents are seeded, so
+# every process sees the same ones.
+DOCUMENTS = sorted(FIXTURE_DOCUMENTS.values()) + [generate_document(60, seed=i) for i in range(4)]
+
+# Share of operations given arguments the API must refuse.
+INVALID = 0.05
+
+# A tree that grows past this many nodes only shrinks until it is back
+# under it, which keeps every check cheap.
+MAX_NODES = 400
+
+
+def is_inside(node, ancestor):
+    while node is not None:
+        if node is ancestor:
+            return True
+        node = node.parent
+    return False
+
+
+class Sequence(object):
+
+    def __init__(self, seed, steps=DEFAULT_STEPS, negative_positions=False):
+        self.seed = seed
+        self.steps = steps
+        # insert() with a negative position breaks the tree in bs4 4.10
+        # (see fuzz_test.py), so it is only fuzzed on request.
+        self.negative_positions = negative_positions
+        self.rng = random.Random(seed)
+        self.soup = snapshot(self.rng.choice(DOCUMENTS))
+        self.log = []
+        self.rejected = 0
+
+    def new_node(self):
+        if self.rng.random() < 0.4:
+            return NavigableString("s%d" % self.rng.randrange(100))
+        tag = self.soup.new_tag(self.rng.choice(NAMES))
+        if self.rng.random() < 0.5:
+            tag.append("t%d" % self.rng.randrange(100))
+        return tag
+
+    # A node to put next to or into `target`: a new one, or one already in
+    # the tree, which gets moved. Never `target` or one of its ancestors,
+    # which would make a cycle.
+    def insertable(self, nodes, target):
+        if nodes and self.rng.random() < 0.5:
+            node = self.rng.choice(nodes)
+            if not is_inside(target, node):
+                return node
+        return self.new_node()
+
+    def tags(self, nodes):
+        return [self.soup] + [n for n in nodes if isinstance(n, Tag)]
+
+    # Choose one random operation. Returns a description for the log, a
+    # function that applies it, the subtree it will detach, if any, which
+    # is checked as well, and whether the API must refuse it.
+    def plan(self):
+        rng = self.rng
+        nodes = list(self.soup.descendants)
+        operations = OPERATIONS
+        if len(nodes) > MAX_NODES:
+            operations = ("unwrap", "extract", "replace_with", "clear")
+        if not nodes:
+            operations = ("insert", "extend")
+        name = rng.choice(operations)
+        if nodes and rng.random() < INVALID:
+            return self.invalid(name, rng.choice(nodes)) + (True,)
+        return self.valid(name, nodes) + (False,)
+
+    # An operation with arguments the API accepts.
+    def valid(self, name, nodes):
+        rng = self.rng
+        if name == "insert":
+            tag = rng.choice(self.tags(nodes))
+            low = -len(tag.contents) if self.negative_positions else 0
+            position = rng.randint(low, len(tag.contents) + 1)
+            child = self.insertable(nodes, tag)
+            return ("insert(%d, %s) into %s" % (position, describe(child), describe(tag)),
+                    lambda: tag.insert(position, child), None)
+        if name == "extend":
+            tag = rng.choice(self.tags(nodes))
+            kind = rng.choice(("list", "generator", "tag"))
+            if kind == "tag":
+                source = rng.choice(self.tags(nodes))
+                if is_inside(tag, source):
+                    source = self.soup.new_tag("div")
+                    source.extend([self.new_node() for _ in range(3)])
+                return ("extend(%s contents) into %s" % (describe(source), describe(tag)),
+                        lambda: tag.extend(source), None)
+            new = [self.insertable(nodes, tag) for _ in range(rng.randint(0, 3))]
+            new = list(dict((id(n), n) for n in new).values())
+            return ("extend(%s %s) into %s" % (kind, [describe(n) for n in new], describe(tag)),
+                    lambda: tag.extend(new if kind == "list" else (n for n in new)), None)
+        if name == "clear":
+            tag = rng.choice(self.tags(nodes))
+            decompose = rng.random() < 0.5
+            return "clear(%s) %s" % (decompose, describe(tag)), lambda: tag.clear(decompose), None
+
+        target = rng.choice(nodes)
+        if name in ("insert_before", "insert_after"):
+            args = [self.insertable(nodes, target) for _ in range(rng.randint(1, 3))]
+            args = list(dict((id(n), n) for n in args if n is not target).values()) or [self.new_node()]
+            return ("%s(%s) at %s" % (name, [describe(n) for n in args], describe(target)),
+                    lambda: getattr(target, name)(*args), None)
+        if name == "wrap":
+            wrapper = self.soup.new_tag(rng.choice(NAMES))
+            return "wrap(%s) %s" % (describe(wrapper), describe(target)), lambda: target.wrap(wrapper), None
+        if name == "unwrap":
+            tags = [n for n in nodes if isinstance(n, Tag)]
+            if not tags:
+                return "unwrap (no tags)", lambda: None, None
+            tag = rng.choice(tags)
+            return "unwrap %s" % describe(tag), tag.unwrap, tag
+        if name == "extract":
+            return "extract %s" % describe(target), target.extract, target
+        args = [self.insertable(nodes, target) for _ in range(rng.randint(1, 2))]
+        args = list(dict((id(n), n) for n in args).values())
+        return ("replace_with(%s) %s" % ([describe(n) for n in args], describe(target)),
+                lambda: target.replace_with(*args), target)
+
+    # Arguments the API must refuse with ValueError, leaving the tree as it
+    # was.
+    def invalid(self, name, target):
+        if name in ("insert", "extend", "clear") and isinstance(target, Tag):
+            return "insert(0, itself) into %s" % describe(target), lambda: target.insert(0, target), None
+        if name in ("insert_before", "insert_after") or (name == "wrap" and isinstance(target, Tag)):
+            return ("%s(itself) at %s" % (name, describe(target)),
+                    lambda: getattr(target, name)(target), None)
+        if name == "replace_with":
+            return ("replace_with(its parent) %s" % describe(target),
+                    lambda: target.replace_with(target.parent), None)
+        # The rest have no invalid form of their own: a string has no
+        # children to insert into or clear and cannot wrap itself, and
+        # anything in the tree can be unwrapped or extracted.
+        if name in ("insert", "extend", "clear", "wrap"):
+            return ("insert_before(itself) at %s" % describe(target),
+                    lambda: target.insert_before(target), None)
+        return "unwrap the soup itself", self.soup.unwrap, None
+
+    # Run the sequence; returns None, or a failure record for the first
+    # operation that broke the tree, raised an unexpected exception (a
+    # ValueError included, unless the arguments were invalid) or accepted
+    # invalid arguments.
+    def run(self):
+        for step in range(self.steps):
+            description, apply, detached, refused = self.plan()
+            self.log.append(description)
+            try:
+                apply()
+            except ValueError:
+                if not refused:
+                    return self.failure(step, description, [traceback.format_exc()])
+                # The API refused the arguments; the tree must still be
+                # intact.
+                self.rejected += 1
+                detached = None
+            except Exception:
+                return self.failure(step, description, [traceback.format_exc()])
+            else:
+                if refused:
+                    return self.failure(step, description, ["invalid arguments accepted without a ValueError"])
+            problems = violations(self.soup)
+            if detached is not None and detached.__dict__ and detached.parent is None:
+                problems += ["detached %s: %s" % (describe(detached), p) for p in violations(detached)]
+            if problems:
+                return self.failure(step, description, problems)
+        return None
+
+    def failure(self, step, operation, problems):
+        return {"seed": self.seed, "step": step, "operation": operation, "violations": problems}
+
+
+# Run sequences seed, seed + stride, seed + 2 * stride, ... until `count`
+# sequences have run or `deadline` (a time.time() value) has passed.
+def fuzz(seed=0, stride=1, count=None, deadline=None, steps=DEFAULT_STEPS, negative_positions=False):
+    sequences = operations = rejected = 0
+    failures = []
+    while (count is None or sequences < count) and (deadline is None or time.time() < deadline):
+        sequence = Sequence(seed + sequences * stride, steps, negative_positions)
+        failure = sequence.run()
+        sequences += 1
+        operations += len(sequence.log)
+        rejected += sequence.rejected
+        if failure is not None:
+            failures.append(failure)
+    return {"sequences": sequences, "operations": operations, "rejected": rejected,
+            "failures": failures}
+
+
+# Fuzz in `jobs` processes, each taking every jobs-th seed from `seed`.
+# Stops after `seconds`, or after `sequences` in total; at least one of
+# the two must be given.
+def fuzz_parallel(jobs, seconds=None, sequences=None, seed=0, steps=DEFAULT_STEPS,
+                  negative_positions=False):
+    start = time.time()
+    deadline = start + seconds if seconds is not None else None
+    counts = [None] * jobs
+    if sequences is not None:
+        counts = [sequences // jobs + (1 if i < sequences % jobs else 0) for i in range(jobs)]
+    if jobs == 1:
+        parts = [fuzz(seed, 1, counts[0], deadline, steps, negative_positions)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parts = list(pool.map(fuzz, [seed + i for i in range(jobs)], [jobs] * jobs,
+                                  counts, [deadline] * jobs, [steps] * jobs,
+                                  [negative_positions] * jobs))
+    elapsed = time.time() - start
+    total = {"sequences": 0, "operations": 0, "rejected": 0, "failures": []}
+    for part in parts:
+        for key in ("sequences", "operations", "rejected"):
+            total[key] += part[key]
+        total["failures"] += part["failures"]
+    total["failures"].sort(key=lambda f: f["seed"])
+    total["seconds"] = elapsed
+    total["execs_per_sec"] = total["operations"] / elapsed if elapsed else 0.0
+    return total
+
+
+def format_failure(failure):
+    lines = ["seed %d, step %d: %s" % (failure["seed"], failure["step"], failure["operation"])]
+    lines += ["    " + line for p in failure["violations"] for line in p.rstrip("\n").split("\n")]
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m testkit.fuzz")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seconds", type=float, default=None,
+                        help="time budget (default: 10 seconds unless --sequences is given)")
+    parser.add_argument("--sequences", type=int, default=None, help="number of sequences to run")
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS, help="operations per sequence")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--negative-positions", action="store_true",
+                        help="also insert() at negative positions (broken in bs4 4.10)")
+    parser.add_argument("--replay", type=int, default=None, metavar="SEED",
+                        help="run one sequence and print every operation")
+    args = parser.parse_args(argv)
+
+    if args.replay is not None:
+        sequence = Sequence(args.replay, args.steps, args.negative_positions)
+        failure = sequence.run()
+        for step, description in enumerate(sequence.log):
+            print("%4d  %s" % (step, description))
+        if failure is not None:
+            print("\n".join(format_failure(failure)))
+        return 1 if failure else 0
+
+    seconds = args.seconds
+    if seconds is None and args.sequences is None:
+        seconds = 10.0
+    result = fuzz_parallel(args.jobs, seconds, args.sequences, args.seed, args.steps,
+                           args.negative_positions)
+    for failure in result["failures"]:
+        print("\n".join(format_failure(failure)))
+    print("%d sequences, %d operations (%d rejected) in %.1fs: %.0f execs/sec, %d failures" % (
+        result["sequences"], result["operations"], result["rejected"], result["seconds"],
+        result["execs_per_sec"], len(result["failures"])))
+    return 1 if result["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
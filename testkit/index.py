@@ -0,0 +1,203 @@
+# An index over a parsed soup for repeated find_all queries.
+#
+# SoupIndex maps tag name -> tags, class -> tags and id -> tags, built in
+# one pass over the tree. A query looks up the smallest candidate set the
+# index can give for its filters. When the index answered every filter
+# (names, ids and single class tokens) the candidates are the result;
+# otherwise each one is checked with the same SoupStrainer find_all would
+# use. Either way results are identical to soup.find_all, in document
+# order.
+#
+# The index stays correct under the mutations made through it: wrap,
+# unwrap, extract, replace_with and smooth update it incrementally.
+# After changing the tree any other way, call invalidate() and the index
+# is rebuilt on the next query.
+
+from bs4 import Tag
+from bs4.element import ResultSet, SoupStrainer
+
+# Gap between the order keys of neighbouring tags after a (re)build. New
+# tags get keys between their neighbours; when a gap runs out, every tag
+# is renumbered.
+SPACING = 65536.0
+
+
+class SoupIndex(object):
+
+    def __init__(self, soup):
+        self.soup = soup
+        self.rebuild()
+
+    def rebuild(self):
+        self._names = {}
+        self._classes = {}
+        self._ids = {}
+        self._keys = {}
+        self._tags = {}
+        self._entries = {}
+        for position, tag in enumerate(self._tags_in(self.soup)):
+            self._add(tag, (position + 1) * SPACING)
+        self._stale = False
+
+    # Mark the index out of date after changing the tree without going
+    # through the index.
+    def invalidate(self):
+        self._stale = True
+
+    def __len__(self):
+        self._refresh()
+        return len(self._tags)
+
+    # Queries
+
+    def find_all(self, name=None, attrs={}, recursive=True, string=None, limit=None, **kwargs):
+        self._refresh()
+        if "text" in kwargs:
+            string = kwargs.pop("text")
+        if string is not None or not recursive:
+            # Strings are not indexed, and only the whole soup is.
+            return self.soup.find_all(name, attrs, recursive, string, limit, **kwargs)
+        strainer = SoupStrainer(name, attrs, **kwargs)
+        candidates, exact = self._candidates(strainer)
+        ordered = sorted(candidates.values(), key=lambda tag: self._keys[id(tag)])
+        if not exact:
+            ordered = [tag for tag in ordered if strainer.search_tag(tag)]
+        return ResultSet(strainer, ordered[:limit] if limit else ordered)
+
+    # The smallest set of tags that can match `strainer`, and whether every
+    # one of them does (the index answered every filter by itself).
+    def _candidates(self, strainer):
+        sets = []
+        exact = True
+        if isinstance(strainer.name, str):
+            sets.append(self._names.get(strainer.name, {}))
+        elif isinstance(strainer.name, (list, tuple)) and all(isinstance(n, str) for n in strainer.name):
+            union = {}
+            for n in strainer.name:
+                union.update(self._names.get(n, {}))
+            sets.append(union)
+        elif strainer.name not in (None, True):
+            exact = False
+        attrs = dict(strainer.attrs or {})
+        if isinstance(attrs.get("id"), str):
+            sets.append(self._ids.get(attrs.pop("id"), {}))
+        if isinstance(attrs.get("class"), str) and attrs["class"].split():
+            classes = attrs.pop("class").split()
+            # class_="a b" matches the whole attribute value, so every match
+            # also has class "a", but not every tag with class "a" matches.
+            sets.append(self._classes.get(classes[0], {}))
+            exact = exact and len(classes) == 1
+        exact = exact and not attrs
+        if not sets:
+            return self._tags, exact
+        smallest = min(sets, key=len)
+        return dict((k, t) for k, t in smallest.items() if all(k in s for s in sets)), exact
+
+    # Mutations
+
+    def wrap(self, element, wrapper):
+        self._refresh()
+        result = element.wrap(wrapper)
+        self._reindex(wrapper)
+        return result
+
+    def unwrap(self, tag):
+        self._refresh()
+        self._remove(tag)
+        return tag.unwrap()
+
+    def extract(self, element):
+        self._refresh()
+        self._remove_subtree(element)
+        return element.extract()
+
+    def replace_with(self, element, *args):
+        self._refresh()
+        if element.parent is None:
+            return element.replace_with(*args)
+        result = element.replace_with(*args)
+        if result is not None:
+            self._remove_subtree(element)
+        for new in args:
+            if isinstance(new, Tag) and new.parent is not None:
+                self._reindex(new)
+        return result
+
+    # smooth() only merges strings, which the index does not hold.
+    def smooth(self, tag=None):
+        self._refresh()
+        (tag or self.soup).smooth()
+
+    # Bookkeeping
+
+    def _refresh(self):
+        if self._stale:
+            self.rebuild()
+
+    @staticmethod
+    def _tags_in(node, include_self=False):
+        if include_self and isinstance(node, Tag):
+            yield node
+        if isinstance(node, Tag):
+            for descendant in node.descendants:
+                if isinstance(descendant, Tag):
+                    yield descendant
+
+    def _add(self, tag, key):
+        tag_id = id(tag)
+        classes = tag.get("class") or ()
+        if isinstance(classes, str):
+            classes = classes.split()
+        tag_ids = [tag["id"]] if isinstance(tag.get("id"), str) else []
+        # What the tag was filed under, in case its attributes change later.
+        entries = [(self._names, tag.name)]
+        entries += [(self._classes, c) for c in classes]
+        entries += [(self._ids, i) for i in tag_ids]
+        for mapping, value in entries:
+            mapping.setdefault(value, {})[tag_id] = tag
+        self._keys[tag_id] = key
+        self._tags[tag_id] = tag
+        self._entries[tag_id] = entries
+
+    def _remove(self, tag):
+        tag_id = id(tag)
+        if tag_id not in self._keys:
+            return
+        for mapping, value in self._entries.pop(tag_id):
+            tags = mapping[value]
+            del tags[tag_id]
+            if not tags:
+                del mapping[value]
+        del self._keys[tag_id]
+        del self._tags[tag_id]
+
+    def _remove_subtree(self, element):
+        for tag in list(self._tags_in(element, include_self=True)):
+            self._remove(tag)
+
+    # Give `top` and the tags below it new keys between the indexed tags
+    # just before and just after it in the document.
+    def _reindex(self, top):
+        tags = list(self._tags_in(top, include_self=True))
+        for tag in tags:
+            self._remove(tag)
+        low = self._neighbour_key(top.previous_element, "previous_element", 0.0)
+        last = top._last_descendant()
+        high = self._neighbour_key(last.next_element, "next_element", None)
+        if high is None:
+            high = low + SPACING * (len(tags) + 1)
+        step = (high - low) / (len(tags) + 1)
+        if low + step <= low or low + step * len(tags) >= high:
+            # No room left between the neighbours.
+            self.rebuild()
+            return
+        for i, tag in enumerate(tags):
+            self._add(tag, low + step * (i + 1))
+
+    def _neighbour_key(self, node, direction, default):
+        while node is not None:
+            key = self._keys.get(id(node))
+            if key is not None:
+                return key
+            node = getattr(node, direction)
+        return default
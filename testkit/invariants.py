@@ -0,0 +1,86 @@
+# Structural invariants of a parse tree.
+#
+# Rendering a tree only walks `contents`, so a mutation that leaves a stale
+# parent, sibling or element link still renders correctly and breaks the
+# next traversal instead (parents, next_siblings, descendants, find_next).
+# violations() checks every link in one pass over the tree.
+
+from bs4 import BeautifulSoup, Tag
+
+# Stop collecting after this many problems: one broken link usually breaks
+# everything after it.
+MAX_VIOLATIONS = 20
+
+
+def describe(node):
+    if isinstance(node, Tag):
+        return "<%s>" % node.name
+    return repr(str(node)[:20])
+
+
+# Every broken link in the tree under `root`, as readable messages; an
+# empty list means the tree is consistent:
+#
+# - each child's `parent` is the tag whose `contents` holds it
+# - `previous_sibling` / `next_sibling` follow the order of `contents`
+# - `next_element` / `previous_element` follow document order (a pre-order
+#   walk of `contents`), both ways
+# - no node is reachable twice (no cycles, no node in two places)
+#
+# When `root` is detached (no parent) its ends are checked too: nothing
+# before the first element or after the last one.
+def violations(root, limit=MAX_VIOLATIONS):
+    problems = []
+    # The BeautifulSoup object is not part of its own element chain.
+    order = [] if isinstance(root, BeautifulSoup) else [root]
+    seen = set([id(root)])
+    stack = [root]
+    while stack and len(problems) < limit:
+        tag = stack.pop()
+        if tag is not root:
+            order.append(tag)
+        if not isinstance(tag, Tag):
+            continue
+        previous = None
+        children = []
+        for child in tag.contents:
+            if id(child) in seen:
+                problems.append("%s is reachable twice (under %s)" % (describe(child), describe(tag)))
+                continue
+            seen.add(id(child))
+            children.append(child)
+            if child.parent is not tag:
+                problems.append("%s under %s has the wrong parent" % (describe(child), describe(tag)))
+            if child.previous_sibling is not previous:
+                problems.append("%s under %s has the wrong previous_sibling" % (describe(child), describe(tag)))
+            if previous is not None and previous.next_sibling is not child:
+                problems.append("%s under %s has the wrong next_sibling" % (describe(previous), describe(tag)))
+            previous = child
+        if previous is not None and previous.next_sibling is not None:
+            problems.append("%s is the last child of %s but has a next_sibling" % (
+                describe(previous), describe(tag)))
+        # Reversed, so children come off the stack in document order.
+        stack.extend(reversed(children))
+    if problems:
+        # The walk above stopped early or skipped nodes; the element chain
+        # would only repeat the same breakage.
+        return problems[:limit]
+
+    for before, after in zip(order, order[1:]):
+        if before.next_element is not after:
+            problems.append("%s has the wrong next_element (expected %s)" % (
+                describe(before), describe(after)))
+        if after.previous_element is not before:
+            problems.append("%s has the wrong previous_element (expected %s)" % (
+                describe(after), describe(before)))
+        if len(problems) >= limit:
+            return problems[:limit]
+    if order and root.parent is None:
+        # html5lib links the first element back to the soup; the other
+        # builders leave it at None.
+        before = order[0].previous_element
+        if before is not None and not (before is root and isinstance(root, BeautifulSoup)):
+            problems.append("%s starts the tree but has a previous_element" % describe(order[0]))
+        if order[-1].next_element is not None:
+            problems.append("%s ends the tree but has a next_element" % describe(order[-1]))
+    return problems[:limit]
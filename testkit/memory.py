@@ -0,0 +1,106 @@
+# Memory helpers: the footprint of parsed nodes, whether nodes removed
+# from a tree are actually reclaimed, and the peak memory of a call.
+
+import gc
+import sys
+import tracemalloc
+import weakref
+
+from bs4 import NavigableString, Tag
+
+LINKS = ("parent", "next_element", "previous_element", "next_sibling", "previous_sibling")
+
+
+# Approximate size of one node: the object, its __dict__ and, for a tag,
+# its contents list, attribute dict and attribute values. Objects shared
+# between nodes (the builder, attribute names) are not counted.
+def node_bytes(node):
+    size = sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+    if isinstance(node, Tag):
+        size += sys.getsizeof(node.contents) + sys.getsizeof(node.attrs)
+        for value in node.attrs.values():
+            size += sys.getsizeof(value)
+            if isinstance(value, list):
+                size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+# {"Tag": (count, bytes), "NavigableString": (count, bytes)} for the nodes
+# below `soup`. Comments, doctypes and other string subclasses count as
+# NavigableString.
+def footprint(soup):
+    totals = {"Tag": [0, 0], "NavigableString": [0, 0]}
+    for node in soup.descendants:
+        key = "NavigableString" if isinstance(node, NavigableString) else "Tag"
+        totals[key][0] += 1
+        totals[key][1] += node_bytes(node)
+    return dict((k, tuple(v)) for k, v in totals.items())
+
+
+def bytes_per_node(soup):
+    return dict((k, float(size) / count if count else 0.0)
+                for k, (count, size) in footprint(soup).items())
+
+
+# `node` and everything below it.
+def subtree(node):
+    if isinstance(node, Tag):
+        return [node] + list(node.descendants)
+    return [node]
+
+
+# Ids of every node reachable from `root` by following any tree link,
+# without recursion.
+def reachable_ids(root):
+    seen = set([id(root)])
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        neighbours = [getattr(node, link, None) for link in LINKS]
+        if isinstance(node, Tag):
+            neighbours.extend(node.contents)
+        for other in neighbours:
+            if other is not None and id(other) not in seen:
+                seen.add(id(other))
+                stack.append(other)
+    return seen
+
+
+# Weak references to `nodes`, to check later whether they were reclaimed.
+class Tracker(object):
+
+    def __init__(self, nodes):
+        self.refs = [weakref.ref(n) for n in nodes]
+
+    def alive(self):
+        return sum(1 for r in self.refs if r() is not None)
+
+
+# Run `remove()` with the cyclic garbage collector paused and report how
+# many of `nodes` (the nodes it removes) are still alive once it returns:
+# with reference counting alone, and after a full collection. `nodes` is
+# emptied so the caller's list does not keep anything alive.
+def reclaimed(nodes, remove):
+    tracker = Tracker(nodes)
+    del nodes[:]
+    gc.collect()
+    gc.disable()
+    try:
+        remove()
+        without_gc = tracker.alive()
+    finally:
+        gc.enable()
+    gc.collect()
+    return without_gc, tracker.alive()
+
+
+# Call `func(*args)` under tracemalloc and return its result and the peak
+# bytes allocated while it ran.
+def peak_bytes(func, *args):
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
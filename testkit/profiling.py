@@ -0,0 +1,259 @@
+# Per-test profiles and hot-function reports.
+#
+#     python -m testkit.runner --profile profile_output mina_test.py
+#     python -m testkit.profiling profile_output
+#     python -m testkit.profiling --compare before after
+#
+# With --profile, the runner runs every test under cProfile and writes one
+# <test id>.prof per test. Each profile starts where the previous test's
+# ended, so the setUpModule and setUpClass work before a test is in its
+# profile, as is the one parse of each fixture document that
+# testkit.fixtures caches: it lands in the first test in each worker that
+# uses the document, and later tests only pay for the copy. The report
+# adds them up and splits the time between parsing (BeautifulSoup's
+# constructor and the tree builders) and tree operations (find_all,
+# insert, decode and the rest of bs4.element, and soupsieve).
+#
+# cProfile only records a function's self time and who called it, not the
+# whole stack, so a function called from both sides (Tag.__init__ while
+# parsing and from new_tag) is split gprof-style: by the time each caller
+# spent in it, the caller's own split carried down, and the outermost bs4
+# entry point on the way deciding. Rows are sorted by time then by name
+# and named by path relative to where bs4 and soupsieve are installed or
+# to the repo, so two reports diff cleanly; --compare lists the functions whose time changed most.
+
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import sysconfig
+
+CATEGORIES = ("parsing", "tree operations", "other")
+
+# What BeautifulSoup itself does besides parsing; __copy__ and
+# __getstate__ are neither, their callees decide.
+SOUP_TREE_OPERATIONS = ("decode", "new_tag", "new_string", "insert_before", "insert_after")
+SOUP_NEITHER = ("__copy__", "__getstate__")
+
+AGGREGATE = "profile.prof"
+REPORT = "profile_report.txt"
+TOP = 25
+
+_PASSES = 100
+
+
+def start():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+# Stop `profiler` and write its data for `test_id` into `directory`.
+def stop(profiler, directory, test_id):
+    profiler.disable()
+    path = os.path.join(directory, test_id + ".prof")
+    profiler.dump_stats(path)
+    return path
+
+
+def _directory(path):
+    return os.path.abspath(path).replace(os.sep, "/").rstrip("/") + "/"
+
+
+# The directories bs4 and soupsieve were imported from, whether that is
+# site-packages, dist-packages or a source checkout, then the ones other
+# installed packages (lxml, html5lib) are in.
+def _library_roots():
+    roots = []
+    paths = sysconfig.get_paths()
+    for module in ("bs4", "soupsieve"):
+        try:
+            package = __import__(module)
+        except ImportError:
+            continue
+        roots.append(_directory(os.path.dirname(os.path.dirname(package.__file__))))
+    roots += [_directory(paths["purelib"]), _directory(paths["platlib"])]
+    return sorted(set(roots), key=roots.index)
+
+
+_LIBRARY_ROOTS = _library_roots()
+
+
+# A function's file relative to where its library was imported from, so
+# bs4's files are "bs4/...", else relative to the repo or the standard
+# library; anything else keeps its full path.
+def _module(filename):
+    path = filename.replace(os.sep, "/")
+    for root in _LIBRARY_ROOTS + [_directory(os.getcwd()), _directory(sysconfig.get_paths()["stdlib"])]:
+        if path.startswith(root):
+            return path[len(root):]
+    return path
+
+
+# The category a function starts when it is called from outside any
+# other: "parsing", "tree operations" or None for everything else.
+def category(func):
+    module, _, name = func
+    module = _module(module)
+    if module == "bs4/__init__.py":
+        if name in SOUP_TREE_OPERATIONS:
+            return "tree operations"
+        return None if name in SOUP_NEITHER else "parsing"
+    if module.startswith("bs4/builder/") or module == "bs4/dammit.py":
+        return "parsing"
+    if module in ("bs4/element.py", "bs4/formatter.py") or module.startswith("soupsieve/"):
+        return "tree operations"
+    return None
+
+
+# A stable name for a function: its path as _module() gives it, line and
+# name.
+def label(func):
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return "%s:%d(%s)" % (_module(filename), line, name)
+
+
+# The share of each function's time spent in each category, carried down
+# the call graph from its callers until it settles.
+def contexts(stats):
+    funcs = sorted(stats.stats)
+    shares = dict((f, {"other": 1.0}) for f in funcs)
+    for _ in range(_PASSES):
+        changed = 0.0
+        for func in funcs:
+            callers = stats.stats[func][4]
+            weights = [(caller, edge[3] or edge[1]) for caller, edge in sorted(callers.items())
+                       if caller != func]
+            share = {} if weights else {"other": 1.0}
+            total = float(sum(w for _, w in weights))
+            for caller, weight in weights:
+                for name, value in shares.get(caller, {"other": 1.0}).items():
+                    share[name] = share.get(name, 0.0) + value * weight / total
+            own = category(func)
+            if own is not None and "other" in share:
+                share[own] = share.get(own, 0.0) + share.pop("other")
+            changed = max([changed] + [abs(share.get(c, 0.0) - shares[func].get(c, 0.0)) for c in CATEGORIES])
+            shares[func] = share
+        if changed < 1e-12:
+            break
+    return shares
+
+
+# The share of a function's calls made in each category: each caller's
+# calls to it, split by the caller's own shares. Without callers, the
+# calls follow `share`, the split of its time.
+def _call_shares(func, callers, shares, share):
+    counts = {}
+    for caller, edge in sorted(callers.items()):
+        if caller != func:
+            for name, value in shares.get(caller, {"other": 1.0}).items():
+                counts[name] = counts.get(name, 0.0) + edge[1] * value
+    own = category(func)
+    if own is not None and "other" in counts:
+        counts[own] = counts.get(own, 0.0) + counts.pop("other")
+    total = sum(counts.values())
+    if not total:
+        return share
+    return dict((name, count / total) for name, count in counts.items())
+
+
+# {category: {label: (seconds of self time, calls)}}, with the calls of a
+# function split between the categories the way its callers made them.
+def split(stats):
+    shares = contexts(stats)
+    times = dict((c, {}) for c in CATEGORIES)
+    for func, (_, calls, self_time, _, callers) in stats.stats.items():
+        share = shares[func]
+        call_share = _call_shares(func, callers, shares, share)
+        for name in CATEGORIES:
+            if share.get(name) or call_share.get(name):
+                seconds, count = times[name].get(label(func), (0.0, 0.0))
+                times[name][label(func)] = (seconds + self_time * share.get(name, 0.0),
+                                            count + calls * call_share.get(name, 0.0))
+    return times
+
+
+def _rows(times):
+    return sorted(times.items(), key=lambda item: (-round(item[1][0], 6), item[0]))
+
+
+def report(stats, top=TOP):
+    times = split(stats)
+    totals = dict((c, sum(t for t, _ in times[c].values())) for c in CATEGORIES)
+    overall = sum(totals.values()) or 1.0
+    lines = ["%-16s %12s  %6s" % ("category", "self ms", "share")]
+    for name in CATEGORIES:
+        lines.append("%-16s %12.3f  %5.1f%%" % (name, totals[name] * 1000.0, 100.0 * totals[name] / overall))
+    for name in CATEGORIES[:2]:
+        lines.append("")
+        lines.append("== %s, top %d" % (name, top))
+        lines.append("%12s  %6s  %10s  %s" % ("self ms", "share", "calls", "function"))
+        for function, (seconds, calls) in _rows(times[name])[:top]:
+            lines.append("%12.3f  %5.1f%%  %10d  %s" % (
+                seconds * 1000.0, 100.0 * seconds / (totals[name] or 1.0), round(calls), function))
+    return lines
+
+
+# The functions whose time changed most from `old` to `new`, slowest first.
+def compare(old, new, top=TOP):
+    before, after = split(old), split(new)
+    changes = []
+    for name in CATEGORIES:
+        for function in set(before[name]) | set(after[name]):
+            was, calls_was = before[name].get(function, (0.0, 0.0))
+            now, calls_now = after[name].get(function, (0.0, 0.0))
+            changes.append((name, function, was, now, calls_was, calls_now))
+    changes.sort(key=lambda c: (-round(c[3] - c[2], 6), c[0], c[1]))
+    lines = ["%-16s %12s  %12s  %12s  %21s  %s" % (
+        "category", "before ms", "after ms", "change ms", "calls", "function")]
+    for name, function, was, now, calls_was, calls_now in changes[:top]:
+        lines.append("%-16s %12.3f  %12.3f  %+12.3f  %10d>%-10d  %s" % (
+            name, was * 1000.0, now * 1000.0, (now - was) * 1000.0, round(calls_was), round(calls_now),
+            function))
+    return lines
+
+
+# Add up the per-test profiles in `paths` and write the aggregate profile
+# and its report into `directory`; returns the report's path.
+def write_report(directory, paths, top=TOP):
+    stats = pstats.Stats(*sorted(paths))
+    stats.dump_stats(os.path.join(directory, AGGREGATE))
+    path = os.path.join(directory, REPORT)
+    with open(path, "w") as f:
+        f.write("\n".join(report(stats, top)) + "\n")
+    return path
+
+
+# A profile directory (its aggregate) or a single .prof file.
+def load(path):
+    if os.path.isdir(path):
+        path = os.path.join(path, AGGREGATE)
+    return pstats.Stats(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m testkit.profiling")
+    parser.add_argument("profiles", nargs="+", help="profile directories or .prof files")
+    parser.add_argument("--compare", action="store_true",
+                        help="compare the first profile against the second")
+    parser.add_argument("--top", type=int, default=TOP)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        if len(args.profiles) != 2:
+            parser.error("--compare takes two profiles")
+        lines = compare(load(args.profiles[0]), load(args.profiles[1]), args.top)
+    else:
+        stats = load(args.profiles[0])
+        for path in args.profiles[1:]:
+            stats.add(load(path))
+        lines = report(stats, args.top)
+    sys.stdout.write("\n".join(lines) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
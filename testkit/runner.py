@@ -0,0 +1,370 @@
+# Sharded multi-process test runner.
+#
+#     python -m testkit.runner *.py
+#
+# Loads tests exactly like `python -m unittest *.py`, splits the test
+# methods into one shard per worker process, balanced by the wall times
+# recorded on the previous run, and merges the results into one report.
+# The exit status and the summary line match unittest's. Besides the usual
+# console output it writes per-test wall time and peak RSS to a text report
+# and a JUnit XML file. The peak RSS is per test on Linux, which can reset
+# the high-water mark between tests; elsewhere it is the peak of the worker
+# process up to the end of the test. With --profile DIR it also profiles
+# every test, see testkit.profiling.
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import traceback
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+from testkit import profiling
+
+# Outcomes in the order a test with several results (subtests) reports the
+# worst one.
+OUTCOMES = ("passed", "skipped", "expected_failure", "unexpected_success", "failure", "error")
+
+DEFAULT_DURATION = 0.01
+
+
+# Turn `python -m unittest` style arguments (paths or dotted names) into
+# module names.
+def module_names(args):
+    names = []
+    for arg in args:
+        if arg.endswith(".py") and os.path.isfile(arg):
+            arg = os.path.normpath(os.path.splitext(arg)[0]).replace(os.sep, ".")
+        names.append(arg)
+    return names
+
+
+def iter_tests(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            for t in iter_tests(test):
+                yield t
+        else:
+            yield test
+
+
+def load_tests(names):
+    suite = unittest.defaultTestLoader.loadTestsFromNames(names)
+    return list(iter_tests(suite))
+
+
+# Split test ids into `count` shards with roughly equal total duration:
+# longest first, each onto the currently lightest shard. Tests without a
+# recorded duration count as the median of the known ones.
+def shard(test_ids, count, durations=None):
+    durations = durations or {}
+    known = sorted(durations[t] for t in test_ids if t in durations)
+    default = known[len(known) // 2] if known else DEFAULT_DURATION
+    weighted = sorted(test_ids, key=lambda t: (-durations.get(t, default), t))
+    shards = [[] for _ in range(max(1, count))]
+    loads = [0.0] * len(shards)
+    for test_id in weighted:
+        i = loads.index(min(loads))
+        shards[i].append(test_id)
+        loads[i] += durations.get(test_id, default)
+    order = dict((t, i) for i, t in enumerate(test_ids))
+    return [sorted(s, key=order.get) for s in shards if s]
+
+
+# Where Linux keeps the process's RSS high-water mark (VmHWM), and the
+# file that resets it to the current RSS when "5" is written to it.
+PROC_STATUS = "/proc/self/status"
+PROC_CLEAR_REFS = "/proc/self/clear_refs"
+
+
+# Start a new RSS high-water mark for the next test; returns False where
+# that is not possible, and peak_rss_kib() is then the peak of the whole
+# process so far.
+def reset_peak_rss():
+    try:
+        with open(PROC_CLEAR_REFS, "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kib():
+    try:
+        with open(PROC_STATUS) as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+# Collects the outcome of every test as plain, picklable data, and with a
+# `profile_dir` a profile of each test. A test's profile runs from the end
+# of the one before it (or the start of the run), so it also covers the
+# setUpModule, setUpClass and tearDownClass calls unittest made in between.
+class RecordingResult(unittest.TestResult):
+
+    def __init__(self, profile_dir=None):
+        super(RecordingResult, self).__init__()
+        self.records = []
+        self.profile_dir = profile_dir
+        self._current = None
+        self._profiler = None
+
+    def startTest(self, test):
+        super(RecordingResult, self).startTest(test)
+        self._current = {"id": test.id(), "outcome": "passed", "problems": [],
+                         "description": str(test), "reason": None}
+        reset_peak_rss()
+        self._start = time.perf_counter()
+
+    # The time and peak RSS are taken before the profile is written, so
+    # they do not include the dump.
+    def stopTest(self, test):
+        record = self._current
+        record["time"] = time.perf_counter() - self._start
+        record["peak_rss_kib"] = peak_rss_kib()
+        if self._profiler is not None:
+            record["profile"] = profiling.stop(self._profiler, self.profile_dir, test.id())
+            self._profiler = profiling.start()
+        super(RecordingResult, self).stopTest(test)
+        self.records.append(record)
+        self._current = None
+
+    def startTestRun(self):
+        super(RecordingResult, self).startTestRun()
+        if self.profile_dir:
+            self._profiler = profiling.start()
+
+    # What runs after the last test (its class's tearDownClass) is not
+    # profiled.
+    def stopTestRun(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler = None
+        super(RecordingResult, self).stopTestRun()
+
+    def _outcome(self, outcome):
+        if OUTCOMES.index(outcome) > OUTCOMES.index(self._current["outcome"]):
+            self._current["outcome"] = outcome
+
+    def _problem(self, outcome, test, err):
+        self._outcome(outcome)
+        self._current["problems"].append(
+            (outcome, str(test), self._exc_info_to_string(err, test)))
+
+    def addFailure(self, test, err):
+        super(RecordingResult, self).addFailure(test, err)
+        self._problem("failure", test, err)
+
+    def addError(self, test, err):
+        super(RecordingResult, self).addError(test, err)
+        if self._current is None:
+            # An error in setUpClass or setUpModule, outside any test.
+            # unittest does not count it as a test run.
+            self.records.append({"id": test.id(), "outcome": "error", "time": 0.0, "fixture": True,
+                                 "description": str(test), "reason": None,
+                                 "peak_rss_kib": peak_rss_kib(),
+                                 "problems": [("error", str(test), self._exc_info_to_string(err, test))]})
+            return
+        self._problem("error", test, err)
+
+    def addSubTest(self, test, subtest, err):
+        super(RecordingResult, self).addSubTest(test, subtest, err)
+        if err is not None:
+            outcome = "failure" if issubclass(err[0], test.failureException) else "error"
+            self._problem(outcome, subtest, err)
+
+    def addSkip(self, test, reason):
+        super(RecordingResult, self).addSkip(test, reason)
+        self._outcome("skipped")
+        self._current["reason"] = reason
+
+    def addExpectedFailure(self, test, err):
+        super(RecordingResult, self).addExpectedFailure(test, err)
+        self._outcome("expected_failure")
+
+    def addUnexpectedSuccess(self, test):
+        super(RecordingResult, self).addUnexpectedSuccess(test)
+        self._outcome("unexpected_success")
+
+
+# Run the tests in one shard. Every worker loads the same modules, so test
+# ids (including loader failures) resolve the same way as in the parent.
+def run_shard(names, test_ids, profile_dir=None):
+    wanted = set(test_ids)
+    suite = unittest.TestSuite(t for t in load_tests(names) if t.id() in wanted)
+    result = RecordingResult(profile_dir)
+    result.startTestRun()
+    try:
+        suite.run(result)
+    except Exception:
+        result.records.append({"id": "runner", "outcome": "error", "time": 0.0, "fixture": True,
+                               "description": "runner", "reason": None,
+                               "peak_rss_kib": peak_rss_kib(),
+                               "problems": [("error", "runner", traceback.format_exc())]})
+    finally:
+        result.stopTestRun()
+    return result.records
+
+
+def run_tests(names, jobs, durations=None, profile_dir=None):
+    test_ids = [t.id() for t in load_tests(names)]
+    shards = shard(test_ids, jobs, durations)
+    if len(shards) <= 1:
+        return [r for s in shards for r in run_shard(names, s, profile_dir)]
+    records = []
+    with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+        for shard_records in pool.map(run_shard, [names] * len(shards), shards, [profile_dir] * len(shards)):
+            records.extend(shard_records)
+    order = dict((t, i) for i, t in enumerate(test_ids))
+    records.sort(key=lambda r: order.get(r["id"], len(order)))
+    return records
+
+
+def count(records, outcome):
+    if outcome in ("failure", "error"):
+        return sum(1 for r in records for p in r["problems"] if p[0] == outcome)
+    return sum(1 for r in records if r["outcome"] == outcome)
+
+
+def was_successful(records):
+    return not any(r["outcome"] in ("failure", "error", "unexpected_success") for r in records)
+
+
+# The summary unittest's TextTestRunner prints, for the merged records.
+def summary(records, elapsed):
+    run = sum(1 for r in records if not r.get("fixture"))
+    lines = ["Ran %d test%s in %.3fs" % (run, "" if run == 1 else "s", elapsed), ""]
+    infos = []
+    for outcome, label in (("failure", "failures"), ("error", "errors"), ("skipped", "skipped"),
+                           ("expected_failure", "expected failures"),
+                           ("unexpected_success", "unexpected successes")):
+        n = count(records, outcome)
+        if n:
+            infos.append("%s=%d" % (label, n))
+    status = "OK" if was_successful(records) else "FAILED"
+    lines.append("%s (%s)" % (status, ", ".join(infos)) if infos else status)
+    return lines
+
+
+def problem_details(records):
+    lines = []
+    for record in records:
+        for outcome, description, trace in record["problems"]:
+            lines.append("=" * 70)
+            lines.append("%s: %s" % ("FAIL" if outcome == "failure" else "ERROR", description))
+            lines.append("-" * 70)
+            lines.append(trace.rstrip("\n"))
+            lines.append("")
+        if record["outcome"] == "unexpected_success":
+            lines.append("=" * 70)
+            lines.append("UNEXPECTED SUCCESS: %s" % record["description"])
+    return lines
+
+
+def timing_report(records):
+    lines = ["%10s  %12s  %-18s  %s" % ("time (s)", "peak RSS KiB", "outcome", "test")]
+    for record in sorted(records, key=lambda r: -r["time"]):
+        lines.append("%10.4f  %12d  %-18s  %s" % (
+            record["time"], record["peak_rss_kib"], record["outcome"], record["id"]))
+    return lines
+
+
+def junit_xml(records, elapsed):
+    root = ElementTree.Element("testsuites", tests=str(len(records)),
+                               failures=str(count(records, "failure")),
+                               errors=str(count(records, "error")), time="%.3f" % elapsed)
+    suites = {}
+    for record in records:
+        classname, _, name = record["id"].rpartition(".")
+        suite = suites.get(classname)
+        if suite is None:
+            suite = suites[classname] = ElementTree.SubElement(root, "testsuite", name=classname)
+        case = ElementTree.SubElement(suite, "testcase", classname=classname, name=name,
+                                      time="%.4f" % record["time"])
+        properties = ElementTree.SubElement(case, "properties")
+        ElementTree.SubElement(properties, "property", name="peak_rss_kib",
+                               value=str(record["peak_rss_kib"]))
+        for outcome, description, trace in record["problems"]:
+            tag = "failure" if outcome == "failure" else "error"
+            element = ElementTree.SubElement(case, tag, message=description)
+            element.text = trace
+        if record["outcome"] == "skipped":
+            ElementTree.SubElement(case, "skipped", message=record["reason"] or "")
+        elif record["outcome"] == "unexpected_success":
+            ElementTree.SubElement(case, "failure", message="unexpected success")
+    for suite_name, suite in suites.items():
+        cases = [r for r in records if r["id"].rpartition(".")[0] == suite_name]
+        suite.set("tests", str(len(cases)))
+        suite.set("failures", str(count(cases, "failure")))
+        suite.set("errors", str(count(cases, "error")))
+        suite.set("skipped", str(count(cases, "skipped")))
+        suite.set("time", "%.4f" % sum(r["time"] for r in cases))
+    return ElementTree.tostring(root, encoding="unicode")
+
+
+def load_durations(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_durations(path, records):
+    durations = load_durations(path)
+    durations.update((r["id"], r["time"]) for r in records)
+    with open(path, "w") as f:
+        json.dump(durations, f, indent=1, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m testkit.runner")
+    parser.add_argument("tests", nargs="+", help="test modules, as for python -m unittest")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--durations", default=".test_durations.json",
+                        help="per-test times from the previous run, used to balance shards")
+    parser.add_argument("--report", default="test_output.txt",
+                        help="per-test wall time and peak RSS")
+    parser.add_argument("--junit", default="test_output.xml")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="write a cProfile of every test and a hot-function report here")
+    parser.add_argument("--profile-top", type=int, default=profiling.TOP,
+                        help="functions listed per category in the profile report")
+    args = parser.parse_args(argv)
+
+    names = module_names(args.tests)
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+    start = time.perf_counter()
+    records = run_tests(names, args.jobs, load_durations(args.durations), args.profile)
+    elapsed = time.perf_counter() - start
+
+    for line in problem_details(records) + ["-" * 70] + summary(records, elapsed):
+        sys.stderr.write(line + "\n")
+    with open(args.report, "w") as f:
+        f.write("\n".join(timing_report(records) + [""] + summary(records, elapsed)) + "\n")
+    with open(args.junit, "w") as f:
+        f.write(junit_xml(records, elapsed))
+    if args.profile:
+        profiles = [r["profile"] for r in records if "profile" in r]
+        if profiles:
+            path = profiling.write_report(args.profile, profiles, args.profile_top)
+            sys.stderr.write("profile report: %s\n" % path)
+    else:
+        # Profiled times are inflated; keep them out of the shard balance.
+        save_durations(args.durations, records)
+    return 0 if was_successful(records) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# Serialization in chunks, for writing a large tree to a file or socket
+# without building the whole document as one string first.
+#
+# Tag.decode() in bs4 4.10 renders every tag's contents to a string and
+# joins them into its parent's, so str(), encode() and prettify() hold the
+# full output (and, while it is built, copies of most of it) in memory.
+# fragments() walks the tree with an explicit stack instead, yields the
+# same output piece by piece, and works on trees too deep for decode().
+
+from bs4 import BeautifulSoup, NavigableString
+from bs4.element import DEFAULT_OUTPUT_ENCODING, PYTHON_SPECIFIC_ENCODINGS, AttributeValueWithCharsetSubstitution
+from bs4.formatter import Formatter
+
+# The standard formatters, by the names decode() and prettify() take.
+FORMATTERS = ("minimal", "html", "html5", None)
+
+CHUNK_SIZE = 64 * 1024
+
+
+# The opening tag, as Tag.decode() writes it.
+def _start_tag(tag, eventual_encoding, formatter):
+    attrs = []
+    for key, val in formatter.attributes(tag):
+        if val is None:
+            attrs.append(key)
+            continue
+        if isinstance(val, (list, tuple)):
+            val = " ".join(val)
+        elif not isinstance(val, str):
+            val = str(val)
+        elif isinstance(val, AttributeValueWithCharsetSubstitution) and eventual_encoding is not None:
+            val = val.encode(eventual_encoding)
+        attrs.append(str(key) + "=" + formatter.quoted_attribute_value(formatter.attribute_value(val)))
+    prefix = tag.prefix + ":" if tag.prefix else ""
+    close = (formatter.void_element_close_prefix or "") if tag.is_empty_element else ""
+    attribute_string = " " + " ".join(attrs) if attrs else ""
+    return "<%s%s%s%s>" % (prefix, tag.name, attribute_string, close)
+
+
+# A tag being written: what decode() needs to render its contents and to
+# close it. `mark` is set once the opening tag is out.
+class _Frame(object):
+
+    def __init__(self, tag, level):
+        self.tag = tag
+        self.children = iter(tag.contents)
+        self.level = level
+        self.pretty_print = tag._should_pretty_print(level)
+        self.space = " " * (level - 1) if level is not None else ""
+        self.indent_contents = level + 1 if self.pretty_print else None
+        self.close_tag = ""
+        if not tag.is_empty_element:
+            self.close_tag = "</%s%s>" % (tag.prefix + ":" if tag.prefix else "", tag.name)
+        self.preserve_whitespace = bool(tag.preserve_whitespace_tags
+                                        and tag.name in tag.preserve_whitespace_tags)
+        self.mark = 0
+
+    def start(self, eventual_encoding, formatter):
+        if self.tag.hidden:
+            return []
+        pieces = [self.space] if self.level is not None else []
+        pieces.append(_start_tag(self.tag, eventual_encoding, formatter))
+        if self.pretty_print:
+            pieces.append("\n")
+        return pieces
+
+    # A child string, as decode_contents() writes it.
+    def text(self, string, formatter):
+        text = string.output_ready(formatter)
+        level = self.indent_contents
+        if text and level and not self.preserve_whitespace:
+            text = text.strip()
+        if not text:
+            return []
+        if level is None or self.preserve_whitespace:
+            return [text]
+        return [" " * (level - 1), text, "\n"]
+
+    # `written` and `last` describe the output so far: decode() looks at
+    # whether the contents came out empty and at their last character.
+    def end(self, written, last):
+        if self.tag.hidden:
+            return []
+        pieces = []
+        if self.pretty_print and written > self.mark and last != "\n":
+            pieces.append("\n")
+        if self.pretty_print and self.close_tag:
+            pieces.append(self.space)
+        pieces.append(self.close_tag)
+        if self.level is not None and self.close_tag and self.tag.next_sibling:
+            pieces.append("\n")
+        return pieces
+
+
+# Yield the pieces of `tag.decode(indent_level, eventual_encoding,
+# formatter)` in order. Only the tags from `tag` down to the current node
+# are kept, each with an iterator over its children, so memory grows with
+# the depth of the tree and not with its size.
+def _decode(tag, indent_level, eventual_encoding, formatter):
+    # The number of non-empty pieces yielded and the last character of the
+    # last one.
+    written = 0
+    last = ""
+    stack = []
+    frame = _Frame(tag, indent_level)
+    pieces = frame.start(eventual_encoding, formatter)
+    while True:
+        for piece in pieces:
+            if piece:
+                written += 1
+                last = piece[-1]
+                yield piece
+        if frame is not None:
+            frame.mark = written
+            stack.append(frame)
+            frame = None
+        if not stack:
+            return
+        current = stack[-1]
+        child = next(current.children, None)
+        if child is None:
+            stack.pop()
+            pieces = current.end(written, last)
+        elif isinstance(child, NavigableString):
+            pieces = current.text(child, formatter)
+        else:
+            frame = _Frame(child, current.indent_contents)
+            pieces = frame.start(eventual_encoding, formatter)
+
+
+# Yield the output of `tag.decode(formatter=formatter)`, or of prettify()
+# with `pretty_print`, in pieces that join to exactly that string.
+# `eventual_encoding` is the encoding the output is destined for, as
+# encode() passes it to decode().
+def fragments(tag, pretty_print=False, formatter="minimal", eventual_encoding=DEFAULT_OUTPUT_ENCODING):
+    if not isinstance(formatter, Formatter):
+        formatter = tag.formatter_for_name(formatter)
+    if isinstance(tag, BeautifulSoup):
+        # BeautifulSoup.decode(): the XML declaration, and pretty-printing
+        # from indent level 0 rather than the 1 prettify() passes a tag.
+        if tag.is_xml:
+            if eventual_encoding in PYTHON_SPECIFIC_ENCODINGS:
+                eventual_encoding = None
+            encoding_part = ' encoding="%s"' % eventual_encoding if eventual_encoding is not None else ""
+            yield '<?xml version="1.0"%s?>\n' % encoding_part
+        indent_level = 0 if pretty_print else None
+    else:
+        indent_level = 1 if pretty_print else None
+    for piece in _decode(tag, indent_level, eventual_encoding, formatter):
+        yield piece
+
+
+# Yield the serialized tree in chunks of about `chunk_size` characters:
+# strings, or bytes like tag.encode(encoding) when an encoding is given.
+# A chunk only goes over the size by at most one piece (a tag or string).
+def chunks(tag, encoding=None, pretty_print=False, formatter="minimal", chunk_size=CHUNK_SIZE,
+           errors="xmlcharrefreplace"):
+    eventual_encoding = encoding if encoding is not None else DEFAULT_OUTPUT_ENCODING
+    buffered = []
+    size = 0
+    for piece in fragments(tag, pretty_print, formatter, eventual_encoding):
+        buffered.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            chunk = "".join(buffered)
+            yield chunk.encode(encoding, errors) if encoding is not None else chunk
+            buffered = []
+            size = 0
+    if buffered:
+        chunk = "".join(buffered)
+        yield chunk.encode(encoding, errors) if encoding is not None else chunk
+
+
+# Write the serialized tree to `out` chunk by chunk and return how many
+# characters (or bytes, with an encoding) were written. `out` is a file
+# object, or a socket, which is sent bytes with sendall() and so needs an
+# encoding.
+def write(tag, out, encoding=None, pretty_print=False, formatter="minimal", chunk_size=CHUNK_SIZE):
+    send = getattr(out, "sendall", None) or out.write
+    total = 0
+    for chunk in chunks(tag, encoding, pretty_print, formatter, chunk_size):
+        send(chunk)
+        total += len(chunk)
+    return total
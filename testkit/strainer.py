@@ -0,0 +1,58 @@
+# Partial parsing with SoupStrainer for find_all-heavy workloads.
+#
+# strainer_for() takes the same filters as find_all (a name given as a
+# string, regular expression, list or True, plus attribute and string
+# filters) and builds the SoupStrainer that keeps exactly the parts of the
+# document those filters can match. find_all on the strained tree then
+# returns the same results as on a full parse.
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.builder import HTMLTreeBuilder
+from bs4.element import nonwhitespace_re
+
+# Tree builders that honour parse_only; html5lib parses the whole document.
+STRAINING_BACKENDS = ("html.parser", "lxml")
+
+
+# While parsing, SoupStrainer sees attribute values before the tree builder
+# splits multi-valued ones such as class into lists, so class_="news" would
+# never match class="section news" even though find_all matches it on the
+# parsed tree. This strainer splits those values first.
+class MultiValuedStrainer(SoupStrainer):
+
+    def __init__(self, name=None, attrs={}, text=None,
+                 cdata_list_attributes=HTMLTreeBuilder.DEFAULT_CDATA_LIST_ATTRIBUTES, **kwargs):
+        super(MultiValuedStrainer, self).__init__(name, attrs, text, **kwargs)
+        self.cdata_list_attributes = cdata_list_attributes or {}
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        if markup_attrs and not isinstance(markup_name, Tag):
+            markup_attrs = self.split_values(markup_name, dict(markup_attrs))
+        return super(MultiValuedStrainer, self).search_tag(markup_name, markup_attrs)
+
+    def split_values(self, name, attrs):
+        multi_valued = set(self.cdata_list_attributes.get("*", []))
+        multi_valued.update(self.cdata_list_attributes.get((name or "").lower(), []))
+        for key, value in attrs.items():
+            if key in multi_valued and isinstance(value, str):
+                attrs[key] = nonwhitespace_re.findall(value)
+        return attrs
+
+
+def strainer_for(name=None, attrs={}, recursive=True, string=None, **kwargs):
+    if not recursive:
+        # A strainer only sees one tag at a time, not its depth.
+        raise ValueError("find_all(recursive=False) cannot be turned into a SoupStrainer")
+    kwargs.pop("limit", None)
+    if "text" in kwargs:
+        string = kwargs.pop("text")
+    return MultiValuedStrainer(name, attrs, string, **kwargs)
+
+
+# Parse only what `find_all(*args, **kwargs)` can match and run it.
+def strained_find_all(markup, *args, **kwargs):
+    parser = kwargs.pop("parser", "html.parser")
+    if parser not in STRAINING_BACKENDS:
+        raise ValueError("%s does not support parse_only" % parser)
+    soup = BeautifulSoup(markup, parser, parse_only=strainer_for(*args, **kwargs))
+    return soup.find_all(*args, **kwargs)
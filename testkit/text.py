@@ -0,0 +1,105 @@
+# Fragmented text, as loops of append()/insert() leave it, and a smooth()
+# that runs in linear time.
+#
+# Tag.smooth() in bs4 4.10 merges adjacent strings one pair at a time, and
+# every merge looks both strings up with index() and copies the text merged
+# so far, so a run of n fragments costs O(n**2). smooth() below joins each
+# run of adjacent strings once and relinks the tree around the new string,
+# with the same result as Tag.smooth().
+
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+from bs4.element import PreformattedString
+
+from testkit.fixtures import clone_tree
+
+FRAGMENT = "word "
+
+# Built once per (count, nested) and cloned for every caller, like the
+# fixture cache: appending a million fragments takes seconds.
+_TEMPLATES = {}
+
+
+def _build(count, nested):
+    soup = BeautifulSoup("<html><body><div></div></body></html>", "html.parser")
+    div = soup.div
+    if not nested:
+        div.extend([FRAGMENT] * count)
+        return soup
+    # Blocks of 16 strings: runs directly in the <div>, inside <b> and in a
+    # nested <i>, split by tags and by a comment, which is never merged.
+    for _ in range(max(1, count // 16)):
+        div.extend([FRAGMENT] * 3)
+        b = soup.new_tag("b")
+        b.extend([FRAGMENT] * 2)
+        i = soup.new_tag("i")
+        i.extend([FRAGMENT] * 3)
+        b.append(i)
+        b.append(FRAGMENT)
+        div.append(b)
+        div.extend([FRAGMENT] * 2)
+        div.append(Comment("comment"))
+        div.extend([FRAGMENT] * 4)
+    return soup
+
+
+# A soup whose <div> holds `count` adjacent string fragments. With `nested`,
+# the fragments are spread over runs in the <div> and in nested tags.
+def fragmented(count, nested=False):
+    key = (count, nested)
+    if key not in _TEMPLATES:
+        _TEMPLATES[key] = _build(count, nested)
+    return clone_tree(_TEMPLATES[key])
+
+
+def _mergeable(node):
+    return isinstance(node, NavigableString) and not isinstance(node, PreformattedString)
+
+
+# Replace `run`, adjacent sibling strings, with one string, linked in
+# where they were.
+def _merge(run):
+    first, last = run[0], run[-1]
+    merged = NavigableString("".join(run))
+    merged.parent = first.parent
+    merged.previous_sibling = first.previous_sibling
+    merged.next_sibling = last.next_sibling
+    merged.previous_element = first.previous_element
+    merged.next_element = last.next_element
+    if merged.previous_sibling is not None:
+        merged.previous_sibling.next_sibling = merged
+    if merged.next_sibling is not None:
+        merged.next_sibling.previous_sibling = merged
+    if merged.previous_element is not None:
+        merged.previous_element.next_element = merged
+    if merged.next_element is not None:
+        merged.next_element.previous_element = merged
+    # Unlink the fragments, as extract() would, so nothing keeps them or
+    # the tree alive.
+    for fragment in run:
+        fragment.parent = fragment.previous_sibling = fragment.next_sibling = None
+        fragment.previous_element = fragment.next_element = None
+    return merged
+
+
+# Merge every run of adjacent strings under `tag` into one string, like
+# tag.smooth(), in one pass over the tree.
+def smooth(tag):
+    stack = [tag]
+    while stack:
+        current = stack.pop()
+        contents = []
+        run = []
+        for child in current.contents:
+            if _mergeable(child):
+                run.append(child)
+                continue
+            if run:
+                contents.append(_merge(run) if len(run) > 1 else run[0])
+                run = []
+            contents.append(child)
+            if isinstance(child, Tag):
+                stack.append(child)
+        if run:
+            contents.append(_merge(run) if len(run) > 1 else run[0])
+        if len(contents) != len(current.contents):
+            current.contents[:] = contents
@@ -0,0 +1,146 @@
+# Shipping parsed trees to other processes.
+#
+# pickle and copy.deepcopy follow a node's links (next_element, parent,
+# contents, ...) recursively, several frames per node, so in bs4 4.10 they
+# raise RecursionError on a tree of about a thousand nodes, deep or not.
+# copy.copy re-parses a BeautifulSoup from its encoded output and copies a
+# Tag child by child; both recurse once per level of nesting.
+#
+# flatten() turns a tree into a list of plain entries in document order,
+# each naming its parent by index, which pickles without recursion;
+# unflatten() rebuilds the same tree from it, linked up the way
+# testkit.fixtures.clone_tree links a copy. Picklable(soup) does both on
+# the way through pickle, so a tree can be sent to a worker process.
+
+import pickle
+
+from bs4 import BeautifulSoup, NavigableString
+from bs4.element import PageElement
+
+LINKS = ("parent", "next_element", "previous_element", "next_sibling", "previous_sibling")
+
+# Bits of an entry's `links`: the node's previous_element is the node
+# before it in document order, and that node's next_element is this one.
+_LINKED_BACK = 1
+_LINKED_FORWARD = 2
+
+
+# The picklable part of a node's __dict__, with references to other nodes
+# (as in a BeautifulSoup's parser state) replaced by their indexes.
+def _state(node, index):
+    if isinstance(node, BeautifulSoup):
+        state = node.__getstate__()
+    else:
+        state = dict(node.__dict__)
+    for key in LINKS:
+        state.pop(key, None)
+    state.pop("contents", None)
+    refs = {}
+    for key, value in list(state.items()):
+        if isinstance(value, PageElement):
+            refs[key] = index.get(id(value))
+            del state[key]
+        elif isinstance(value, list) and any(isinstance(v, PageElement) for v in value):
+            refs[key] = [index.get(id(v)) for v in value if isinstance(v, PageElement)]
+            del state[key]
+    return state, refs
+
+
+# What differs from tag to tag; the rest of a tag's state comes from the
+# builder and is the same for most tags, so it is stored once and shared.
+OWN_KEYS = ("name", "attrs", "sourceline", "sourcepos")
+
+
+# The tree under `root`, flattened: a list of the distinct shared tag
+# states, and a list of (parent index, class, string or None, own state,
+# shared state index, node references, links) entries in document order.
+def flatten(root):
+    nodes = [root]
+    index = {id(root): 0}
+    for node in root.descendants:
+        index[id(node)] = len(nodes)
+        nodes.append(node)
+    shared_states = []
+    shared_index = {}
+    entries = []
+    for i, node in enumerate(nodes):
+        links = 0
+        if i:
+            previous = nodes[i - 1]
+            if node.previous_element is previous:
+                links |= _LINKED_BACK
+            if previous.next_element is node:
+                links |= _LINKED_FORWARD
+        parent = index[id(node.parent)] if i else None
+        text = str(node) if isinstance(node, NavigableString) else None
+        state, refs = _state(node, index)
+        shared = None
+        if text is None and i:
+            common = dict((k, v) for k, v in state.items() if k not in OWN_KEYS)
+            key = tuple(sorted((k, id(v)) for k, v in common.items()))
+            shared = shared_index.get(key)
+            if shared is None:
+                shared = shared_index[key] = len(shared_states)
+                shared_states.append(common)
+            state = dict((k, state[k]) for k in OWN_KEYS if k in state)
+        entries.append((parent, type(node), text, state or None, shared, refs or None, links))
+    return shared_states, entries
+
+
+# Rebuild the tree flatten() described and return its root.
+def unflatten(flat):
+    shared_states, entries = flat
+    nodes = []
+    for parent_index, cls, text, state, shared, refs, links in entries:
+        if text is not None:
+            node = str.__new__(cls, text)
+        else:
+            node = object.__new__(cls)
+        if shared is not None:
+            node.__dict__.update(shared_states[shared])
+        if state:
+            node.__dict__.update(state)
+        if text is None:
+            node.contents = []
+        node.parent = node.next_element = node.previous_element = None
+        node.next_sibling = node.previous_sibling = None
+        if parent_index is not None:
+            parent = nodes[parent_index]
+            if parent.contents:
+                node.previous_sibling = parent.contents[-1]
+                node.previous_sibling.next_sibling = node
+            parent.contents.append(node)
+            node.parent = parent
+            previous = nodes[-1]
+            if links & _LINKED_BACK:
+                node.previous_element = previous
+            if links & _LINKED_FORWARD:
+                previous.next_element = node
+        nodes.append(node)
+    for node, entry in zip(nodes, entries):
+        for key, ref in (entry[5] or {}).items():
+            if isinstance(ref, list):
+                setattr(node, key, [nodes[i] for i in ref if i is not None])
+            else:
+                setattr(node, key, nodes[ref] if ref is not None else None)
+    return nodes[0]
+
+
+def dumps(root, protocol=pickle.HIGHEST_PROTOCOL):
+    return pickle.dumps(flatten(root), protocol)
+
+
+def loads(data):
+    return unflatten(pickle.loads(data))
+
+
+# Wraps a tree so that pickling it stores the flattened tree, and
+# unpickling gives back the tree itself (not a Picklable): pass
+# Picklable(soup) to a process pool and the worker receives a soup.
+class Picklable(object):
+
+    def __init__(self, root):
+        self.root = root
+
+    def __reduce__(self):
+        return unflatten, (flatten(self.root),)
@@ -0,0 +1,109 @@
+# Traversal on pathologically shaped trees: how much Python stack an API
+# uses as the tree gets deeper, and how much work a generator does before
+# it hands out its first item.
+#
+# A "deep" tree of size n is n nested <div>s; a "wide" one is a single
+# <div> with n <p> children. Each tree comes with a probe node: the
+# innermost <div> of a deep tree, the last <p> of a wide one.
+
+import sys
+import time
+import tracemalloc
+
+from testkit.documents import deep_document, wide_document
+from testkit.fixtures import snapshot
+
+
+def deep_tree(depth):
+    soup = snapshot(deep_document(depth))
+    return soup, soup.find(string="leaf").parent
+
+
+def wide_tree(width):
+    soup = snapshot(wide_document(width))
+    return soup, soup.div.contents[-1]
+
+
+TREES = {"deep": deep_tree, "wide": wide_tree}
+
+# Traversal APIs, called as api(soup, node). The generators are only
+# advanced by whoever consumes them.
+APIS = {
+    "parents": lambda soup, node: node.parents,
+    "descendants": lambda soup, node: soup.descendants,
+    "index": lambda soup, node: node.parent.index(node),
+    "decode": lambda soup, node: soup.decode(),
+    "decompose": lambda soup, node: soup.body.decompose(),
+}
+GENERATORS = ("parents", "descendants")
+
+
+# Run the API to completion (exhausting a generator).
+def run_api(name, soup, node):
+    result = APIS[name](soup, node)
+    if name in GENERATORS:
+        for _ in result:
+            pass
+    return result
+
+
+# Call `func(*args)` and return its result and the deepest Python call
+# stack it reached, in frames above the caller.
+def stack_depth(func, *args):
+    depth = [0, 0]
+
+    def profile(frame, event, arg):
+        if event == "call":
+            depth[0] += 1
+            depth[1] = max(depth[1], depth[0])
+        elif event == "return":
+            depth[0] -= 1
+
+    old = sys.getprofile()
+    sys.setprofile(profile)
+    try:
+        result = func(*args)
+    finally:
+        sys.setprofile(old)
+    return result, depth[1]
+
+
+# Extra Python frames the API needs per level of nesting, measured on two
+# deep trees small enough for a recursive implementation to survive. About
+# 0 for an iterative API; 1 or more means it recurses once per level and
+# will hit the recursion limit on deep enough trees.
+def frames_per_level(name, small=50, large=200):
+    depths = []
+    for size in (small, large):
+        soup, node = deep_tree(size)
+        depths.append(stack_depth(run_api, name, soup, node)[1])
+    return float(depths[1] - depths[0]) / (large - small)
+
+
+# Seconds until `iterable` hands out its first item, and the item.
+def first_item(iterable):
+    start = time.perf_counter()
+    item = next(iter(iterable), None)
+    return time.perf_counter() - start, item
+
+
+# Seconds to exhaust `iterable`, and how many items it gave.
+def full_iteration(iterable):
+    start = time.perf_counter()
+    count = 0
+    for _ in iterable:
+        count += 1
+    return time.perf_counter() - start, count
+
+
+# Peak bytes allocated while creating a generator API's iterator and taking
+# its first item. A lazy generator allocates the same small amount at any
+# tree size; one that builds the whole sequence up front grows with it.
+def first_item_bytes(name, soup, node):
+    tracemalloc.start()
+    try:
+        next(iter(APIS[name](soup, node)), None)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
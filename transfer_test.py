@@ -0,0 +1,125 @@
+# This class is intended to test copying and pickling parsed trees, as
+# when they are shipped to worker processes:
+# pickle, copy.copy and copy.deepcopy of a BeautifulSoup and of a Tag on
+# the fixtures, with every installed parser
+# testkit.transfer round trips of the fixtures and of large, deep and wide
+# trees, also through a process pool
+# copies have the same find_all(), descendants and parents as the
+# original, are consistent and are independent of it
+# where bs4's own pickling and copying hit the recursion limit
+
+import copy
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import NavigableString
+
+from testkit.backends import installed_backends, tree_lines
+from testkit.documents import FIXTURE_DOCUMENTS, generate_document
+from testkit.fixtures import parsed, snapshot
+from testkit.invariants import violations
+from testkit.transfer import Picklable, dumps, loads
+from testkit.traversal import deep_tree, wide_tree
+
+
+def pickle_round_trip(root):
+    return pickle.loads(pickle.dumps(root))
+
+
+def transfer_round_trip(root):
+    return loads(dumps(root))
+
+
+# Runs in a worker process, on the tree it was sent.
+def describe_tree(root):
+    return type(root).__name__, tree_lines(root), violations(root)
+
+
+class TransferTest(unittest.TestCase):
+
+    # `actual` is a separate tree with the structure of `expected`
+    def assertSameTree(self, actual, expected):
+        self.assertIsNot(actual, expected)
+        self.assertIs(type(actual), type(expected))
+        self.assertEqual(tree_lines(actual), tree_lines(expected))
+        self.assertEqual([(tag.name, tag.attrs) for tag in actual.find_all(True)],
+                         [(tag.name, tag.attrs) for tag in expected.find_all(True)])
+        nodes, originals = list(actual.descendants), list(expected.descendants)
+        self.assertEqual(len(nodes), len(originals))
+        for node, original in zip(nodes, originals):
+            self.assertIsNot(node, original)
+            self.assertEqual([p.name for p in node.parents], [p.name for p in original.parents])
+        self.assertEqual(violations(actual), [])
+
+    def test_bs4_fixtures(self):
+        copies = {"pickle": pickle_round_trip, "copy": copy.copy, "deepcopy": copy.deepcopy}
+        for backend in installed_backends():
+            for name, document in sorted(FIXTURE_DOCUMENTS.items()):
+                soup = parsed(document, backend)
+                for method, make_copy in sorted(copies.items()):
+                    with self.subTest(backend=backend, document=name, copy=method):
+                        self.assertSameTree(make_copy(soup), soup)
+                        self.assertEqual(str(make_copy(soup.body)), str(soup.body))
+
+    def test_fixtures(self):
+        for backend in installed_backends():
+            for name, document in sorted(FIXTURE_DOCUMENTS.items()):
+                with self.subTest(backend=backend, document=name):
+                    soup = parsed(document, backend)
+                    self.assertSameTree(transfer_round_trip(soup), soup)
+                    self.assertSameTree(pickle_round_trip(Picklable(soup)), soup)
+                    body = transfer_round_trip(soup.body)
+                    self.assertIsNone(body.parent)
+                    self.assertEqual(str(body), str(soup.body))
+                    self.assertEqual(violations(body), [])
+
+    def test_large(self):
+        for name, soup in (("generated", parsed(generate_document(5000))),
+                           ("deep", deep_tree(3000)[0]),
+                           ("wide", wide_tree(5000)[0])):
+            with self.subTest(tree=name):
+                self.assertSameTree(transfer_round_trip(soup), soup)
+
+    # the copy is a working tree of its own
+    def test_independent(self):
+        soup = snapshot(FIXTURE_DOCUMENTS["yang"])
+        text = str(soup)
+        clone = transfer_round_trip(soup)
+        clone.a.decompose()
+        clone.nochild.append(clone.new_tag("b"))
+        clone.find("child").string = "changed"
+        self.assertEqual(str(soup), text)
+        self.assertEqual(violations(clone), [])
+        self.assertIsInstance(clone.find("child").string, NavigableString)
+
+    def test_process_pool(self):
+        soup = parsed(generate_document(2000))
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            name, lines, problems = pool.submit(describe_tree, Picklable(soup)).result()
+        self.assertEqual(name, "BeautifulSoup")
+        self.assertEqual(lines, tree_lines(soup))
+        self.assertEqual(problems, [])
+
+    # pickle and deepcopy recurse along the element links, a few frames
+    # per node, so they fail on all but small documents in bs4 4.10
+    @unittest.expectedFailure
+    def test_bs4_pickle_large(self):
+        soup = parsed(generate_document(2000))
+        self.assertSameTree(pickle_round_trip(soup), soup)
+
+    @unittest.expectedFailure
+    def test_bs4_deepcopy_large(self):
+        soup = parsed(generate_document(2000))
+        self.assertSameTree(copy.deepcopy(soup), soup)
+
+    # copy.copy re-parses the encoded output, and encoding recurses for
+    # every level of nesting
+    @unittest.expectedFailure
+    def test_bs4_copy_deep(self):
+        soup, _ = deep_tree(2000)
+        self.assertSameTree(copy.copy(soup), soup)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# This class is intended to test traversal of very deep and very wide trees
+# (10k levels / children by default, TRAVERSAL_MAX_N=100000 for a longer run):
+# parents
+# descendants
+# index
+# decode / str()
+# decompose
+#
+# Besides the results it checks that none of them recurses once per level
+# on the Python stack, and that the generators (parents, descendants) hand
+# out their first item without building or walking the whole sequence first.
+
+import os
+import unittest
+
+from testkit.invariants import violations
+from testkit.traversal import (APIS, GENERATORS, TREES, deep_tree, first_item, first_item_bytes,
+                               frames_per_level, full_iteration, wide_tree)
+
+N = int(os.environ.get("TRAVERSAL_MAX_N", 10000))
+SMALL = 1000
+
+
+class TraversalTest(unittest.TestCase):
+
+    # the innermost <div> sits under N - 1 <div>s, <body>, <html> and the soup
+    def test_parents(self):
+        soup, node = deep_tree(N)
+        parents = list(node.parents)
+        self.assertEqual(len(parents), N + 2)
+        self.assertIs(parents[-1], soup)
+        soup, node = wide_tree(N)
+        self.assertEqual([p.name for p in node.parents], ["div", "body", "html", "[document]"])
+
+    def test_descendants(self):
+        soup, node = deep_tree(N)
+        # <html>, <body>, N <div>s and the leaf string
+        self.assertEqual(sum(1 for _ in soup.descendants), N + 3)
+        soup, node = wide_tree(N)
+        # <html>, <body>, <div>, N <p>s and their strings
+        self.assertEqual(sum(1 for _ in soup.descendants), 2 * N + 3)
+
+    def test_index(self):
+        soup, node = deep_tree(N)
+        self.assertEqual(node.parent.index(node), 0)
+        soup, node = wide_tree(N)
+        self.assertEqual(node.parent.index(node), N - 1)
+
+    def test_decode_wide(self):
+        soup, node = wide_tree(N)
+        self.assertTrue(str(soup).endswith("<p>item %d</p></div></body></html>" % (N - 1)))
+
+    # decode() calls itself for every child tag in bs4 4.10, two frames per
+    # level, so str() of a tree about 500 levels deep raises RecursionError
+    @unittest.expectedFailure
+    def test_decode_deep(self):
+        soup, node = deep_tree(N)
+        self.assertEqual(str(soup).count("<div>"), N)
+
+    def test_decompose(self):
+        for make in (deep_tree, wide_tree):
+            with self.subTest(tree=make.__name__):
+                soup, node = make(N)
+                soup.body.decompose()
+                self.assertEqual(str(soup), "<html></html>")
+                self.assertEqual(violations(soup), [])
+
+    # decode is the known exception, see test_decode_deep
+    def test_stack_depth(self):
+        for name in sorted(APIS):
+            if name == "decode":
+                continue
+            with self.subTest(api=name):
+                self.assertLess(frames_per_level(name), 0.5)
+
+    def assertFirstItemEarly(self, name, soup, node):
+        first, _ = first_item(APIS[name](soup, node))
+        total, count = full_iteration(APIS[name](soup, node))
+        if count < 100:
+            # too short to time apart (parents of a wide tree)
+            return
+        self.assertLess(first, total / 10, "first item after %.6fs, all %d after %.6fs" % (
+            first, count, total))
+
+    # descendants on a deep tree is the known exception, see
+    # test_descendants_first_item_deep
+    def test_lazy(self):
+        for shape, make in sorted(TREES.items()):
+            for name in GENERATORS:
+                with self.subTest(tree=shape, api=name):
+                    small = first_item_bytes(name, *make(SMALL))
+                    large = first_item_bytes(name, *make(N))
+                    # a lazy generator allocates the same few objects at any size
+                    self.assertLess(large, small + 1024)
+                    if (shape, name) != ("deep", "descendants"):
+                        self.assertFirstItemEarly(name, *make(N))
+
+    # descendants looks up the tag's last descendant before it yields
+    # anything, walking down one level at a time, so on a deep tree the
+    # first item costs about as much as the whole iteration
+    @unittest.expectedFailure
+    def test_descendants_first_item_deep(self):
+        self.assertFirstItemEarly("descendants", *deep_tree(N))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,22 +3,20 @@
 import unittest
 from bs4 import BeautifulSoup
 
+from testkit.backends import add_backend_cases
+from testkit.documents import YANG_DOCUMENT
+from testkit.fixtures import snapshot
+from testkit.invariants import violations
+
 
 class BS4Test(unittest.TestCase):
-    @staticmethod
-    def soup1(*args, **kwargs):
-        # Common document used by all black box testing.
-        return BeautifulSoup("""
-            <html>
-              <body>
-                <nochild></nochild>
-                <onechild><child></child></onechild>
-                <twochildren><child1></child1><child2></child2></twochildren>
-                <grandchildren><withchild><g1></g1><g2></g2></withchild><withchild2><g3></g3><g4></g4></withchild2></grandchildren>
-                <a id="34df9e" class="class-a class-b" rel="nofollow"></a>
-              </body>
-            </html>
-        """, "html.parser", *args, **kwargs)
+    # tree builder used by all tests, see add_backend_cases below
+    parser = "html.parser"
+
+    @classmethod
+    def soup1(cls, *args, **kwargs):
+        # Common document used by all black box testing, parsed once and copied per call.
+        return snapshot(YANG_DOCUMENT, cls.parser, *args, **kwargs)
 
     # get all parents of a tag
     def test_parents(self):
@@ -83,54 +81,64 @@ class BS4Test(unittest.TestCase):
 
     # white box testing
     def test_clear(self):
-        none_tag = BeautifulSoup("<a></a>", "html.parser")
+        none_tag = BeautifulSoup("<a></a>", self.parser)
         none_tag.name = none_tag.attrs = None
         none_tag.contents = []
 
         # two test cases for node and branch coverage
         # decompose=True, `tag` has two children, the first is a `Tag` object and the second is not
-        soup = BeautifulSoup("<div><a></a>text</div>", "html.parser")
+        soup = BeautifulSoup("<div><a></a>text</div>", self.parser)
         tag = soup.div
         tag_children = [tag.a]
         tag.clear(True)
         self.assertEqual(list(tag.children), [])
+        self.assertEqual(violations(soup), [])
         for c in tag_children:
             self.assertEqual(c, none_tag)
 
         # decompose=False, `tag` has two children
-        soup = BeautifulSoup("<div><a></a>text</div>", "html.parser")
+        soup = BeautifulSoup("<div><a></a>text</div>", self.parser)
         tag = soup.div
         tag.clear(False)
         self.assertEqual(list(tag.children), [])
+        self.assertEqual(violations(soup), [])
 
         # test cases for prime paths
         # decompose=True, `tag` has one child, which is a `Tag` object
-        soup = BeautifulSoup("<div><a></a></div>", "html.parser")
+        soup = BeautifulSoup("<div><a></a></div>", self.parser)
         tag = soup.div
         tag_children = [tag.a]
         tag.clear(True)
         self.assertEqual(list(tag.children), [])
+        self.assertEqual(violations(soup), [])
         for c in tag_children:
             self.assertEqual(c, none_tag)
 
         # decompose=True, `tag` has one child, which is not a `Tag` object
-        soup = BeautifulSoup("<div>text</div>", "html.parser")
+        soup = BeautifulSoup("<div>text</div>", self.parser)
         tag = soup.div
         tag.clear(True)
         self.assertEqual(list(tag.children), [])
+        self.assertEqual(violations(soup), [])
 
         # decompose=False, `tag` has one child
-        soup = BeautifulSoup("<div>text</div>", "html.parser")
+        soup = BeautifulSoup("<div>text</div>", self.parser)
         tag = soup.div
         tag.clear(False)
         self.assertEqual(list(tag.children), [])
+        self.assertEqual(violations(soup), [])
 
         # decompose=True, `tag` has five children, the first, the second and the fifth are a `Tag` object and the others are not
-        soup = BeautifulSoup("<div><a></a><b></b>c<e></e></div>", "html.parser")
+        soup = BeautifulSoup("<div><a></a><b></b>c<e></e></div>", self.parser)
         tag = soup.div
         tag.insert(3, "d")
         tag_children = [tag.a, tag.b, tag.e]
         tag.clear(True)
         self.assertEqual(list(tag.children), [])
+        self.assertEqual(violations(soup), [])
         for c in tag_children:
             self.assertEqual(c, none_tag)
+
+
+# run the same tests with every other installed tree builder
+add_backend_cases(globals(), BS4Test)